@@ -0,0 +1,285 @@
+"""
+Interfaccia a riga di comando per la conversione headless di uno o più file.
+
+Esempi:
+    python -m excel_to_sql_converter convert export.csv --db postgres --schema public --table clienti
+    python -m excel_to_sql_converter convert "exports/*.csv" --db sqlserver --schema dbo --database DWH --jobs 4
+    python -m excel_to_sql_converter convert exports/ --db oracle --schema HR --map "ord_*=ORDINI"
+    python -m excel_to_sql_converter convert report.xlsx --db postgres --schema public --sheets --map-file fogli.txt
+
+Senza --table né --map ogni file viene caricato nella tabella con lo stesso
+nome del file (senza estensione); con --sheets ogni foglio delle cartelle
+Excel va nella tabella con il nome del foglio. Questo modulo non importa
+tkinter né PIL.
+"""
+import argparse
+import fnmatch
+import functools
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from excel_to_sql_converter import (CSV_ENGINES, OUTPUT_FORMAT_DB, OUTPUT_FORMATS, PROFILE_MODES, ConversionMetrics,
+                                    convert_file, convert_workbook)
+
+# Estensioni considerate quando in input viene passata una cartella
+EXCEL_EXTENSIONS = ('.xlsx', '.xlsm', '.xls')
+SUPPORTED_EXTENSIONS = ('.csv',) + EXCEL_EXTENSIONS
+
+
+def expand_inputs(inputs, recursive=False):
+    """Espande file, glob e cartelle in una lista ordinata di file senza duplicati."""
+    files = []
+    for item in inputs:
+        if os.path.isdir(item):
+            pattern = os.path.join(item, '**', '*') if recursive else os.path.join(item, '*')
+            matches = [p for p in sorted(glob.glob(pattern, recursive=recursive))
+                       if os.path.isfile(p) and os.path.splitext(p)[1].lower() in SUPPORTED_EXTENSIONS]
+        elif glob.has_magic(item):
+            matches = [p for p in sorted(glob.glob(item, recursive=True)) if os.path.isfile(p)]
+        else:
+            matches = [item]
+        for path in matches:
+            if path not in files:
+                files.append(path)
+    return files
+
+
+def parse_table_map(entries):
+    """Converte le voci --map 'PATTERN=TABELLA' in una lista di coppie (pattern, tabella)."""
+    mapping = []
+    for entry in entries or []:
+        pattern, sep, table = entry.partition('=')
+        if not sep or not pattern or not table:
+            raise argparse.ArgumentTypeError(f"Mappatura non valida (atteso PATTERN=TABELLA): {entry}")
+        mapping.append((pattern, table))
+    return mapping
+
+
+def read_table_map_file(path):
+    """Legge un file di mappature con una voce PATTERN=TABELLA per riga (# per i commenti)."""
+    with open(path, encoding='utf-8') as f:
+        entries = [line.strip() for line in f]
+    return parse_table_map([e for e in entries if e and not e.startswith('#')])
+
+
+def sheet_table(table_map, sheet):
+    """Tabella della prima mappatura che corrisponde al nome del foglio, altrimenti None."""
+    for pattern, mapped in table_map or []:
+        if fnmatch.fnmatch(sheet, pattern):
+            return mapped
+    return None
+
+
+def resolve_table(file_path, table=None, table_map=None):
+    """Tabella di destinazione: --table, poi la prima --map che corrisponde al nome file, poi il nome del file."""
+    if table:
+        return table
+    name = os.path.basename(file_path)
+    for pattern, mapped in table_map or []:
+        if fnmatch.fnmatch(name, pattern):
+            return mapped
+    return os.path.splitext(name)[0]
+
+
+def parse_size(value):
+    """Converte una dimensione come '500M', '2G' o '1048576' in byte."""
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    text = value.strip().upper().removesuffix('B')
+    factor = units.get(text[-1:], 1)
+    if text[-1:] in units:
+        text = text[:-1]
+    try:
+        size = int(float(text) * factor)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Dimensione non valida: {value}")
+    if size <= 0:
+        raise argparse.ArgumentTypeError(f"Dimensione non valida: {value}")
+    return size
+
+
+def parse_columns(value):
+    """Converte un elenco 'COL1,COL2' in lista di colonne (None se vuoto)."""
+    columns = [c.strip() for c in (value or '').split(',') if c.strip()]
+    return columns or None
+
+
+def _convert_one(file_path, db_type, schema, table, database, batch_size, workers, output_format, output_options,
+                 collect_metrics=False):
+    start = time.perf_counter()
+    metrics = ConversionMetrics() if collect_metrics else None
+    result = convert_file(file_path, db_type, schema, table, database, batch_size=batch_size, workers=workers,
+                          output_format=output_format, metrics=metrics, **output_options)
+    return result, time.perf_counter() - start, metrics
+
+
+def run_batch(files, db_type, schema, database=None, table=None, table_map=None,
+              batch_size=None, jobs=1, workers=None, output_format='insert', compression=None,
+              split_rows=None, split_bytes=None, typed=False, ddl=False, delta_keys=None, delta_index=None,
+              upsert_keys=None, sheets=False, metrics=False, profile=None, engine=None):
+    """
+    Converte i file su un pool di jobs processi e restituisce, nell'ordine dei
+    file, una lista di dizionari {'file', 'table', 'ok', 'result', 'seconds'}.
+    Con metrics=True ogni voce ha anche 'metrics' (ConversionMetrics) con i
+    tempi per fase; non è disponibile per i fogli convertiti con sheets=True.
+
+    Con sheets=True le cartelle Excel vengono convertite un foglio per tabella
+    (vedi convert_workbook), una alla volta con jobs fogli in parallelo; nel
+    riepilogo compare una voce per foglio.
+    """
+    output_options = dict(compression=compression, split_rows=split_rows, split_bytes=split_bytes, typed=typed,
+                          ddl=ddl, delta_keys=delta_keys, delta_index=delta_index, upsert_keys=upsert_keys,
+                          profile=profile, engine=engine)
+    summary = []
+    if sheets:
+        workbooks = [f for f in files if os.path.splitext(f)[1].lower() in EXCEL_EXTENSIONS]
+        files = [f for f in files if f not in workbooks]
+        for file_path in workbooks:
+            sheet_summary = convert_workbook(file_path, db_type, schema, functools.partial(sheet_table, table_map),
+                                             jobs, database=database, batch_size=batch_size, workers=workers,
+                                             output_format=output_format, **output_options)
+            summary.extend({
+                'file': f"{file_path} [{item['sheet']}]",
+                'table': item['table'],
+                'ok': item['ok'],
+                'result': item['result'],
+                'seconds': item['seconds'],
+            } for item in sheet_summary)
+    tasks = [(f, resolve_table(f, table, table_map)) for f in files]
+    if jobs and jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(_convert_one, f, db_type, schema, t, database, batch_size, workers, output_format,
+                                   output_options, metrics)
+                       for f, t in tasks]
+            outcomes = [fut.result() for fut in futures]
+    else:
+        outcomes = [_convert_one(f, db_type, schema, t, database, batch_size, workers, output_format, output_options,
+                                 metrics)
+                    for f, t in tasks]
+    for (file_path, table_name), (result, seconds, file_metrics) in zip(tasks, outcomes):
+        summary.append({
+            'file': file_path,
+            'table': table_name,
+            'ok': result.ok,
+            'result': result,
+            'seconds': seconds,
+            'metrics': file_metrics,
+        })
+    return summary
+
+
+def print_summary(summary, out=None):
+    """Stampa una riga per file con esito e tempi, più il totale."""
+    out = out or sys.stdout
+    for item in summary:
+        status = "OK" if item['ok'] else "ERRORE"
+        print(f"[{status:<6}] {item['seconds']:8.2f}s  {item['file']} -> {item['table']}", file=out)
+        if not item['ok']:
+            print(f"          {item['result']}", file=out)
+        m = item.get('metrics')
+        if m is not None:
+            print(f"          detect {m.detect:.2f}s, read {m.read:.2f}s, render {m.render:.2f}s, "
+                  f"write {m.write:.2f}s; {m.rows} righe, {m.chunks} blocchi, "
+                  f"{m.bytes_in / 1048576:.1f} MB -> {m.bytes_out / 1048576:.1f} MB", file=out)
+    failed = sum(1 for item in summary if not item['ok'])
+    total = sum(item['seconds'] for item in summary)
+    print(f"{len(summary)} file, {len(summary) - failed} convertiti, {failed} errori, {total:.2f}s totali", file=out)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m excel_to_sql_converter",
+        description="Converte file Excel/CSV in script SQL senza interfaccia grafica.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    convert = commands.add_parser("convert", help="converte uno o più file",
+                                  description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    convert.add_argument("inputs", nargs="+", help="file, glob (es. 'dati/*.csv') o cartelle")
+    convert.add_argument("--db", dest="db_type", required=True, choices=["oracle", "postgres", "sqlserver"],
+                         help="database di destinazione")
+    convert.add_argument("--schema", required=True, help="schema di destinazione")
+    convert.add_argument("--table", help="tabella di destinazione per tutti i file")
+    convert.add_argument("--map", dest="table_map", action="append", metavar="PATTERN=TABELLA",
+                         help="tabella per i file il cui nome corrisponde a PATTERN (ripetibile)")
+    convert.add_argument("--map-file", metavar="FILE",
+                         help="file con una mappatura PATTERN=TABELLA per riga, valutata dopo le --map")
+    convert.add_argument("--sheets", action="store_true",
+                         help="converte ogni foglio delle cartelle Excel in NOME_FOGLIO.sql; --map si applica "
+                              "ai nomi dei fogli (default: tabella con il nome del foglio)")
+    convert.add_argument("--database", help="database (solo SQL Server, aggiunge USE [database])")
+    convert.add_argument("--batch-size", type=int, help="righe per INSERT multi-riga")
+    convert.add_argument("--format", dest="output_format", choices=OUTPUT_FORMATS, default="insert",
+                         help="formato dello script: insert (default), copy (solo postgres), "
+                              "bcp (solo sqlserver: file dati + formato + BULK INSERT), "
+                              "sqlldr (solo oracle: control file + file dati SQL*Loader)")
+    convert.add_argument("--typed", action="store_true",
+                         help="deduce i tipi delle colonne: numeri senza apici e date come letterali del database")
+    convert.add_argument("--ddl", action="store_true",
+                         help="genera anche NOME_create.sql con il CREATE TABLE dedotto dai dati")
+    convert.add_argument("--delta-keys", metavar="COL1,COL2",
+                         help="conversione incrementale: solo INSERT/UPDATE/DELETE delle righe cambiate "
+                              "dall'esecuzione precedente, identificate da queste colonne chiave")
+    convert.add_argument("--delta-index", metavar="FILE",
+                         help="indice sqlite della conversione incrementale (default: SCHEMA.TABELLA.delta.sqlite "
+                              "accanto al file)")
+    convert.add_argument("--upsert-keys", metavar="COL1,COL2",
+                         help="al posto di DELETE + INSERT genera MERGE / INSERT ... ON CONFLICT per queste chiavi")
+    convert.add_argument("--compress", choices=["gzip", "zstd"],
+                         help="comprime lo script al volo (.gz/.zst; zstd richiede il pacchetto zstandard)")
+    convert.add_argument("--split-rows", type=int, metavar="N", help="divide lo script in parti di al massimo N righe")
+    convert.add_argument("--split-size", type=parse_size, metavar="DIM",
+                         help="divide lo script in parti di al massimo DIM byte non compressi (es. 500M, 2G)")
+    convert.add_argument("--metrics", action="store_true",
+                         help="misura i tempi per fase (detect, read, render, write) e li stampa nel riepilogo; "
+                              "il dettaglio JSON va nel log di ogni file")
+    convert.add_argument("--profile", choices=PROFILE_MODES,
+                         help="profila la conversione: cpu (cProfile, NOME_profile.prof), memory (tracemalloc, "
+                              "NOME_alloc.txt) o all")
+    convert.add_argument("--engine", choices=CSV_ENGINES,
+                         help="lettore dei CSV oltre 10 MB: pandas (default) o pyarrow (parsing su più thread, "
+                              "richiede il pacchetto pyarrow; senza viene usato pandas)")
+    convert.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                         help="file convertiti in parallelo (default: numero di CPU)")
+    convert.add_argument("--workers", type=int, help="processi di rendering per ciascun file grande")
+    convert.add_argument("-r", "--recursive", action="store_true", help="cerca i file anche nelle sottocartelle")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        table_map = parse_table_map(args.table_map)
+        if args.map_file:
+            table_map += read_table_map_file(args.map_file)
+    except (argparse.ArgumentTypeError, OSError) as e:
+        parser.error(str(e))
+    if args.sheets and args.table:
+        parser.error("--table non è disponibile con --sheets: usare --map o --map-file")
+    if OUTPUT_FORMAT_DB.get(args.output_format, args.db_type) != args.db_type:
+        parser.error(f"--format {args.output_format} è disponibile solo con --db {OUTPUT_FORMAT_DB[args.output_format]}")
+    if args.output_format in ('bcp', 'sqlldr') and (args.compress or args.split_rows or args.split_size):
+        parser.error(f"--compress e --split-* non sono disponibili con --format {args.output_format}")
+    if args.typed and args.output_format != 'insert':
+        parser.error("--typed è disponibile solo con --format insert")
+    delta_keys = parse_columns(args.delta_keys)
+    upsert_keys = parse_columns(args.upsert_keys)
+    if (delta_keys or upsert_keys) and args.output_format != 'insert':
+        parser.error("--delta-keys e --upsert-keys sono disponibili solo con --format insert")
+    if delta_keys and upsert_keys:
+        parser.error("--delta-keys e --upsert-keys non possono essere usati insieme")
+    files = expand_inputs(args.inputs, args.recursive)
+    if not files:
+        parser.error("nessun file trovato per gli input indicati")
+    summary = run_batch(files, args.db_type, args.schema, args.database, args.table, table_map,
+                        args.batch_size, args.jobs, args.workers, args.output_format, args.compress,
+                        args.split_rows, args.split_size, args.typed, args.ddl, delta_keys, args.delta_index,
+                        upsert_keys, args.sheets, args.metrics, args.profile, args.engine)
+    print_summary(summary)
+    return 0 if all(item['ok'] for item in summary) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
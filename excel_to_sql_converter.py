@@ -1,23 +1,261 @@
-import pandas as pd
+import codecs
+import functools
+import hashlib
+import importlib
+import io
+import itertools
+import json
 import os
+import re
 import sys
 import logging
-import tkinter as tk
-from tkinter import filedialog, messagebox
-from PIL import Image, ImageTk
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack, contextmanager, nullcontext
+from dataclasses import dataclass, asdict
+
+class _LazyModule:
+    """Modulo importato solo al primo accesso a un suo attributo.
+
+    pandas e numpy costano centinaia di millisecondi all'avvio: in questo modo
+    importare il modulo (GUI, CLI, test di format_insert) resta immediato e
+    il costo viene pagato solo alla prima conversione.
+    """
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+np = _LazyModule("numpy")
+pd = _LazyModule("pandas")
 
 #versione corrente
 APP_VERSION = "1.0.50"
 
-# Costanti UI
-DEFAULT_FONT_FAMILY = "Segoe UI"
-
 logger = None
 
+# Righe per blocco nelle letture a chunk (CSV grandi ed Excel in streaming)
+CHUNK_ROWS = 100000
+
+# Numero massimo di righe in un singolo costruttore VALUES di SQL Server
+SQLSERVER_MAX_VALUES_ROWS = 1000
+
+# Formati dello script generato da convert_file
+OUTPUT_FORMATS = ('insert', 'copy', 'bcp', 'sqlldr')
+
+# Formati di caricamento massivo disponibili per un solo database
+OUTPUT_FORMAT_DB = {'copy': 'postgres', 'bcp': 'sqlserver', 'sqlldr': 'oracle'}
+
 class CSVLoadError(Exception):
     """Eccezione personalizzata per errori di caricamento CSV"""
     pass
 
+class ConversionCancelled(Exception):
+    """Sollevata quando una conversione viene annullata tra un blocco e l'altro"""
+    pass
+
+@dataclass
+class ConversionProgress:
+    """Avanzamento di una conversione, passato alla callback progress di convert_file."""
+    rows: int
+    bytes_read: int
+    total_bytes: int
+    elapsed: float
+
+    @property
+    def fraction(self):
+        """Frazione completata (0-1) in base ai byte letti."""
+        return min(self.bytes_read / self.total_bytes, 1.0) if self.total_bytes else 0.0
+
+    @property
+    def eta(self):
+        """Secondi stimati al termine, o None se non ancora stimabili."""
+        if self.bytes_read <= 0 or self.elapsed <= 0:
+            return None
+        return self.elapsed * max(self.total_bytes - self.bytes_read, 0) / self.bytes_read
+
+@dataclass
+class ConversionMetrics:
+    """Tempi per fase e contatori di una conversione, compilati da convert_file(metrics=...).
+
+    Fasi (secondi): detect (rilevamento del dialetto CSV; per i CSV fino a
+    10 MB comprende la lettura, che avviene sul campione), read (lettura dei
+    blocchi dal file), render (conversione in SQL, compresi filtri delta e
+    statistiche DDL), write (scrittura e compressione dell'output).
+    bytes_out è la dimensione su disco dei file generati; peak_memory_mb il
+    picco di memoria del processo (None se non misurabile).
+    """
+    detect: float = 0.0
+    read: float = 0.0
+    render: float = 0.0
+    write: float = 0.0
+    total: float = 0.0
+    rows: int = 0
+    chunks: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    peak_memory_mb: float = None
+
+    @contextmanager
+    def stage(self, name):
+        """Aggiunge alla fase name il tempo trascorso nel blocco with."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            setattr(self, name, getattr(self, name) + time.perf_counter() - start)
+
+    def timed(self, name, iterable):
+        """Itera iterable aggiungendo alla fase name il tempo di ogni next() e contando i blocchi."""
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            item = next(iterator, _END)
+            setattr(self, name, getattr(self, name) + time.perf_counter() - start)
+            if item is _END:
+                return
+            self.chunks += 1
+            yield item
+
+    def to_json(self):
+        """Riepilogo JSON su una riga, con i tempi arrotondati al millisecondo."""
+        data = asdict(self)
+        for key in ('detect', 'read', 'render', 'write', 'total'):
+            data[key] = round(data[key], 3)
+        return json.dumps(data)
+
+# Sentinella di fine iterazione per ConversionMetrics.timed
+_END = object()
+
+class ConversionResult(str):
+    """Esito di convert_file: il messaggio mostrato all'utente, con ok e rows.
+
+    Resta una stringa per chi mostra o registra il messaggio; ok (conversione
+    riuscita) e rows (righe scritte, None se non riuscita) vanno usati al
+    posto del testo, che può cambiare.
+    """
+
+    def __new__(cls, message, ok, rows=None):
+        result = super().__new__(cls, message)
+        result.ok = ok
+        result.rows = rows
+        return result
+
+    def __reduce__(self):
+        return (ConversionResult, (str(self), self.ok, self.rows))
+
+# Modalità di profilazione di convert_file: cProfile, tracemalloc o entrambi
+PROFILE_MODES = ('cpu', 'memory', 'all')
+
+# Righe del report delle allocazioni e funzioni riportate nel log
+PROFILE_TOP_ALLOCATIONS = 30
+PROFILE_TOP_FUNCTIONS = 15
+
+class RunProfiler:
+    """Profila una conversione con cProfile e/o tracemalloc e salva i risultati accanto al log.
+
+    mode 'cpu' scrive base_profile.prof (da aprire con pstats o snakeviz) e
+    riporta nel log le funzioni più costose; 'memory' scrive base_alloc.txt
+    con il picco di memoria tracciata e le righe di codice che allocano di
+    più, prese dal momento di massima occupazione tra quelli campionati con
+    sample() e al termine; 'all' entrambi. Viene profilato solo il thread (e
+    il processo) che chiama start(): il rendering con workers > 1 avviene in
+    altri processi e non compare nel profilo.
+    """
+
+    def __init__(self, base, mode, top=None):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Modalità di profilazione non supportata: {mode}")
+        self.prof_file = f"{base}_profile.prof" if mode in ('cpu', 'all') else None
+        self.alloc_file = f"{base}_alloc.txt" if mode in ('memory', 'all') else None
+        self.top = top or PROFILE_TOP_ALLOCATIONS
+        self._profiler = None
+        self._tracing = False
+        self._snapshot = None
+        self._snapshot_size = -1
+
+    def start(self):
+        if self.alloc_file:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._tracing = True
+        if self.prof_file:
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def sample(self):
+        """Conserva uno snapshot delle allocazioni se la memoria tracciata è la più alta vista finora."""
+        if not self.alloc_file:
+            return
+        import tracemalloc
+        current = tracemalloc.get_traced_memory()[0]
+        if current > self._snapshot_size:
+            # Lo snapshot è costoso: non deve comparire nel profilo CPU
+            if self._profiler is not None:
+                self._profiler.disable()
+            self._snapshot = tracemalloc.take_snapshot()
+            self._snapshot_size = current
+            if self._profiler is not None:
+                self._profiler.enable()
+
+    def sampled(self, chunks):
+        """Itera chunks chiamando sample() prima di leggere ogni blocco."""
+        for chunk in chunks:
+            yield chunk
+            self.sample()
+
+    def stop(self):
+        """Ferma la profilazione e scrive i file; restituisce i percorsi scritti."""
+        written = []
+        self.sample()
+        if self._profiler is not None:
+            import pstats
+            self._profiler.disable()
+            self._profiler.dump_stats(self.prof_file)
+            written.append(self.prof_file)
+            report = io.StringIO()
+            pstats.Stats(self._profiler, stream=report).sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+            logging.info(f"Profilo CPU salvato: {self.prof_file}\n{report.getvalue()}")
+        if self.alloc_file:
+            import tracemalloc
+            current, peak = tracemalloc.get_traced_memory()
+            if self._tracing:
+                tracemalloc.stop()
+            snapshot = self._snapshot.filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+            with open(self.alloc_file, "w", encoding="utf-8") as f:
+                f.write(f"Picco memoria tracciata: {peak / 1048576:.1f} MB\n")
+                f.write(f"Memoria allocata al momento dello snapshot: {self._snapshot_size / 1048576:.1f} MB\n")
+                f.write(f"Memoria ancora allocata al termine: {current / 1048576:.1f} MB\n\n")
+                f.write(f"Prime {self.top} righe per memoria allocata nello snapshot:\n")
+                for stat in snapshot.statistics('lineno')[:self.top]:
+                    f.write(f"{stat}\n")
+            written.append(self.alloc_file)
+            logging.info(f"Report allocazioni salvato: {self.alloc_file} (picco {peak / 1048576:.1f} MB)")
+        return written
+
+def _peak_rss_mb():
+    """Picco di memoria del processo in MB (resource su Unix, psutil se installato), o None."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss è in KB su Linux e in byte su macOS
+        return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+    except ImportError:
+        pass
+    try:
+        import psutil
+        return round(psutil.Process().memory_info().peak_wset / (1024 * 1024), 1)
+    except (ImportError, AttributeError):
+        return None
+
 def resource_path(relative_path):
     """ Get absolute path to resource, works for dev and for PyInstaller """
     try:
@@ -27,9 +265,6 @@ def resource_path(relative_path):
         base_path = os.path.abspath(".")
     return os.path.join(base_path, relative_path)
 
-ICON_SIZE = (24, 24)
-IMAGES_PATH = resource_path("images")
-
 def setup_logging(file_path):
     base = os.path.splitext(os.path.basename(file_path))[0]
     dir_path = os.path.dirname(file_path)
@@ -63,38 +298,220 @@ def setup_logging(file_path):
     logger.info(f"File di log creato: {log_file}")
     return log_file
 
-def format_insert(db_type, schema, table, df):
-    # Helpers: validate and quote SQL identifiers (schema, table, columns)
-
-    def safe_identifier(name):
-        """Return a sanitized identifier string or raise ValueError if invalid.
-
-        This function rejects identifiers containing dangerous characters (such as quotes,
-        semicolons, brackets, slashes, or newlines) and any whitespace. It does not
-        explicitly restrict to Unicode letters, digits, or underscores.
-
-        Note:
-            This function does NOT guarantee SQL standard compliance for identifiers.
-            It allows any characters except those explicitly blacklisted above, which may
-            include characters that are invalid in some SQL dialects but are not explicitly checked.
-        """
-        if not isinstance(name, str) or name.strip() == "":
-            raise ValueError("Identifier must be a non-empty string")
-        n = name.strip()
-        # Reject identifiers containing any internal whitespace (spaces, tabs, etc.)
-        if any(ch.isspace() for ch in n):
-            raise ValueError(f"Invalid identifier (contains whitespace): {name}")
-        # Reject dangerous punctuation
-        for ch in ['"', "'", ';', '[', ']', '\\', '/', '\n', '\r', '@', '-', '*', '%', '`']:
-            if ch in n:
-                raise ValueError(f"Invalid identifier: {name}")
-        # Reject control characters (ASCII < 32)
-        if any(ord(ch) < 32 for ch in n):
-            raise ValueError(f"Invalid identifier (contains control character): {name}")
-        # If passes basic checks, return as-is (we'll quote appropriately when building SQL)
-        return n
+# Separatore interno usato per l'escape in blocco delle colonne
+_COLUMN_SEP = "\x00"
 
-    statements = []
+def _column_text(values):
+    """Testo dei valori di una colonna e maschera dei NULL.
+
+    Ogni valore non nullo viene reso con str(), iterando una Series con lo
+    stesso dtype della riga di iterrows(), così numeri, date e booleani
+    producono esattamente lo stesso testo della vecchia implementazione. Nelle
+    posizioni NULL il testo è una stringa vuota.
+    """
+    col = pd.Series(values, copy=False)
+    nulls = col.isna().to_numpy()
+    if pd.api.types.infer_dtype(col, skipna=True) == 'string':
+        # Caso tipico (CSV letti con dtype=str): nessuna conversione necessaria
+        text = np.where(nulls, "", col.to_numpy(dtype=object))
+    else:
+        text = np.array([str(v) for v in col], dtype=object)
+        text[nulls] = ""
+    return text, nulls
+
+def _quote_text(text, quote="'"):
+    """Racchiude ogni testo della colonna tra quote, raddoppiando quelle interne."""
+    # Escape e quoting dell'intera colonna con poche operazioni in C: i valori
+    # vengono uniti con un separatore assente nei dati, trasformati e ridivisi.
+    joined = _COLUMN_SEP.join(text)
+    if joined.count(_COLUMN_SEP) == len(text) - 1:
+        quoted_sep = quote + _COLUMN_SEP + quote
+        return np.array(
+            (quote + joined.replace(quote, quote * 2).replace(_COLUMN_SEP, quoted_sep) + quote).split(_COLUMN_SEP),
+            dtype=object,
+        )
+    escaped = pd.Series(text, dtype=object).str.replace(quote, quote * 2, regex=False).to_numpy(dtype=object)
+    return quote + escaped + quote
+
+def _render_sql_literals(values):
+    """Converte una colonna di valori in letterali SQL: NULL oppure stringa quotata.
+
+    Gli apici singoli vengono raddoppiati; il testo dei valori è quello di _column_text.
+    """
+    text, nulls = _column_text(values)
+    quoted = _quote_text(text)
+    quoted[nulls] = "NULL"
+    return quoted
+
+# Righe del primo blocco usate per dedurre i tipi delle colonne (typed=True)
+TYPE_INFERENCE_SAMPLE_ROWS = 1000
+
+# Pattern dei tipi riconosciuti, nell'ordine in cui vengono provati. Gli interi
+# con zeri iniziali (codici, CAP) restano testo; al massimo 18 cifre (BIGINT).
+_TYPE_PATTERNS = {
+    'boolean': r"(?i:true|false)",
+    'integer': r"[+-]?(?:0|[1-9]\d{0,17})",
+    'decimal': r"[+-]?(?:0|[1-9]\d*)(?:\.\d+)?",
+    'date': r"\d{4}-\d{2}-\d{2}",
+    'timestamp': r"\d{4}-\d{2}-\d{2}(?:[ T]\d{2}:\d{2}:\d{2}(?:\.\d{1,6})?)?",
+}
+
+# Pattern di una colonna intera unita con _COLUMN_SEP: una sola regex per verificare tutti i valori
+_TYPE_COLUMN_PATTERNS = {k: f"(?:{p})(?:{_COLUMN_SEP}(?:{p}))*" for k, p in _TYPE_PATTERNS.items()}
+
+def _all_match_type(text, kind):
+    """True se tutti i valori (non nulli) di text rispettano il tipo kind."""
+    joined = _COLUMN_SEP.join(text)
+    if joined.count(_COLUMN_SEP) != len(text) - 1:
+        return bool(_match_type(text, kind).all())
+    if re.fullmatch(_TYPE_COLUMN_PATTERNS[kind], joined) is None:
+        return False
+    if kind in ('date', 'timestamp'):
+        parsed = pd.to_datetime(pd.Series(text, dtype=object), format='ISO8601', errors='coerce')
+        return bool(parsed.notna().all())
+    return True
+
+def _match_type(text, kind):
+    """Maschera dei valori di text che rispettano il tipo kind (date comprese le date valide)."""
+    series = pd.Series(text, dtype=object)
+    matches = series.str.fullmatch(_TYPE_PATTERNS[kind]).to_numpy(dtype=bool, copy=True)
+    if kind in ('date', 'timestamp') and matches.any():
+        parsed = pd.to_datetime(series[matches], format='ISO8601', errors='coerce')
+        matches[matches] = parsed.notna().to_numpy()
+    return matches
+
+def infer_column_types(df, sample_rows=None):
+    """Deduce il tipo di ogni colonna da un campione di al massimo sample_rows righe.
+
+    Restituisce {colonna: tipo} con tipo tra 'boolean', 'integer', 'decimal',
+    'date', 'timestamp' e 'text'. Una colonna ha un tipo solo se tutti i valori
+    non nulli del campione lo rispettano; colonne vuote restano 'text'.
+    """
+    sample = df.head(sample_rows or TYPE_INFERENCE_SAMPLE_ROWS)
+    values = sample.values
+    types = {}
+    for j, col in enumerate(sample.columns):
+        text, nulls = _column_text(values[:, j])
+        text = text[~nulls]
+        types[col] = 'text'
+        if len(text) == 0:
+            continue
+        for kind in _TYPE_PATTERNS:
+            if _all_match_type(text, kind):
+                types[col] = kind
+                break
+    return types
+
+def _render_typed_literals(values, kind, db_type):
+    """Come _render_sql_literals, ma i valori del tipo kind diventano letterali SQL tipizzati.
+
+    Numeri senza apici, booleani TRUE/FALSE (Postgres) o 1/0, date e
+    timestamp con la sintassi del database. Ogni valore viene controllato: chi
+    non rispetta il tipo (es. righe oltre il campione) resta una stringa quotata.
+    """
+    if kind not in _TYPE_PATTERNS:
+        return _render_sql_literals(values)
+    text, nulls = _column_text(values)
+    typed = ~nulls
+    typed[typed] = _match_type(text[typed], kind)
+    out = np.empty(len(text), dtype=object)
+    out[nulls] = "NULL"
+    other = ~nulls & ~typed
+    if other.any():
+        out[other] = _quote_text(text[other])
+    vals = text[typed]
+    if kind in ('integer', 'decimal'):
+        out[typed] = vals
+    elif kind == 'boolean':
+        true = np.array([v.lower() == 'true' for v in vals], dtype=bool)
+        t, f = ("TRUE", "FALSE") if db_type == 'postgres' else ("1", "0")
+        out[typed] = np.where(true, t, f)
+    else:
+        vals = np.array([v.replace("T", " ") for v in vals], dtype=object)
+        is_date = kind == 'date'
+        if db_type == 'postgres':
+            out[typed] = ("DATE '" if is_date else "TIMESTAMP '") + vals + "'"
+        elif db_type == 'oracle':
+            if is_date:
+                out[typed] = "TO_DATE('" + vals + "', 'YYYY-MM-DD')"
+            else:
+                # Le date senza ora e i timestamp senza frazione usano il formato corrispondente
+                fmt = np.array([", 'YYYY-MM-DD HH24:MI:SS.FF')" if "." in v else
+                                ", 'YYYY-MM-DD HH24:MI:SS')" if len(v) > 10 else
+                                ", 'YYYY-MM-DD')" for v in vals], dtype=object)
+                out[typed] = "TO_TIMESTAMP('" + vals + "'" + fmt
+        else:
+            out[typed] = ("CONVERT(DATE, '" + vals + "', 23)" if is_date
+                          else "CONVERT(DATETIME2, '" + vals + "', 121)")
+    return out
+
+# Helpers: validate and quote SQL identifiers (schema, table, columns)
+
+def safe_identifier(name):
+    """Return a sanitized identifier string or raise ValueError if invalid.
+
+    This function rejects identifiers containing dangerous characters (such as quotes,
+    semicolons, brackets, slashes, or newlines) and any whitespace. It does not
+    explicitly restrict to Unicode letters, digits, or underscores.
+
+    Note:
+        This function does NOT guarantee SQL standard compliance for identifiers.
+        It allows any characters except those explicitly blacklisted above, which may
+        include characters that are invalid in some SQL dialects but are not explicitly checked.
+    """
+    if not isinstance(name, str) or name.strip() == "":
+        raise ValueError("Identifier must be a non-empty string")
+    n = name.strip()
+    # Reject identifiers containing any internal whitespace (spaces, tabs, etc.)
+    if any(ch.isspace() for ch in n):
+        raise ValueError(f"Invalid identifier (contains whitespace): {name}")
+    # Reject dangerous punctuation
+    for ch in ['"', "'", ';', '[', ']', '\\', '/', '\n', '\r', '@', '-', '*', '%', '`']:
+        if ch in n:
+            raise ValueError(f"Invalid identifier: {name}")
+    # Reject control characters (ASCII < 32)
+    if any(ord(ch) < 32 for ch in n):
+        raise ValueError(f"Invalid identifier (contains control character): {name}")
+    # If passes basic checks, return as-is (we'll quote appropriately when building SQL)
+    return n
+
+def quote_identifier(db_type, name):
+    """Validate an identifier and quote it with the native syntax of the target database.
+
+    SQL Server uses [name], Postgres "name"; Oracle names are left unquoted so
+    they keep Oracle's usual case-insensitive resolution (as in format_insert).
+    """
+    n = safe_identifier(name)
+    if db_type == 'sqlserver':
+        return f'[{n}]'
+    if db_type == 'postgres':
+        return f'"{n}"'
+    return n
+
+def qualified_table(db_type, schema, table):
+    """Return schema.table quoted for db_type (see quote_identifier)."""
+    return f"{quote_identifier(db_type, schema)}.{quote_identifier(db_type, table)}"
+
+def _render_columns(db_type, df, column_types=None):
+    """Letterali SQL di ogni colonna del DataFrame (tipizzati se column_types è indicato)."""
+    values = df.values
+    if column_types:
+        return [_render_typed_literals(values[:, j], column_types.get(col), db_type)
+                for j, col in enumerate(df.columns)]
+    return [_render_sql_literals(values[:, j]) for j in range(values.shape[1])]
+
+def format_insert(db_type, schema, table, df, batch_size=None, column_types=None, key_columns=None):
+    """Genera gli statement INSERT per il DataFrame.
+
+    Con batch_size > 1 le righe vengono raggruppate in INSERT multi-riga:
+    VALUES (...),(...) per SQL Server (max 1000 righe) e Postgres,
+    INSERT ALL ... SELECT 1 FROM DUAL per Oracle.
+    column_types ({colonna: tipo}, vedi infer_column_types) attiva i
+    letterali tipizzati; le colonne assenti o 'text' restano stringhe quotate.
+    key_columns attiva il caricamento per chiave (vedi format_upsert).
+    """
+    if key_columns:
+        return format_upsert(db_type, schema, table, df, key_columns, batch_size, column_types)
     columns = [safe_identifier(c) for c in df.columns.tolist()]
 
     # Precompute quoted column list depending on DB type
@@ -108,368 +525,1911 @@ def format_insert(db_type, schema, table, df):
     schema_safe = safe_identifier(schema)
     table_safe = safe_identifier(table)
 
-    for _, row in df.iterrows():
-        values = []
-        for val in row:
-            if pd.isnull(val):
-                values.append("NULL")
+    # Build INSERT with safe identifiers. Use bracketed [schema].[table] as the
+    # canonical reference so it matches the DELETE/USE lines produced elsewhere
+    # in the code and the expectations in the test-suite.
+    table_ref = f'[{schema_safe}].[{table_safe}]'
+    head = f'INSERT INTO {table_ref} ({cols}) VALUES ('
+
+    # Rendering colonna per colonna: escape, NULL e apici vengono applicati a
+    # intere colonne e le righe vengono poi unite in blocco. La sorgente dei
+    # valori è df.values, la stessa usata da iterrows(), così l'output resta
+    # identico byte per byte alla vecchia implementazione riga per riga.
+    rendered = _render_columns(db_type, df, column_types)
+    if rendered:
+        rows = [", ".join(vals) for vals in zip(*rendered)]
+    else:
+        rows = [""] * len(df)
+
+    if not batch_size or batch_size <= 1:
+        statements = [f"{head}{row});" for row in rows]
+        logging.info(f"Generati {len(statements)} statements INSERT")
+        return "\n".join(statements)
+
+    if db_type == 'sqlserver':
+        # SQL Server accetta al massimo 1000 righe per costruttore VALUES
+        batch_size = min(batch_size, SQLSERVER_MAX_VALUES_ROWS)
+    statements = []
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        if db_type == 'oracle':
+            # Oracle non supporta VALUES multi-riga: si usa INSERT ALL ... SELECT 1 FROM DUAL
+            into = f"  INTO {table_ref} ({cols}) VALUES ("
+            body = "\n".join(f"{into}{row})" for row in batch)
+            statements.append(f"INSERT ALL\n{body}\nSELECT 1 FROM DUAL;")
+        else:
+            body = ",\n".join(f"({row})" for row in batch)
+            statements.append(f"INSERT INTO {table_ref} ({cols}) VALUES\n{body};")
+    logging.info(f"Generati {len(statements)} statements INSERT multi-riga ({len(rows)} righe, batch da {batch_size})")
+    return "\n".join(statements)
+
+# Escape del formato testo di COPY: backslash, tab e fine riga
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+def copy_header(schema, table, columns):
+    """Riga COPY ... FROM stdin; che precede i dati in formato testo."""
+    cols = ", ".join(quote_identifier('postgres', c) for c in columns)
+    return f"COPY {qualified_table('postgres', schema, table)} ({cols}) FROM stdin;"
+
+def format_copy(df):
+    """Righe del DataFrame nel formato testo di COPY (tab come separatore, \\N per NULL).
+
+    Il testo dei valori è lo stesso degli INSERT generati da format_insert.
+    """
+    values = df.values
+    rendered = []
+    for j in range(values.shape[1]):
+        text, nulls = _column_text(values[:, j])
+        joined = _COLUMN_SEP.join(text)
+        if joined.count(_COLUMN_SEP) == len(text) - 1:
+            escaped = np.array(joined.translate(_COPY_ESCAPES).split(_COLUMN_SEP), dtype=object)
+        else:
+            escaped = np.array([v.translate(_COPY_ESCAPES) for v in text], dtype=object)
+        escaped[nulls] = "\\N"
+        rendered.append(escaped)
+    if not rendered:
+        return ""
+    return "\n".join("\t".join(vals) for vals in zip(*rendered))
+
+# Terminatori del file dati BCP (formato carattere, senza escape)
+BCP_FIELD_TERMINATOR = "\t"
+BCP_ROW_TERMINATOR = "\r\n"
+
+def format_bcp(df):
+    """Righe del DataFrame per il file dati BCP: campi separati da tab, NULL come campo vuoto.
+
+    Il formato carattere di BCP non prevede escape: un valore che contiene tab
+    o a capo renderebbe il file ambiguo e genera un errore. Anche la stringa
+    vuota viene caricata come NULL (BULK INSERT con KEEPNULLS).
+    """
+    values = df.values
+    rendered = []
+    for j in range(values.shape[1]):
+        text, nulls = _column_text(values[:, j])
+        joined = _COLUMN_SEP.join(text)
+        if any(ch in joined for ch in (BCP_FIELD_TERMINATOR, "\r", "\n")):
+            raise ValueError(f"La colonna '{df.columns[j]}' contiene tab o a capo, non ammessi nel file dati BCP")
+        rendered.append(text)
+    if not rendered:
+        return ""
+    return "\n".join(BCP_FIELD_TERMINATOR.join(vals) for vals in zip(*rendered))
+
+def _xml_attr(value):
+    return (str(value).replace("&", "&amp;").replace('"', "&quot;")
+            .replace("<", "&lt;").replace(">", "&gt;"))
+
+def bcp_format_xml(columns):
+    """File di formato XML di BCP: campi CharTerm in UTF-8 mappati come NVARCHAR sulle colonne.
+
+    BULK INSERT associa i campi alle colonne della tabella per posizione: la
+    tabella deve avere le colonne nello stesso ordine del file.
+    """
+    names = [safe_identifier(c) for c in columns]
+    fields, cols = [], []
+    for i, name in enumerate(names, start=1):
+        term = r"\r\n" if i == len(names) else r"\t"
+        fields.append(f'  <FIELD ID="{i}" xsi:type="CharTerm" TERMINATOR="{term}"/>')
+        cols.append(f'  <COLUMN SOURCE="{i}" NAME="{_xml_attr(name)}" xsi:type="SQLNVARCHAR"/>')
+    return "\n".join([
+        '<?xml version="1.0"?>',
+        '<BCPFORMAT xmlns="http://schemas.microsoft.com/sqlserver/2004/bulkload/format" '
+        'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">',
+        ' <RECORD>', *fields, ' </RECORD>',
+        ' <ROW>', *cols, ' </ROW>',
+        '</BCPFORMAT>',
+    ]) + "\n"
+
+def bulk_insert_script(schema, table, database, data_file, format_file):
+    """Script T-SQL con DELETE e BULK INSERT del file dati (percorsi assoluti, da adattare al server)."""
+    table_ref = qualified_table('sqlserver', schema, table)
+    data_path = os.path.abspath(data_file).replace("'", "''")
+    format_path = os.path.abspath(format_file).replace("'", "''")
+    head = f"USE [{database}]\nGO\n\n" if database else ""
+    target = f"[{database}].{table_ref}" if database else table_ref
+    return (
+        f"{head}"
+        f"-- In alternativa: bcp {target} in \"{os.path.abspath(data_file)}\" "
+        f"-f \"{os.path.abspath(format_file)}\" -C 65001 -S <server> -T\n"
+        f"DELETE FROM {table_ref};\nGO\n\n"
+        f"BULK INSERT {table_ref}\n"
+        f"FROM '{data_path}'\n"
+        f"WITH (FORMATFILE = '{format_path}', CODEPAGE = '65001', KEEPNULLS, TABLOCK);\nGO\n"
+    )
+
+# Lunghezza massima (in caratteri) dei campi dichiarata nel control file di SQL*Loader
+SQLLDR_MAX_FIELD_CHARS = 4000
+
+def format_sqlldr(df):
+    """Righe del DataFrame per il file dati di SQL*Loader.
+
+    Campi separati da virgola e racchiusi tra doppi apici (raddoppiati se
+    presenti nel valore), NULL come campo vuoto. I record terminano con a capo,
+    quindi i valori con a capo generano un errore.
+    """
+    values = df.values
+    rendered = []
+    for j in range(values.shape[1]):
+        text, nulls = _column_text(values[:, j])
+        joined = _COLUMN_SEP.join(text)
+        if "\r" in joined or "\n" in joined:
+            raise ValueError(f"La colonna '{df.columns[j]}' contiene a capo, non ammessi nel file dati SQL*Loader")
+        quoted = _quote_text(text, '"')
+        quoted[nulls] = ""
+        rendered.append(quoted)
+    if not rendered:
+        return ""
+    return "\n".join(",".join(vals) for vals in zip(*rendered))
+
+def sqlldr_control_file(schema, table, columns, data_file):
+    """Control file di SQL*Loader per il caricamento direct path di data_file.
+
+    REPLACE svuota la tabella prima del caricamento, come il DELETE degli
+    script INSERT. I percorsi sono relativi: sqlldr va eseguito nella cartella
+    dei file.
+    """
+    names = [quote_identifier('oracle', c) for c in columns]
+    base = os.path.splitext(os.path.basename(data_file))[0]
+    fields = ",\n".join(f"  {name} CHAR({SQLLDR_MAX_FIELD_CHARS})" for name in names)
+    return (
+        f"-- sqlldr userid=<utente>@<db> control={base}.ctl log={base}.log\n"
+        "OPTIONS (DIRECT=TRUE, ERRORS=0)\n"
+        "LOAD DATA\n"
+        "CHARACTERSET AL32UTF8\n"
+        "LENGTH SEMANTICS CHAR\n"
+        f"INFILE '{os.path.basename(data_file)}'\n"
+        f"BADFILE '{base}.bad'\n"
+        "REPLACE\n"
+        f"INTO TABLE {qualified_table('oracle', schema, table)}\n"
+        "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"'\n"
+        "TRAILING NULLCOLS\n"
+        f"(\n{fields}\n)\n"
+    )
+
+# --- Generazione DDL (CREATE TABLE) dalle statistiche delle colonne ---
+
+@dataclass
+class ColumnStats:
+    """Statistiche di una colonna, aggiornate blocco per blocco da TableStats."""
+    name: str
+    rows: int = 0
+    nulls: int = 0
+    max_length: int = 0
+    min_int: int = None
+    max_int: int = None
+    int_digits: int = 0
+    scale: int = 0
+    has_time: bool = False
+
+    def __post_init__(self):
+        # Tipi ancora compatibili con tutti i valori visti finora
+        self.candidates = list(_TYPE_PATTERNS)
+
+    def update(self, values):
+        text, nulls = _column_text(values)
+        self.rows += len(text)
+        self.nulls += int(nulls.sum())
+        text = text[~nulls]
+        if len(text) == 0:
+            return
+        lengths = np.fromiter(map(len, text), dtype=np.int64, count=len(text))
+        self.max_length = max(self.max_length, int(lengths.max()))
+        # Un tipo viene scartato al primo blocco con un valore incompatibile
+        self.candidates = [k for k in self.candidates if _all_match_type(text, k)]
+        if 'decimal' in self.candidates:
+            dots = np.fromiter(map(str.find, text, itertools.repeat(".")), dtype=np.int64, count=len(text))
+            signs = np.fromiter(map(str.startswith, text, itertools.repeat(("+", "-"))), dtype=bool, count=len(text))
+            digits = np.where(dots < 0, lengths, dots) - signs
+            self.int_digits = max(self.int_digits, int(digits.max()))
+            self.scale = max(self.scale, int(np.where(dots < 0, 0, lengths - dots - 1).max()))
+        if 'integer' in self.candidates:
+            # Al massimo 18 cifre (vedi _TYPE_PATTERNS): entrano in int64
+            numbers = pd.to_numeric(pd.Series(text, dtype=object))
+            low, high = int(numbers.min()), int(numbers.max())
+            self.min_int = low if self.min_int is None else min(self.min_int, low)
+            self.max_int = high if self.max_int is None else max(self.max_int, high)
+        if 'timestamp' in self.candidates:
+            self.has_time = self.has_time or bool((lengths > 10).any())
+
+    @property
+    def kind(self):
+        """Tipo dedotto: il primo ancora compatibile, 'text' se nessuno (o colonna vuota)."""
+        if self.rows == self.nulls:
+            return 'text'
+        kind = self.candidates[0] if self.candidates else 'text'
+        if kind == 'timestamp' and not self.has_time:
+            kind = 'date'
+        return kind
+
+    @property
+    def nullable(self):
+        return self.nulls > 0 or self.rows == 0
+
+    def sql_type(self, db_type):
+        """Tipo SQL della colonna per db_type."""
+        kind = self.kind
+        if kind == 'integer':
+            if db_type == 'oracle':
+                return f"NUMBER({max(self.int_digits, 1)})"
+            if -32768 <= self.min_int and self.max_int <= 32767:
+                return "SMALLINT"
+            if -2147483648 <= self.min_int and self.max_int <= 2147483647:
+                return "INT" if db_type == 'sqlserver' else "INTEGER"
+            return "BIGINT"
+        if kind == 'decimal':
+            precision = min(max(self.int_digits + self.scale, 1), 38)
+            name = {'oracle': "NUMBER", 'postgres': "NUMERIC"}.get(db_type, "DECIMAL")
+            return f"{name}({precision}, {min(self.scale, precision)})"
+        if kind == 'boolean':
+            return {'postgres': "BOOLEAN", 'sqlserver': "BIT"}.get(db_type, "NUMBER(1)")
+        if kind == 'date':
+            return "DATE"
+        if kind == 'timestamp':
+            return "DATETIME2" if db_type == 'sqlserver' else "TIMESTAMP"
+        length = max(self.max_length, 1)
+        if db_type == 'sqlserver':
+            return f"NVARCHAR({length})" if length <= 4000 else "NVARCHAR(MAX)"
+        if db_type == 'oracle':
+            return f"VARCHAR2({length} CHAR)" if length <= 4000 else "CLOB"
+        return f"VARCHAR({length})"
+
+class TableStats:
+    """Statistiche per colonna raccolte in un'unica passata sui blocchi.
+
+    track(chunks) restituisce gli stessi chunk aggiornando le statistiche
+    man mano, così la raccolta avviene durante la conversione senza una
+    seconda lettura del file; create_table() genera poi la DDL.
+    """
+
+    def __init__(self):
+        self.columns = {}
+
+    def update(self, df):
+        values = df.values
+        for j, col in enumerate(df.columns):
+            if col not in self.columns:
+                self.columns[col] = ColumnStats(str(col))
+            self.columns[col].update(values[:, j])
+
+    def track(self, chunks):
+        for chunk in chunks:
+            self.update(chunk)
+            yield chunk
+
+    def create_table(self, db_type, schema, table):
+        """CREATE TABLE per db_type con tipi, lunghezze e NOT NULL dedotti dai dati."""
+        lines = []
+        for stats in self.columns.values():
+            null = "" if stats.nullable else " NOT NULL"
+            lines.append(f"    {quote_identifier(db_type, stats.name)} {stats.sql_type(db_type)}{null}")
+        body = ",\n".join(lines)
+        ddl = f"CREATE TABLE {qualified_table(db_type, schema, table)} (\n{body}\n);\n"
+        return ddl + "GO\n" if db_type == 'sqlserver' else ddl
+
+def format_upsert(db_type, schema, table, df, key_columns, batch_size=None, column_types=None):
+    """Genera statement di inserimento/aggiornamento per chiave, a blocchi di batch_size righe.
+
+    Postgres: INSERT ... VALUES ... ON CONFLICT (chiavi) DO UPDATE SET ...
+    SQL Server: MERGE con sorgente USING (VALUES ...) (max 1000 righe).
+    Oracle: MERGE con sorgente SELECT ... FROM DUAL UNION ALL ...
+    Le righe con chiave già presente vengono aggiornate, le altre inserite;
+    le chiavi devono essere uniche nel file. Tabella e colonne sono quotate
+    con la sintassi del database (vedi quote_identifier).
+    """
+    columns = df.columns.tolist()
+    missing = [c for c in key_columns if c not in columns]
+    if missing:
+        raise ValueError(f"Colonne chiave non presenti nel file: {', '.join(map(str, missing))}")
+    names = [quote_identifier(db_type, c) for c in columns]
+    keys = [n for c, n in zip(columns, names) if c in key_columns]
+    others = [n for c, n in zip(columns, names) if c not in key_columns]
+    table_ref = qualified_table(db_type, schema, table)
+    cols = ", ".join(names)
+
+    rendered = _render_columns(db_type, df, column_types)
+    if db_type == 'oracle':
+        # Oracle non ha il costruttore VALUES: ogni riga è una SELECT da DUAL
+        rows = ["SELECT " + ", ".join(f"{v} AS {n}" for v, n in zip(vals, names)) + " FROM DUAL"
+                for vals in zip(*rendered)]
+    else:
+        rows = ["(" + ", ".join(vals) + ")" for vals in zip(*rendered)]
+
+    batch_size = batch_size if batch_size and batch_size > 1 else 1
+    if db_type == 'sqlserver':
+        batch_size = min(batch_size, SQLSERVER_MAX_VALUES_ROWS)
+    on = " AND ".join(f"tgt.{k} = src.{k}" for k in keys)
+    update = ", ".join(f"tgt.{n} = src.{n}" for n in others)
+    insert = f"INSERT ({cols}) VALUES ({', '.join(f'src.{n}' for n in names)})"
+    statements = []
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        if db_type == 'postgres':
+            body = ",\n".join(batch)
+            if others:
+                action = "DO UPDATE SET " + ", ".join(f"{n} = EXCLUDED.{n}" for n in others)
             else:
-                # escape single quotes in values
-                values.append(f"'{str(val).replace(chr(39), chr(39)*2)}'")
-        vals = ", ".join(values)
-        # Build INSERT with safe identifiers. Use bracketed [schema].[table] as the
-        # canonical reference so it matches the DELETE/USE lines produced elsewhere
-        # in the code and the expectations in the test-suite.
-        table_ref = f'[{schema_safe}].[{table_safe}]'
-        statements.append(f'INSERT INTO {table_ref} ({cols}) VALUES ({vals});')
-
-    logging.info(f"Generati {len(statements)} statements INSERT")
+                action = "DO NOTHING"
+            statements.append(f"INSERT INTO {table_ref} ({cols}) VALUES\n{body}\n"
+                              f"ON CONFLICT ({', '.join(keys)}) {action};")
+        elif db_type == 'oracle':
+            body = " UNION ALL\n".join(f"  {row}" for row in batch)
+            matched = f"WHEN MATCHED THEN UPDATE SET {update}\n" if others else ""
+            statements.append(f"MERGE INTO {table_ref} tgt\nUSING (\n{body}\n) src\nON ({on})\n"
+                              f"{matched}WHEN NOT MATCHED THEN {insert};")
+        else:
+            body = ",\n".join(batch)
+            matched = f"WHEN MATCHED THEN UPDATE SET {update}\n" if others else ""
+            statements.append(f"MERGE INTO {table_ref} AS tgt\nUSING (VALUES\n{body}\n) AS src ({cols})\n"
+                              f"ON {on}\n{matched}WHEN NOT MATCHED THEN {insert};")
+    logging.info(f"Generati {len(statements)} statements di upsert ({len(rows)} righe, batch da {batch_size})")
     return "\n".join(statements)
 
-def load_csv_robust(file_path):
+# --- Conversione incrementale (delta) ---
+
+# Nome dell'attributo di DataFrame.attrs con l'operazione delle righe di un blocco delta
+DELTA_OP_ATTR = 'delta_op'
+
+def format_delta(db_type, schema, table, df, key_columns, batch_size=None, column_types=None):
+    """Genera gli statement di un blocco prodotto da DeltaIndex.
+
+    df.attrs[DELTA_OP_ATTR] indica l'operazione: 'insert' (come format_insert),
+    'update' (UPDATE ... SET ... WHERE chiave) o 'delete' (DELETE ... WHERE
+    chiave, con solo le colonne chiave). UPDATE e DELETE quotano tabella e
+    colonne con la sintassi del database, come format_upsert (vedi
+    quote_identifier).
     """
-    Carica un file CSV provando automaticamente diverse combinazioni di separatori e codifiche.
-    Restituisce il DataFrame o solleva un'eccezione se tutti i tentativi falliscono.
+    op = df.attrs.get(DELTA_OP_ATTR, 'insert')
+    if op == 'insert':
+        return format_insert(db_type, schema, table, df, batch_size, column_types)
+    table_ref = qualified_table(db_type, schema, table)
+    names = [quote_identifier(db_type, c) for c in df.columns.tolist()]
+    rendered = dict(zip(df.columns, _render_columns(db_type, df, column_types)))
+    keys = [f"{name} = " + rendered[col] for col, name in zip(df.columns, names) if col in key_columns]
+    where = [" AND ".join(vals) for vals in zip(*keys)]
+    if op == 'delete':
+        statements = [f"DELETE FROM {table_ref} WHERE {cond};" for cond in where]
+    else:
+        sets = [f"{name} = " + rendered[col] for col, name in zip(df.columns, names) if col not in key_columns]
+        statements = [f"UPDATE {table_ref} SET {', '.join(vals)} WHERE {cond};"
+                      for vals, cond in zip(zip(*sets), where)]
+    logging.info(f"Generati {len(statements)} statements {op.upper()}")
+    return "\n".join(statements)
+
+class DeltaIndex:
+    """Indice su disco (sqlite) chiave -> hash della riga, per la conversione incrementale.
+
+    filter(chunks) confronta ogni riga con l'indice dell'esecuzione
+    precedente e produce solo blocchi di righe nuove ('insert') o modificate
+    ('update'), seguiti dalle chiavi non più presenti ('delete'); vedi
+    format_delta. Le chiavi sono memorizzate come array JSON dei valori delle
+    key_columns, gli hash come 8 byte blake2b del testo della riga.
+
+    Il nuovo indice viene scritto in un file temporaneo e sostituisce il
+    precedente solo con commit(); senza indice precedente (o con chiavi
+    diverse) full_load è True e filter() lascia passare tutte le righe.
+    """
+
+    def __init__(self, path, key_columns):
+        import sqlite3
+        self.path = path
+        self.key_columns = list(key_columns)
+        self.inserted = self.updated = self.deleted = 0
+        self._tmp_path = f"{path}.tmp"
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+        self._conn = sqlite3.connect(self._tmp_path)
+        self._conn.executescript("""
+            PRAGMA journal_mode = OFF;
+            PRAGMA synchronous = OFF;
+            CREATE TABLE meta (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE rows (key TEXT PRIMARY KEY, hash BLOB NOT NULL) WITHOUT ROWID;
+            CREATE TEMP TABLE chunk (pos INTEGER PRIMARY KEY, key TEXT NOT NULL);
+        """)
+        self._conn.execute("INSERT INTO meta VALUES ('key_columns', ?)", (json.dumps(self.key_columns),))
+        self.full_load = True
+        if os.path.exists(path):
+            self._conn.execute("ATTACH DATABASE ? AS prev", (path,))
+            row = self._conn.execute("SELECT value FROM prev.meta WHERE name = 'key_columns'").fetchone()
+            if row is not None and json.loads(row[0]) == self.key_columns:
+                self.full_load = False
+            else:
+                logging.warning(f"Indice delta {path} con chiavi diverse: conversione completa")
+
+    def _keys_and_hashes(self, df):
+        missing = [c for c in self.key_columns if c not in df.columns]
+        if missing:
+            raise ValueError(f"Colonne chiave non presenti nel file: {', '.join(map(str, missing))}")
+        values = df.values
+        texts = []
+        key_texts = {}
+        for j, col in enumerate(df.columns):
+            text, nulls = _column_text(values[:, j])
+            if col in self.key_columns:
+                if nulls.any():
+                    raise ValueError(f"Valori NULL nella colonna chiave '{col}'")
+                key_texts[col] = text
+            text = text.copy()
+            text[nulls] = "\x00"
+            texts.append(text)
+        keys = [json.dumps(list(vals), ensure_ascii=False)
+                for vals in zip(*(key_texts[c] for c in self.key_columns))]
+        digest = hashlib.blake2b
+        hashes = [digest("\x1f".join(vals).encode("utf-8"), digest_size=8).digest() for vals in zip(*texts)]
+        return keys, hashes
+
+    def _previous_hashes(self, keys):
+        self._conn.executemany("INSERT INTO temp.chunk (pos, key) VALUES (?, ?)", enumerate(keys))
+        found = self._conn.execute(
+            "SELECT p.hash FROM temp.chunk c LEFT JOIN prev.rows p ON p.key = c.key ORDER BY c.pos").fetchall()
+        self._conn.execute("DELETE FROM temp.chunk")
+        return [h for (h,) in found]
+
+    def filter(self, chunks):
+        import sqlite3
+        for chunk in chunks:
+            keys, hashes = self._keys_and_hashes(chunk)
+            try:
+                self._conn.executemany("INSERT INTO rows VALUES (?, ?)", zip(keys, hashes))
+            except sqlite3.IntegrityError:
+                raise ValueError(f"Chiave duplicata nel file per le colonne {', '.join(self.key_columns)}")
+            if self.full_load:
+                self.inserted += len(chunk)
+                yield chunk
+                continue
+            previous = np.array(self._previous_hashes(keys), dtype=object)
+            current = np.array(hashes, dtype=object)
+            new = np.array([h is None for h in previous], dtype=bool)
+            changed = ~new & (previous != current)
+            for op, mask in (('insert', new), ('update', changed)):
+                if mask.any():
+                    rows = chunk[mask]
+                    rows.attrs[DELTA_OP_ATTR] = op
+                    if op == 'insert':
+                        self.inserted += len(rows)
+                    else:
+                        self.updated += len(rows)
+                    yield rows
+        if not self.full_load:
+            yield from self._deleted_rows()
+
+    def _deleted_rows(self):
+        cursor = self._conn.execute(
+            "SELECT key FROM prev.rows p WHERE NOT EXISTS (SELECT 1 FROM main.rows n WHERE n.key = p.key)")
+        while True:
+            batch = cursor.fetchmany(CHUNK_ROWS)
+            if not batch:
+                break
+            rows = pd.DataFrame([json.loads(key) for (key,) in batch], columns=self.key_columns, dtype=object)
+            rows.attrs[DELTA_OP_ATTR] = 'delete'
+            self.deleted += len(rows)
+            yield rows
+
+    def commit(self):
+        """Sostituisce l'indice precedente con quello della conversione appena terminata."""
+        self._conn.commit()
+        self._conn.close()
+        self._conn = None
+        os.replace(self._tmp_path, self.path)
+
+    def close(self):
+        """Chiude l'indice; senza commit() il file temporaneo viene eliminato e il precedente resta valido."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+            if os.path.exists(self._tmp_path):
+                os.remove(self._tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# Combinazioni da provare: (separatore, codifica)
+CSV_COMBINATIONS = [
+    (';', 'utf-16'),         # SQL Server export (UTF-16 con BOM)
+    (';', 'utf-16le'),       # UTF-16 Little Endian
+    (';', 'utf-16be'),       # UTF-16 Big Endian
+    (',', 'utf-8'),          # Standard internazionale
+    (';', 'utf-8'),          # Standard europeo UTF-8
+    (',', 'latin-1'),        # Standard internazionale con codifica europea
+    (';', 'latin-1'),        # Standard europeo con codifica europea
+    (',', 'cp1252'),         # Windows encoding
+    (';', 'cp1252'),         # Windows encoding con punto e virgola
+    ('\t', 'utf-8'),         # Tab-separated UTF-8
+    ('\t', 'latin-1'),       # Tab-separated latin-1
+    ('\t', 'utf-16'),        # Tab-separated UTF-16
+    ('|', 'utf-8'),          # Pipe-separated UTF-8
+    ('|', 'latin-1'),        # Pipe-separated latin-1
+    ('|', 'utf-16'),         # Pipe-separated UTF-16
+    (',', 'utf-16'),         # Comma-separated UTF-16
+    (',', 'utf-16le'),       # Comma-separated UTF-16 Little Endian
+    ('\t', 'utf-16le'),      # Tab-separated UTF-16 Little Endian
+    ('|', 'utf-16le'),       # Pipe-separated UTF-16 Little Endian
+    (',', 'utf-16be'),       # Comma-separated UTF-16 Big Endian
+    ('\t', 'utf-16be'),      # Tab-separated UTF-16 Big Endian
+    ('|', 'utf-16be'),       # Pipe-separated UTF-16 Big Endian
+]
+
+# Dimensione massima del campione letto per rilevare separatore e codifica
+CSV_SNIFF_SAMPLE_BYTES = 1024 * 1024
+
+# BOM riconosciuti e codifiche compatibili, provate per prime
+_BOM_ENCODINGS = [
+    (codecs.BOM_UTF8, ('utf-8',)),
+    (codecs.BOM_UTF16_LE, ('utf-16', 'utf-16le')),
+    (codecs.BOM_UTF16_BE, ('utf-16', 'utf-16be')),
+]
+
+# Cache su disco dei dialetti rilevati, indicizzata per percorso, dimensione e mtime
+DIALECT_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".excel_to_sql_converter", "dialect_cache.json")
+DIALECT_CACHE_MAX_ENTRIES = 500
+
+@dataclass
+class CSVDialect:
+    """Dialetto rilevato per un file CSV, riutilizzabile per ogni lettura dello stesso file."""
+    separator: str
+    encoding: str
+    header: int = 0
+    score: float = 0.0
+    num_cols: int = 0
+    non_empty_rows: int = 0
+
+    def read_csv_kwargs(self):
+        """Parametri da passare a pd.read_csv per leggere il file con questo dialetto."""
+        return {'sep': self.separator, 'encoding': self.encoding, 'header': self.header, 'dtype': str}
+
+    def as_info(self):
+        """Dizionario {'separator', 'encoding'} restituito storicamente da load_csv_robust."""
+        return {'separator': self.separator, 'encoding': self.encoding}
+
+def score_dataframe(df):
+    # Heuristic scoring for DataFrame quality
+    num_cols = len(df.columns)
+    non_empty_rows = len(df.dropna(how='all'))
+    col_names = df.columns.tolist()
+
+    # Penalize if all columns are unnamed or empty
+    num_unnamed = sum(
+        (
+            (isinstance(col, str) and (col.startswith("Unnamed") or col.strip() == "")) or
+            not isinstance(col, str)
+        )
+        for col in col_names
+    )
+
+    # Penalize BOM and control characters in column names
+    bom_penalty = 0
+    for col in col_names:
+        if isinstance(col, str):
+            # Check for BOM characters (UTF-16 BOM: \ufeff, \ufffe, or other control chars)
+            if any(ord(c) < 32 or ord(c) in [0xfeff, 0xfffe, 0xfffd] for c in col):
+                bom_penalty += 10
+
+    unique_names = len(set(col_names))
+    # Penalize if all column names are the same
+    col_name_quality = (unique_names / num_cols) if num_cols > 0 else 0
+    # Penalize if most columns are unnamed
+    unnamed_penalty = num_unnamed / num_cols if num_cols > 0 else 1
+
+    # Data consistency: fraction of rows with at least half non-null columns
+    if num_cols > 0 and len(df) > 0:
+        sufficient_data_rows = (df.notnull().sum(axis=1) >= (num_cols // 2)).sum()
+        data_consistency = sufficient_data_rows / len(df)
+    else:
+        data_consistency = 0
+
+    # Final score: weighted sum with BOM penalty
+    score = num_cols * 0.5 + non_empty_rows * 0.2 + col_name_quality * 10 + data_consistency * 10 - unnamed_penalty * 5 - bom_penalty
+    return score, num_cols, non_empty_rows
+
+# Le pagine della mappatura già lette vengono rilasciate a blocchi di questa
+# dimensione, così il file mappato non si accumula nella memoria del processo
+MAPPED_RELEASE_BYTES = 16 * 1024 * 1024
+
+class _MappedInput(io.RawIOBase):
+    """File binario in sola lettura sopra una mappatura mmap dell'intero file.
+
+    pd.read_csv lo tratta come un handle binario (e lo decodifica con la
+    codifica indicata); read() e readinto() copiano direttamente dalla
+    mappatura, senza il buffer di un file aperto con open(). Durante la
+    lettura sequenziale le pagine già consumate vengono rilasciate con
+    MADV_DONTNEED (dove disponibile): restano nella cache del sistema, ma non
+    contano più nel picco di memoria del processo.
+    """
+
+    def __init__(self, mapped):
+        super().__init__()
+        self._mapped = mapped
+        self._released = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def read(self, size=-1):
+        data = self._mapped.read(size if size is not None and size >= 0 else None)
+        self._release()
+        return data
+
+    def readinto(self, buffer):
+        pos = self._mapped.tell()
+        n = min(len(buffer), len(self._mapped) - pos)
+        with memoryview(self._mapped) as view:
+            buffer[:n] = view[pos:pos + n]
+        self._mapped.seek(pos + n)
+        self._release()
+        return n
+
+    def _release(self):
+        import mmap
+        end = self._mapped.tell() // mmap.PAGESIZE * mmap.PAGESIZE
+        if end - self._released < MAPPED_RELEASE_BYTES or not hasattr(mmap, 'MADV_DONTNEED'):
+            return
+        self._mapped.madvise(mmap.MADV_DONTNEED, self._released, end - self._released)
+        self._released = end
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        self._mapped.seek(offset, whence)
+        # Tornando indietro le pagine rilasciate vengono rilette dalla cache
+        self._released = min(self._released, self._mapped.tell() // MAPPED_RELEASE_BYTES * MAPPED_RELEASE_BYTES)
+        return self._mapped.tell()
+
+    def tell(self):
+        return self._mapped.tell()
+
+@contextmanager
+def map_input(file_path):
+    """Apre il file di input mappato in memoria (mmap, sola lettura), come file binario.
+
+    La stessa mappatura serve sia al rilevamento del dialetto (sniff_csv con
+    source) sia alla lettura vera e propria con pd.read_csv: il file viene
+    aperto una sola volta e i dati letti dal rilevamento restano nella cache
+    delle pagine. I file vuoti o non mappabili vengono aperti normalmente.
+    """
+    import mmap
+
+    with open(file_path, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            mapped = None
+        if mapped is None:
+            yield f
+            return
+        try:
+            if hasattr(mapped, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            yield _MappedInput(mapped)
+        finally:
+            mapped.close()
+
+def _decode_sample(raw, encoding, complete):
+    """Decodifica il campione; se il file è stato troncato scarta l'ultima riga parziale."""
+    text = codecs.getincrementaldecoder(encoding)().decode(raw, final=complete)
+    if not complete:
+        last_newline = text.rfind("\n")
+        if last_newline >= 0:
+            text = text[:last_newline + 1]
+    return text
+
+def _trim_to_record(text):
+    """
+    Tronca text all'ultimo a capo fuori da un campo tra virgolette: un a capo
+    separa due record solo se prima di esso il numero di virgolette è pari
+    (le virgolette raddoppiate "" contano due volte e non cambiano la parità).
+    """
+    quotes = text.count('"')
+    end = len(text)
+    while True:
+        last_newline = text.rfind("\n", 0, end)
+        if last_newline < 0:
+            return ""
+        quotes -= text.count('"', last_newline, end)
+        if quotes % 2 == 0:
+            return text[:last_newline + 1]
+        end = last_newline
+
+def _read_sample(text, sep, complete):
+    """
+    Legge il campione decodificato con il separatore sep. Se il campione è
+    troncato e il taglio all'ultimo a capo cade dentro un campo tra virgolette
+    su più righe, pandas segnala un errore ("EOF inside string"): il campione
+    viene allora tagliato all'ultimo record completo e riletto.
+    """
+    try:
+        return pd.read_csv(io.StringIO(text), sep=sep, dtype=str)
+    except pd.errors.ParserError:
+        if complete:
+            raise
+        trimmed = _trim_to_record(text)
+        if not trimmed or trimmed == text:
+            raise
+        return pd.read_csv(io.StringIO(trimmed), sep=sep, dtype=str)
+
+def sniff_csv(file_path, sample_bytes=None, source=None):
     """
-    # Combinazioni da provare: (separatore, codifica)
-    combinations = [
-        (';', 'utf-16'),         # SQL Server export (UTF-16 con BOM)
-        (';', 'utf-16le'),       # UTF-16 Little Endian
-        (';', 'utf-16be'),       # UTF-16 Big Endian
-        (',', 'utf-8'),          # Standard internazionale
-        (';', 'utf-8'),          # Standard europeo UTF-8
-        (',', 'latin-1'),        # Standard internazionale con codifica europea
-        (';', 'latin-1'),        # Standard europeo con codifica europea
-        (',', 'cp1252'),         # Windows encoding
-        (';', 'cp1252'),         # Windows encoding con punto e virgola
-        ('\t', 'utf-8'),         # Tab-separated UTF-8
-        ('\t', 'latin-1'),       # Tab-separated latin-1
-        ('\t', 'utf-16'),        # Tab-separated UTF-16
-        ('|', 'utf-8'),          # Pipe-separated UTF-8
-        ('|', 'latin-1'),        # Pipe-separated latin-1
-        ('|', 'utf-16'),         # Pipe-separated UTF-16
-    ]
-    
+    Rileva separatore e codifica di un CSV leggendo una sola volta al massimo
+    sample_bytes (default CSV_SNIFF_SAMPLE_BYTES) dal disco. Tutte le
+    combinazioni vengono valutate in memoria sullo stesso campione con
+    score_dataframe. source è il file già aperto (vedi map_input), da cui il
+    campione viene letto dall'inizio.
+
+    Restituisce (sample_df, dialect, complete): il DataFrame del campione per la
+    combinazione migliore, il CSVDialect rilevato e un flag che indica se il
+    campione contiene l'intero file. Solleva CSVLoadError se nessuna
+    combinazione è valida.
+    """
+    if sample_bytes is None:
+        sample_bytes = CSV_SNIFF_SAMPLE_BYTES
+    if source is not None:
+        source.seek(0)
+        raw = source.read(sample_bytes + 1)
+    else:
+        with open(file_path, 'rb') as f:
+            raw = f.read(sample_bytes + 1)
+    complete = len(raw) <= sample_bytes
+    raw = raw[:sample_bytes]
+
+    # Con un BOM si provano prima le codifiche compatibili; le altre servono
+    # solo se nessuna di queste riesce a leggere il campione.
+    preferred = ()
+    for bom, encodings in _BOM_ENCODINGS:
+        if raw.startswith(bom):
+            preferred = encodings
+            break
+    candidates = [c for c in CSV_COMBINATIONS if c[1] in preferred]
+    fallback = [c for c in CSV_COMBINATIONS if c[1] not in preferred]
+
     best_df = None
     best_score = -1
-    best_combination = None
-    best_info = None
+    best_dialect = None
     errors = []
-    
-    def score_dataframe(df):
-        # Heuristic scoring for DataFrame quality
-        num_cols = len(df.columns)
-        non_empty_rows = len(df.dropna(how='all'))
-        col_names = df.columns.tolist()
-        
-        # Penalize if all columns are unnamed or empty
-        num_unnamed = sum(
-            (
-                (isinstance(col, str) and (col.startswith("Unnamed") or col.strip() == "")) or
-                not isinstance(col, str)
-            )
-            for col in col_names
-        )
-        
-        # Penalize BOM and control characters in column names
-        bom_penalty = 0
-        for col in col_names:
-            if isinstance(col, str):
-                # Check for BOM characters (UTF-16 BOM: \ufeff, \ufffe, or other control chars)
-                if any(ord(c) < 32 or ord(c) in [0xfeff, 0xfffe, 0xfffd] for c in col):
-                    bom_penalty += 10
-        
-        unique_names = len(set(col_names))
-        # Penalize if all column names are the same
-        col_name_quality = (unique_names / num_cols) if num_cols > 0 else 0
-        # Penalize if most columns are unnamed
-        unnamed_penalty = num_unnamed / num_cols if num_cols > 0 else 1
-        
-        # Data consistency: fraction of rows with at least half non-null columns
-        if num_cols > 0 and len(df) > 0:
-            sufficient_data_rows = (df.notnull().sum(axis=1) >= (num_cols // 2)).sum()
-            data_consistency = sufficient_data_rows / len(df)
-        else:
-            data_consistency = 0
-        
-        # Final score: weighted sum with BOM penalty
-        score = num_cols * 0.5 + non_empty_rows * 0.2 + col_name_quality * 10 + data_consistency * 10 - unnamed_penalty * 5 - bom_penalty
-        return score, num_cols, non_empty_rows
-    
+    decoded = {}
+    for group in (candidates, fallback):
+        for sep, encoding in group:
+            try:
+                # Ogni codifica viene decodificata una sola volta (anche in caso di errore)
+                if encoding not in decoded:
+                    try:
+                        decoded[encoding] = _decode_sample(raw, encoding, complete)
+                    except UnicodeDecodeError as e:
+                        decoded[encoding] = e
+                if isinstance(decoded[encoding], Exception):
+                    raise decoded[encoding]
+                df = _read_sample(decoded[encoding], sep, complete)
+                score, num_cols, non_empty_rows = score_dataframe(df)
+                logging.info(f"Tentativo {sep}|{encoding}: {num_cols} colonne, {non_empty_rows} righe con dati, score={score:.2f}")
+                if score > best_score:
+                    best_df = df
+                    best_score = score
+                    best_dialect = CSVDialect(sep, encoding, score=float(score),
+                                              num_cols=int(num_cols), non_empty_rows=int(non_empty_rows))
+            except Exception as e:
+                errors.append(f"{sep}|{encoding}: {str(e)}")
+                continue
+        if best_df is not None:
+            break
+
+    if best_df is None:
+        error_msg = "Impossibile caricare il CSV con nessuna combinazione. Errori: " + "; ".join(errors)
+        logging.error(error_msg)
+        raise CSVLoadError(error_msg)
+    return best_df, best_dialect, complete
+
+def _dialect_cache_key(file_path):
+    st = os.stat(file_path)
+    return os.path.abspath(file_path), st.st_size, st.st_mtime_ns
+
+def _read_dialect_cache():
+    try:
+        with open(DIALECT_CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def _write_dialect_cache(file_path, dialect):
+    """Salva il dialetto nella cache; eventuali errori di scrittura vengono solo registrati nel log."""
+    path, size, mtime_ns = _dialect_cache_key(file_path)
+    cache = _read_dialect_cache()
+    cache.pop(path, None)
+    cache[path] = {'size': size, 'mtime_ns': mtime_ns, 'dialect': asdict(dialect)}
+    # Mantiene solo le voci più recenti (l'ordine di inserimento fa da LRU)
+    while len(cache) > DIALECT_CACHE_MAX_ENTRIES:
+        cache.pop(next(iter(cache)))
+    try:
+        os.makedirs(os.path.dirname(DIALECT_CACHE_FILE), exist_ok=True)
+        tmp_file = f"{DIALECT_CACHE_FILE}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+        os.replace(tmp_file, DIALECT_CACHE_FILE)
+    except OSError as e:
+        logging.warning(f"Impossibile aggiornare la cache dei dialetti CSV: {e}")
+
+def _cached_dialect(file_path):
+    path, size, mtime_ns = _dialect_cache_key(file_path)
+    entry = _read_dialect_cache().get(path)
+    if not entry or entry.get('size') != size or entry.get('mtime_ns') != mtime_ns:
+        return None
+    try:
+        return CSVDialect(**entry['dialect'])
+    except (KeyError, TypeError):
+        return None
+
+def _detect_csv_dialect(file_path, use_cache=True, source=None):
+    """Come detect_csv_dialect, ma restituisce anche (sample_df, complete) di sniff_csv.
+
+    In caso di cache hit sample_df è None: il file non è stato letto.
+    """
+    if use_cache:
+        dialect = _cached_dialect(file_path)
+        if dialect is not None:
+            logging.info(f"Dialetto CSV letto dalla cache: separatore '{dialect.separator}', codifica '{dialect.encoding}'")
+            return dialect, None, False
+    sample_df, dialect, complete = sniff_csv(file_path, source=source)
+    if use_cache:
+        _write_dialect_cache(file_path, dialect)
+    return dialect, sample_df, complete
+
+def detect_csv_dialect(file_path, use_cache=True, source=None):
+    """
+    Rileva separatore, codifica e riga di intestazione di un CSV e restituisce
+    un CSVDialect. Il risultato viene memorizzato in DIALECT_CACHE_FILE: finché
+    percorso, dimensione e mtime del file non cambiano il rilevamento viene
+    saltato del tutto. source è il file già aperto da cui leggere il campione
+    (vedi map_input).
+    """
+    return _detect_csv_dialect(file_path, use_cache, source)[0]
+
+def _check_csv_shape(num_cols, non_empty_rows):
+    # Validazione aggiuntiva: se il DataFrame ha una sola colonna e nessuna riga utile, probabilmente il file è corrotto o non valido
+    if num_cols <= 1 or non_empty_rows == 0:
+        error_msg = (f"CSV caricato ma sospetto: {num_cols} colonne, {non_empty_rows} righe con dati. "
+                     f"Probabile file non valido o corrotto.")
+        logging.error(error_msg)
+        raise CSVLoadError(error_msg)
+
+def load_csv_robust(file_path, use_cache=True):
+    """
+    Carica un file CSV provando automaticamente diverse combinazioni di separatori e codifiche.
+    Restituisce il DataFrame o solleva un'eccezione se tutti i tentativi falliscono.
+
+    Il rilevamento lavora su un campione limitato (vedi detect_csv_dialect), quindi
+    il file viene letto per intero una sola volta; se il campione contiene già
+    tutto il file il suo DataFrame viene riutilizzato direttamente. Campione e
+    lettura completa usano la stessa mappatura del file (vedi map_input).
+    """
     file_size_mb = os.path.getsize(file_path) / (1024 * 1024)
     if file_size_mb > 100:
         logging.warning(f"File molto grande: {file_size_mb:.1f} MB. Potrebbero verificarsi problemi di memoria.")
-    chunking = file_size_mb > 10
-    for sep, encoding in combinations:
+    with map_input(file_path) as source:
+        dialect, best_df, complete = _detect_csv_dialect(file_path, use_cache, source)
+        if best_df is None or not complete:
+            source.seek(0)
+            best_df = pd.read_csv(source, **dialect.read_csv_kwargs())
+
+    logging.info(f"CSV caricato con successo usando separatore '{dialect.separator}' e codifica '{dialect.encoding}'")
+    logging.info(f"Colonne rilevate: {list(best_df.columns)}")
+    _check_csv_shape(len(best_df.columns), len(best_df.dropna(how='all')))
+    return best_df, dialect.as_info()
+
+# Motori per la lettura a blocchi dei CSV grandi
+CSV_ENGINES = ('pandas', 'pyarrow')
+
+# Byte elaborati da pyarrow per ogni blocco del lettore in streaming
+ARROW_BLOCK_BYTES = 4 * 1024 * 1024
+
+# Valori che pd.read_csv legge come NULL (i valori NA predefiniti di pandas):
+# il motore pyarrow usa la stessa lista, così i due motori producono lo stesso script
+CSV_NA_VALUES = ('', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+                 '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null')
+
+def _pyarrow_available():
+    """True se pyarrow.csv è installato, senza importare pyarrow (vedi iter_arrow_chunks)."""
+    from importlib.machinery import PathFinder
+    from importlib.util import find_spec
+    try:
+        spec = find_spec("pyarrow")
+        # find_spec("pyarrow.csv") importerebbe il pacchetto: il sottomodulo si cerca nel suo percorso
+        return (spec is not None and spec.submodule_search_locations is not None
+                and PathFinder.find_spec("csv", spec.submodule_search_locations) is not None)
+    except (ImportError, ValueError):
+        return False
+
+def iter_arrow_chunks(source, dialect, chunksize=None):
+    """
+    Legge un CSV con il lettore in streaming di pyarrow (pyarrow.csv.open_csv:
+    parsing su più thread, colonne come stringhe Arrow) e restituisce
+    DataFrame di circa chunksize righe (default CHUNK_ROWS).
+
+    source è un percorso o un file binario (vedi map_input), letto
+    dall'inizio con il dialect rilevato. Nomi delle colonne e valori NULL sono
+    gli stessi di pd.read_csv(dtype=str): l'intestazione viene letta con
+    pandas e tutte le colonne restano stringhe. A differenza di pandas, una
+    riga con un numero di campi diverso dall'intestazione è un errore.
+    """
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    if chunksize is None:
+        chunksize = CHUNK_ROWS
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    columns = [str(c) for c in pd.read_csv(source, nrows=0, **dialect.read_csv_kwargs()).columns]
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    reader = pa_csv.open_csv(
+        source,
+        read_options=pa_csv.ReadOptions(encoding=dialect.encoding, column_names=columns,
+                                        skip_rows=dialect.header + 1, block_size=ARROW_BLOCK_BYTES,
+                                        use_threads=True),
+        parse_options=pa_csv.ParseOptions(delimiter=dialect.separator),
+        convert_options=pa_csv.ConvertOptions(column_types={c: pa.string() for c in columns},
+                                              null_values=list(CSV_NA_VALUES), strings_can_be_null=True),
+    )
+    batches = []
+    rows = 0
+    for batch in reader:
+        batches.append(batch)
+        rows += batch.num_rows
+        if rows >= chunksize:
+            yield pa.Table.from_batches(batches).to_pandas()
+            batches = []
+            rows = 0
+    if batches:
+        yield pa.Table.from_batches(batches).to_pandas()
+
+def _excel_columns(header):
+    """Nomi colonna dalla riga di intestazione, con le stesse regole di pd.read_excel.
+
+    Le celle vuote diventano 'Unnamed: N' e i duplicati ricevono il suffisso '.1', '.2', ...
+    """
+    columns = []
+    seen = {}
+    for i, name in enumerate(header):
+        name = f"Unnamed: {i}" if name is None else str(name)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        columns.append(name)
+    return columns
+
+def iter_excel_chunks(file_path, chunksize=None, sheet_name=None, stats=None, workbook=None):
+    """
+    Legge un foglio .xlsx in streaming (openpyxl read_only) e restituisce
+    DataFrame di al massimo chunksize righe (default CHUNK_ROWS).
+
+    La memoria occupata resta limitata a un blocco di righe indipendentemente
+    dalla dimensione del foglio. I valori sono lasciati come oggetti Python
+    (dtype object), quindi ogni cella viene resa esattamente come in Excel.
+    Come pd.read_excel, la prima riga non vuota fa da intestazione e le righe
+    completamente vuote vengono ignorate. Se viene passato un dizionario stats,
+    all'apertura del foglio vi viene scritta la stima 'total_rows' (dalle
+    dimensioni dichiarate nel file), utile per l'avanzamento. workbook è una
+    cartella già aperta in read_only (vedi _open_workbook), che resta aperta.
+    """
+    if chunksize is None:
+        chunksize = CHUNK_ROWS
+    wb = workbook if workbook is not None else _open_workbook(file_path)
+    try:
+        ws = wb[sheet_name] if sheet_name is not None else wb.worksheets[0]
+        if stats is not None:
+            stats['total_rows'] = max(ws.max_row - 1, 0) if ws.max_row else None
+        rows = (row for row in ws.iter_rows(values_only=True) if any(v is not None for v in row))
+        header = next(rows, None)
+        if header is None:
+            return
+        header = list(header)
+        # Le celle vuote in coda all'intestazione sono solo formattazione
+        while header and header[-1] is None:
+            header.pop()
+        columns = _excel_columns(header)
+        width = len(columns)
+        batch = []
+        truncated = False
+        for row in rows:
+            if len(row) > width and not truncated and any(v is not None for v in row[width:]):
+                logging.warning(f"Valori oltre la colonna {width} ignorati: nessuna intestazione corrispondente")
+                truncated = True
+            row = row[:width]
+            if len(row) < width:
+                row = row + (None,) * (width - len(row))
+            batch.append(row)
+            if len(batch) >= chunksize:
+                yield pd.DataFrame(batch, columns=columns, dtype=object)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=columns, dtype=object)
+    finally:
+        if workbook is None:
+            wb.close()
+
+def _open_workbook(file_path):
+    """Apre la cartella di lavoro: openpyxl read_only per .xlsx/.xlsm, pd.ExcelFile per .xls."""
+    if os.path.splitext(file_path)[1].lower() in ('.xlsx', '.xlsm'):
+        from openpyxl import load_workbook
+        return load_workbook(file_path, read_only=True, data_only=True)
+    return pd.ExcelFile(file_path)
+
+def list_excel_sheets(file_path, workbook=None):
+    """Nomi dei fogli di lavoro della cartella, nell'ordine del file (i fogli grafico sono esclusi)."""
+    wb = workbook if workbook is not None else _open_workbook(file_path)
+    try:
+        if isinstance(wb, pd.ExcelFile):
+            return list(wb.sheet_names)
+        return [ws.title for ws in wb.worksheets]
+    finally:
+        if workbook is None:
+            wb.close()
+
+def sheet_slug(sheet_name):
+    """Nome del foglio utilizzabile in nomi di file e tabelle ('Vendite 2024' -> 'Vendite_2024')."""
+    return re.sub(r'\W+', '_', str(sheet_name)).strip('_') or 'foglio'
+
+def _iter_rendered_chunks(chunks, render, workers=None):
+    """Genera (righe, testo) per ogni chunk, nello stesso ordine dei chunk in ingresso.
+
+    render è una funzione di modulo (o un functools.partial) che converte un
+    DataFrame in testo, es. format_insert o format_copy. Con workers > 1 il
+    rendering avviene in un ProcessPoolExecutor; al massimo 2 * workers chunk
+    sono in lavorazione contemporaneamente, così la memoria resta limitata
+    anche se la lettura è più veloce del rendering. Nell'eseguibile
+    PyInstaller il pool funziona solo perché main() chiama freeze_support():
+    un punto di ingresso diverso deve fare lo stesso.
+    """
+    if not workers or workers <= 1:
+        for chunk in chunks:
+            yield len(chunk), render(chunk)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    max_in_flight = workers * 2
+    pending = deque()
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        for chunk in chunks:
+            pending.append((len(chunk), pool.submit(render, chunk)))
+            if len(pending) >= max_in_flight:
+                rows, future = pending.popleft()
+                yield rows, future.result()
+        while pending:
+            rows, future = pending.popleft()
+            yield rows, future.result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+# Estensione aggiunta ai file di output compressi
+COMPRESSION_EXTENSIONS = {'gzip': '.gz', 'zstd': '.zst'}
+
+# Con split_bytes i blocchi vengono suddivisi in pezzi di al massimo tante righe,
+# così ogni parte si chiude vicino al limite di dimensione; un pezzo che da
+# solo supera il limite viene diviso di nuovo (vedi _stream_chunks)
+SPLIT_PIECE_ROWS = 10000
+
+# Dimensione del buffer di scrittura: il testo codificato viene accumulato e
+# scritto su disco in blocchi di questa dimensione
+OUTPUT_BUFFER_BYTES = 1024 * 1024
+
+def _open_output(path, compression=None):
+    """Apre path in scrittura binaria, compresso al volo con gzip o zstd se richiesto."""
+    if compression is None:
+        return open(path, "wb")
+    if compression == 'gzip':
+        import gzip
+        return gzip.open(path, "wb")
+    if compression == 'zstd':
         try:
-            if chunking:
-                # Carica solo il primo chunk per scoring
-                chunk_iter = pd.read_csv(file_path, sep=sep, encoding=encoding, dtype=str, chunksize=100000)
-                df = next(chunk_iter)
+            import zstandard
+        except ImportError:
+            raise ValueError("La compressione zstd richiede il pacchetto 'zstandard' (pip install zstandard)")
+        return zstandard.open(path, "wb")
+    raise ValueError(f"Compressione non supportata: {compression}")
+
+class _OutputWriter:
+    """Scrittura bufferizzata del testo generato in un file binario.
+
+    Ogni testo viene codificato in UTF-8 una sola volta e accumulato in un
+    bytearray riutilizzato, scritto su disco quando supera buffer_size; i
+    blocchi più grandi del buffer vengono scritti direttamente. newline
+    funziona come in open(): None usa il separatore di riga del sistema.
+    bytes_written conta i byte (non compressi) scritti finora; encoded_len()
+    quelli che occuperebbe un testo, separatori di riga compresi.
+    """
+
+    def __init__(self, raw, buffer_size=None, newline=None):
+        self._raw = raw
+        self._buffer = bytearray()
+        self._buffer_size = buffer_size or OUTPUT_BUFFER_BYTES
+        self._newline = os.linesep if newline is None else newline
+        self.bytes_written = 0
+
+    def write(self, text):
+        if self._newline != "\n":
+            text = text.replace("\n", self._newline)
+        data = text.encode("utf-8")
+        self.bytes_written += len(data)
+        if len(self._buffer) + len(data) > self._buffer_size:
+            self.flush()
+            if len(data) >= self._buffer_size:
+                self._raw.write(data)
+                return
+        self._buffer += data
+
+    def encoded_len(self, text):
+        extra = text.count("\n") * (len(self._newline) - 1) if self._newline != "\n" else 0
+        return _utf8_len(text) + extra
+
+    def flush(self):
+        if self._buffer:
+            self._raw.write(self._buffer)
+            self._buffer.clear()
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self._raw.close()
+
+def output_path(out_file, part=None, compression=None):
+    """Percorso di una parte dell'output: base.part001.sql(.gz) se part è indicata."""
+    if part is not None:
+        base, ext = os.path.splitext(out_file)
+        out_file = f"{base}.part{part:03d}{ext}"
+    return out_file + COMPRESSION_EXTENSIONS.get(compression, "")
+
+def _slice_chunks(chunks, max_rows=None, boundary=None):
+    """Suddivide i chunk in pezzi di al massimo max_rows righe che non attraversano
+    i multipli di boundary (conteggiati dall'inizio del file)."""
+    done = 0
+    for chunk in chunks:
+        start = 0
+        while start < len(chunk):
+            take = len(chunk) - start
+            if max_rows:
+                take = min(take, max_rows)
+            if boundary:
+                take = min(take, boundary - done % boundary)
+            piece = chunk if take == len(chunk) else chunk.iloc[start:start + take]
+            yield piece
+            start += take
+            done += take
+
+def _stream_chunks(out_file, chunks, render, workers=None, prefix=None, suffix="", newline=None,
+                   progress=None, position=None, total_bytes=0, cancel_event=None,
+                   compression=None, split_rows=None, split_bytes=None, written=None, buffer_size=None,
+                   metrics=None):
+    """Scrive in out_file il testo di ogni chunk; restituisce (righe totali, colonne).
+
+    prefix(colonne, parte) produce l'intestazione, scritta dopo aver letto il
+    primo chunk così da conoscere le colonne; suffix chiude ogni parte che
+    contiene dati. Con split_rows o split_bytes l'output viene diviso in parti
+    numerate (vedi output_path) di al massimo tante righe o byte non compressi,
+    ciascuna con intestazione e chiusura proprie. Con split_bytes un pezzo che
+    non entra da solo in una parte viene riconvertito in pezzi più piccoli:
+    il limite viene superato solo da una singola riga più grande di una parte
+    (intestazione e chiusura comprese). compression ('gzip' o 'zstd')
+    comprime ogni file al volo. I percorsi creati vengono aggiunti a written.
+    I chunk vengono convertiti a blocchi di al massimo CHUNK_ROWS righe, anche
+    quando il file è stato caricato tutto in memoria, e scritti con
+    _OutputWriter (buffer di buffer_size byte).
+
+    Dopo ogni chunk chiama progress(ConversionProgress) se indicata, usando
+    position() per i byte letti. Se cancel_event viene impostato la scrittura
+    si interrompe prima del chunk successivo. Con metrics (ConversionMetrics)
+    vengono misurate le fasi render e write; la lettura va misurata
+    avvolgendo chunks con metrics.timed('read', ...).
+    """
+    def check_cancelled():
+        if cancel_event is not None and cancel_event.is_set():
+            raise ConversionCancelled("Conversione annullata dall'utente")
+
+    written = [] if written is None else written
+    split = bool(split_rows or split_bytes)
+    part = 0
+    out = None
+    part_rows = 0
+
+    def open_part():
+        nonlocal part, out, part_rows
+        if out is not None:
+            out.write(suffix)
+            out.close()
+        part += 1
+        path = output_path(out_file, part if split else None, compression)
+        written.append(path)
+        out = _OutputWriter(_open_output(path, compression), buffer_size, newline)
+        if prefix is not None:
+            out.write(prefix(columns, part))
+        part_rows = 0
+
+    def fits(text):
+        return out.bytes_written + out.encoded_len(text + "\n") + out.encoded_len(suffix) <= split_bytes
+
+    def write_piece(piece, rows, text):
+        nonlocal part_rows
+        if part_rows and ((split_rows and part_rows + rows > split_rows) or (split_bytes and not fits(text))):
+            open_part()
+        if split_bytes and rows > 1 and not fits(text):
+            # Il pezzo non entra da solo in una parte: viene riconvertito in pezzi
+            # di righe proporzionate allo spazio libero (almeno dimezzati)
+            room = split_bytes - out.bytes_written - out.encoded_len(suffix)
+            step = max(1, min(rows // 2, rows * room // out.encoded_len(text + "\n")))
+            for begin in range(0, rows, step):
+                sub = piece.iloc[begin:begin + step]
+                write_piece(sub, len(sub), render(sub))
+            return
+        out.write(text)
+        out.write("\n")
+        part_rows += rows
+
+    start = time.perf_counter()
+    total_rows = 0
+    check_cancelled()
+    chunks = iter(chunks)
+    first = next(chunks, None)
+    columns = [] if first is None else list(first.columns)
+    try:
+        open_part()
+        if first is None:
+            return total_rows, columns
+        chunks = itertools.chain([first], chunks)
+        chunks = _slice_chunks(chunks, SPLIT_PIECE_ROWS if split_bytes else CHUNK_ROWS, split_rows)
+        pieces = deque()
+        if split_bytes:
+            # I pezzi restano disponibili finché il loro testo non è scritto, per riconvertirli
+            chunks = (pieces.append(piece) or piece for piece in chunks)
+        rendered = _iter_rendered_chunks(chunks, render, workers)
+        if metrics is not None:
+            rendered = _timed_render(rendered, metrics)
+        for rows, text in rendered:
+            if metrics is not None:
+                write_start = time.perf_counter()
+            piece = pieces.popleft() if split_bytes else None
+            if text:
+                write_piece(piece, rows, text)
+            if metrics is not None:
+                metrics.write += time.perf_counter() - write_start
+            total_rows += rows
+            if progress is not None:
+                bytes_read = position() if position is not None else total_bytes
+                progress(ConversionProgress(total_rows, bytes_read, total_bytes, time.perf_counter() - start))
+            check_cancelled()
+        out.write(suffix)
+    finally:
+        if out is not None:
+            if metrics is not None:
+                with metrics.stage('write'):
+                    out.close()
             else:
-                df = pd.read_csv(file_path, sep=sep, encoding=encoding, dtype=str)
-            score, num_cols, non_empty_rows = score_dataframe(df)
-            logging.info(f"Tentativo {sep}|{encoding}: {num_cols} colonne, {non_empty_rows} righe con dati, score={score:.2f}")
-            if score > best_score:
-                best_df = df
-                best_score = score
-                best_info = {'separator': sep, 'encoding': encoding}
-                best_combination = (sep, encoding)
-        except Exception as e:
-            errors.append(f"{sep}|{encoding}: {str(e)}")
-            continue
-    
-    if best_df is not None:
-        sep, encoding = best_combination
-        logging.info(f"CSV caricato con successo usando separatore '{sep}' e codifica '{encoding}'")
-        logging.info(f"Colonne rilevate: {list(best_df.columns)}")
-        # Validazione aggiuntiva: se il DataFrame ha una sola colonna e nessuna riga utile, probabilmente il file è corrotto o non valido
-        num_cols = len(best_df.columns)
-        non_empty_rows = len(best_df.dropna(how='all'))
-        if num_cols <= 1 or non_empty_rows == 0:
-            error_msg = (f"CSV caricato ma sospetto: {num_cols} colonne, {non_empty_rows} righe con dati. "
-                         f"Probabile file non valido o corrotto.")
-            logging.error(error_msg)
-            raise CSVLoadError(error_msg)
-        return best_df, best_info
-    else:
-        error_msg = "Impossibile caricare il CSV con nessuna combinazione. Errori: " + "; ".join(errors)
-        logging.error(error_msg)
-        raise CSVLoadError(error_msg)
+                out.close()
+    return total_rows, columns
 
-def convert_file(file_path, db_type, schema, table, database=None):
-    setup_logging(file_path)
-    ext = os.path.splitext(file_path)[1].lower()
+def _timed_render(rendered, metrics):
+    """Aggiunge a metrics.render il tempo di ogni blocco convertito, esclusa la lettura dal file."""
+    iterator = iter(rendered)
+    while True:
+        start = time.perf_counter()
+        read_before = metrics.read
+        item = next(iterator, _END)
+        metrics.render += time.perf_counter() - start - (metrics.read - read_before)
+        if item is _END:
+            return
+        yield item
+
+def _utf8_len(text):
+    """Byte UTF-8 di text, senza codificarlo quando è ASCII."""
+    return len(text) if text.isascii() else len(text.encode("utf-8"))
+
+def _write_sql_file(out_file, db_type, schema, table, database, chunks, batch_size=None, workers=None,
+                    progress=None, position=None, total_bytes=0, cancel_event=None, output_format='insert',
+                    compression=None, split_rows=None, split_bytes=None, files=None, typed=False, delta=None,
+                    upsert_keys=None, metrics=None):
+    """Scrive intestazione (USE/DELETE) e INSERT di ogni chunk; restituisce le righe totali.
+
+    Con upsert_keys gli INSERT diventano MERGE / ON CONFLICT per chiave (vedi
+    format_upsert) e il DELETE iniziale non viene scritto.
+
+    Con delta (DeltaIndex) vengono scritti solo INSERT, UPDATE e DELETE delle
+    righe cambiate rispetto all'esecuzione precedente, senza il DELETE
+    iniziale (salvo che l'indice non esista ancora: in quel caso lo script è completo).
+
+    Con typed=True i tipi delle colonne vengono dedotti dal primo chunk (vedi
+    infer_column_types) e gli INSERT usano letterali numerici, booleani e data.
+
+    Con output_format='copy' (solo Postgres) i dati vengono scritti in un unico
+    blocco COPY ... FROM stdin; terminato da \\., da eseguire con psql.
+    Con output_format='bcp' (solo SQL Server) i dati vanno in un file .dat
+    accanto allo script, con il file di formato XML .fmt; lo script contiene
+    DELETE e BULK INSERT.
+    Con output_format='sqlldr' (solo Oracle) out_file è il control file .ctl
+    di SQL*Loader e i dati vanno nel file .dat accanto.
+
+    Per gli script INSERT e COPY compression, split_rows e split_bytes
+    comprimono e dividono l'output in parti (vedi _stream_chunks): solo la
+    prima parte contiene il DELETE, ogni parte ripete USE/COPY e terminatori.
+    files, se indicata, riceve i percorsi dei file generati. metrics
+    (ConversionMetrics) riceve i tempi di render e write (vedi _stream_chunks).
+
+    Dopo ogni chunk chiama progress(ConversionProgress) se indicata. Se
+    cancel_event viene impostato la scrittura si interrompe prima del chunk
+    successivo. In caso di annullamento o errore i file parziali vengono
+    eliminati, per non lasciare uno script con il DELETE iniziale ma solo una
+    parte dei dati.
+    """
+    stream = dict(workers=workers, progress=progress, position=position,
+                  total_bytes=total_bytes, cancel_event=cancel_event, metrics=metrics)
+    base = os.path.splitext(out_file)[0]
+    written = []
     try:
-        ext = os.path.splitext(file_path)[1].lower()
-        file_size_mb = os.path.getsize(file_path) / (1024 * 1024)
-        chunking = ext == '.csv' and file_size_mb > 10
-        if ext == '.csv':
-            if not chunking:
-                df, csv_info = load_csv_robust(file_path)
+        if output_format in ('bcp', 'sqlldr') and (compression or split_rows or split_bytes):
+            raise ValueError(f"Compressione e suddivisione non sono disponibili per il formato {output_format}")
+        parts = dict(compression=compression, split_rows=split_rows, split_bytes=split_bytes, written=written)
+        if output_format == 'copy':
+            def prefix(columns, part):
+                head = f"DELETE FROM {qualified_table('postgres', schema, table)};\n\n" if part == 1 else ""
+                return head + copy_header(schema, table, columns) + "\n" if columns else head
+            total_rows, _ = _stream_chunks(out_file, chunks, format_copy, prefix=prefix, suffix="\\.\n",
+                                           **stream, **parts)
+        elif output_format == 'bcp':
+            data_file, format_file = f"{base}.dat", f"{base}.fmt"
+            total_rows, columns = _stream_chunks(data_file, chunks, format_bcp, newline=BCP_ROW_TERMINATOR,
+                                                 written=written, **stream)
+            written += [format_file, out_file]
+            with open(format_file, "w", encoding="utf-8") as f:
+                f.write(bcp_format_xml(columns))
+            with open(out_file, "w", encoding="utf-8") as f:
+                f.write(bulk_insert_script(schema, table, database, data_file, format_file))
+        elif output_format == 'sqlldr':
+            data_file = f"{base}.dat"
+            total_rows, columns = _stream_chunks(data_file, chunks, format_sqlldr, newline="\n",
+                                                 written=written, **stream)
+            written.append(out_file)
+            with open(out_file, "w", encoding="utf-8") as f:
+                f.write(sqlldr_control_file(schema, table, columns, data_file))
+        else:
+            full_load = (delta is None or delta.full_load) and not upsert_keys
+
+            def prefix(columns, part):
+                head = f"USE [{database}]\nGO\n\n" if db_type == "sqlserver" and database else ""
+                return head + f"DELETE FROM [{schema}].[{table}];\nGO\n\n" if part == 1 and full_load else head
+            column_types = None
+            if typed:
+                chunks = iter(chunks)
+                first = next(chunks, None)
+                if first is not None:
+                    column_types = infer_column_types(first)
+                    logging.info(f"Tipi delle colonne dedotti: {column_types}")
+                    chunks = itertools.chain([first], chunks)
+            if delta is not None:
+                chunks = delta.filter(chunks)
+                render = functools.partial(format_delta, db_type, schema, table, key_columns=delta.key_columns,
+                                           batch_size=batch_size, column_types=column_types)
             else:
-                # Determina separatore/codifica migliore usando load_csv_robust (primo chunk)
-                combinations = [
-                    (',', 'utf-8'), (';', 'utf-8'), ('\t', 'utf-8'), ('|', 'utf-8'),
-                    (',', 'latin-1'), (';', 'latin-1'), ('\t', 'latin-1'), ('|', 'latin-1'),
-                    (',', 'cp1252'), (';', 'cp1252'),
-                    (',', 'utf-16'), (';', 'utf-16'), ('\t', 'utf-16'), ('|', 'utf-16'),
-                    (',', 'utf-16-le'), (';', 'utf-16-le'), ('\t', 'utf-16-le'), ('|', 'utf-16-le'),
-                    (',', 'utf-16-be'), (';', 'utf-16-be'), ('\t', 'utf-16-be'), ('|', 'utf-16-be')
-                ]
-                best_sep, best_enc = None, None
-                best_score = -1
-                for sep, encoding in combinations:
-                    try:
-                        chunk_iter = pd.read_csv(file_path, sep=sep, encoding=encoding, dtype=str, chunksize=100000)
-                        df_chunk = next(chunk_iter)
-                        num_cols = len(df_chunk.columns)
-                        non_empty_rows = len(df_chunk.dropna(how='all'))
-                        unique_names = len(set(df_chunk.columns.tolist()))
-                        col_name_quality = (unique_names / num_cols) if num_cols > 0 else 0
-                        score = num_cols * 0.5 + non_empty_rows * 0.2 + col_name_quality * 10
-                        if score > best_score:
-                            best_score = score
-                            best_sep, best_enc = sep, encoding
-                    except Exception:
-                        continue
-                if best_sep is None:
-                    raise CSVLoadError("Impossibile determinare separatore/codifica per file grande.")
-                base = os.path.splitext(os.path.basename(file_path))[0]
-                dir_path = os.path.dirname(file_path)
-                out_file = os.path.join(dir_path, f"{base}.sql")
-                with open(out_file, "w", encoding="utf-8") as f:
-                    if db_type == "sqlserver" and database:
-                        f.write(f"USE [{database}]\nGO\n\n")
-                    f.write(f"DELETE FROM [{schema}].[{table}];\nGO\n\n")
-                    chunk_iter = pd.read_csv(file_path, sep=best_sep, encoding=best_enc, dtype=str, chunksize=100000)
-                    total_rows = 0
-                    for chunk in chunk_iter:
-                        sql_insert = format_insert(db_type, schema, table, chunk)
-                        f.write(sql_insert + "\n")
-                        total_rows += len(chunk)
-                logging.info(f"Conversione terminata correttamente. File SQL generato: {out_file}. Righe totali: {total_rows}")
-                return f"{os.path.basename(file_path)} -> OK (Generato: {out_file}, Righe: {total_rows})"
+                render = functools.partial(format_insert, db_type, schema, table, batch_size=batch_size,
+                                           column_types=column_types, key_columns=upsert_keys)
+            total_rows, _ = _stream_chunks(out_file, chunks, render, prefix=prefix, **stream, **parts)
+    except BaseException:
+        for path in written:
+            if os.path.exists(path):
+                os.remove(path)
+                logging.info(f"File parziale eliminato: {path}")
+        raise
+    if files is not None:
+        files.extend(written)
+    return total_rows
+
+def _open_chunks(file_path, stack, sheet_name=None, metrics=None, engine=None):
+    """Apre il file di input come sequenza di DataFrame; restituisce (chunks, position, total_bytes).
+
+    I CSV oltre 10 MB e i file .xlsx/.xlsm vengono letti a blocchi di
+    CHUNK_ROWS righe; position() stima i byte già letti (None se il file è
+    caricato in un solo blocco). Gli handle aperti vengono registrati su stack.
+    sheet_name sceglie il foglio Excel (default il primo); se il processo ha
+    già aperto la cartella (vedi convert_workbook) viene riusata. Con metrics
+    (ConversionMetrics) vengono misurate le fasi detect e read. engine sceglie
+    il lettore dei CSV letti a blocchi (vedi CSV_ENGINES e iter_arrow_chunks):
+    'pyarrow' torna a pandas, con un avviso nel log, se pyarrow non è installato.
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    if sheet_name is not None and ext == '.csv':
+        raise ValueError("Il foglio di lavoro può essere indicato solo per i file Excel")
+    workbook = _worker_workbook[1] if _worker_workbook and _worker_workbook[0] == file_path else None
+    total_bytes = os.path.getsize(file_path)
+    file_size_mb = total_bytes / (1024 * 1024)
+    position = None
+    if ext == '.csv':
+        if file_size_mb <= 10:
+            with metrics.stage('detect') if metrics is not None else nullcontext():
+                df, csv_info = load_csv_robust(file_path)
+            chunks = [df]
         else:
-            df = pd.read_excel(file_path)
-        if not chunking:
-            sql_insert = format_insert(db_type, schema, table, df)
+            # Stesso rilevamento (con cache) usato da load_csv_robust, sulla
+            # stessa mappatura da cui vengono poi letti i blocchi
+            source = stack.enter_context(map_input(file_path))
+            with metrics.stage('detect') if metrics is not None else nullcontext():
+                dialect = detect_csv_dialect(file_path, source=source)
+            _check_csv_shape(dialect.num_cols, dialect.non_empty_rows)
+            if engine == 'pyarrow' and not _pyarrow_available():
+                logging.warning("pyarrow non installato: lettura con pandas (pip install pyarrow per usarlo)")
+                engine = 'pandas'
+            source.seek(0)
+            if engine == 'pyarrow':
+                logging.info("Lettura a blocchi con pyarrow")
+                chunks = iter_arrow_chunks(source, dialect)
+            else:
+                chunks = pd.read_csv(source, chunksize=CHUNK_ROWS, **dialect.read_csv_kwargs())
+            position = source.tell
+    elif ext in ('.xlsx', '.xlsm'):
+        stats = {}
+        chunks = iter_excel_chunks(file_path, sheet_name=sheet_name, stats=stats, workbook=workbook)
+        rows_done = [0]
+
+        def position():
+            # Stima dalle righe dichiarate nel foglio: lo xlsx è compresso
+            total_rows = stats.get('total_rows')
+            return int(total_bytes * min(rows_done[0] / total_rows, 1.0)) if total_rows else 0
+
+        def counted(chunks):
+            for chunk in chunks:
+                rows_done[0] += len(chunk)
+                yield chunk
+        chunks = counted(chunks)
+    else:
+        with metrics.stage('read') if metrics is not None else nullcontext():
+            chunks = [pd.read_excel(workbook if workbook is not None else file_path,
+                                    sheet_name=sheet_name if sheet_name is not None else 0)]
+    if metrics is not None:
+        metrics.bytes_in = total_bytes
+        chunks = metrics.timed('read', chunks)
+    return chunks, position, total_bytes
+
+def convert_file(file_path, db_type, schema, table, database=None, batch_size=None, workers=None,
+                 progress=None, cancel_event=None, output_format='insert', compression=None,
+                 split_rows=None, split_bytes=None, typed=False, ddl=False, delta_keys=None, delta_index=None,
+                 upsert_keys=None, sheet_name=None, metrics=None, profile=None, engine=None):
+    """Converte il file in uno script .sql accanto al file di origine.
+
+    batch_size > 1 attiva gli INSERT multi-riga (vedi format_insert). I CSV
+    oltre 10 MB e i file .xlsx/.xlsm vengono elaborati a blocchi di CHUNK_ROWS
+    righe, senza caricare l'intero file in memoria. Con workers > 1 i blocchi
+    vengono convertiti in parallelo su più processi; l'output resta identico.
+
+    progress, se indicata, riceve un ConversionProgress dopo ogni blocco.
+    cancel_event (threading.Event) permette di annullare la conversione tra un
+    blocco e l'altro: il file .sql parziale viene eliminato.
+
+    output_format: 'insert' (default); 'copy' per Postgres, che scrive i dati
+    in un blocco COPY ... FROM stdin; (molto più veloce da caricare con psql);
+    'bcp' per SQL Server, che scrive file dati .dat, file di formato .fmt e
+    uno script con BULK INSERT; 'sqlldr' per Oracle, che scrive il control file
+    .ctl di SQL*Loader (direct path) e il file dati .dat.
+
+    compression ('gzip' o 'zstd') comprime lo script al volo; split_rows e
+    split_bytes lo dividono in parti numerate base.part001.sql, ... di al
+    massimo tante righe di dati o byte (non compressi). Solo per 'insert' e 'copy'.
+
+    typed=True (solo 'insert') deduce i tipi delle colonne da un campione del
+    primo blocco e scrive numeri senza apici e date come letterali del database.
+
+    ddl=True scrive anche base_create.sql con il CREATE TABLE della tabella,
+    con tipi, lunghezze e NOT NULL calcolati durante la stessa lettura dei dati.
+
+    delta_keys (lista di colonne chiave, solo 'insert') attiva la conversione
+    incrementale: lo script contiene solo INSERT/UPDATE/DELETE delle righe
+    cambiate dall'esecuzione precedente, confrontate con l'indice sqlite
+    delta_index (default: schema.table.delta.sqlite accanto al file). Alla
+    prima esecuzione lo script è completo. L'indice viene aggiornato solo se
+    la conversione termina correttamente.
+
+    upsert_keys (lista di colonne chiave, solo 'insert') sostituisce DELETE +
+    INSERT con MERGE (SQL Server, Oracle) o INSERT ... ON CONFLICT DO UPDATE
+    (Postgres) a blocchi di batch_size righe: vengono toccate solo le righe del file.
+
+    sheet_name converte un foglio Excel diverso dal primo; l'output diventa
+    base_FOGLIO.sql (vedi sheet_slug e convert_workbook).
+
+    metrics (ConversionMetrics) attiva la misura dei tempi per fase (detect,
+    read, render, write) e dei contatori (righe, blocchi, byte letti e
+    scritti, picco di memoria): al termine, anche in caso di errore, l'oggetto
+    è compilato e il riepilogo viene scritto nel log come riga JSON.
+
+    profile ('cpu', 'memory' o 'all') profila la conversione con cProfile e/o
+    tracemalloc e scrive base_profile.prof e base_alloc.txt accanto al log
+    (vedi RunProfiler), da allegare alle segnalazioni di lentezza.
+
+    engine='pyarrow' legge i CSV oltre 10 MB con il lettore in streaming di
+    pyarrow invece che con pd.read_csv (vedi iter_arrow_chunks); se pyarrow
+    non è installato viene usato pandas. L'output è lo stesso.
+
+    Restituisce un ConversionResult: il messaggio di esito, con ok e rows.
+    """
+    setup_logging(file_path)
+    run_start = time.perf_counter()
+    files = []
+    profiler = None
+    try:
+        if profile:
+            profile_base = os.path.splitext(file_path)[0]
+            if sheet_name is not None:
+                profile_base = f"{profile_base}_{sheet_slug(sheet_name)}"
+            profiler = RunProfiler(profile_base, profile)
+            profiler.start()
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Formato di output non supportato: {output_format}")
+        if OUTPUT_FORMAT_DB.get(output_format, db_type) != db_type:
+            raise ValueError(f"Il formato {output_format} è disponibile solo per {OUTPUT_FORMAT_DB[output_format]}")
+        if typed and output_format != 'insert':
+            raise ValueError("I letterali tipizzati sono disponibili solo per il formato insert")
+        if delta_keys and output_format != 'insert':
+            raise ValueError("La conversione incrementale è disponibile solo per il formato insert")
+        if upsert_keys and (output_format != 'insert' or delta_keys):
+            raise ValueError("Il caricamento per chiave è disponibile solo per il formato insert, senza delta")
+        if engine is not None and engine not in CSV_ENGINES:
+            raise ValueError(f"Motore di lettura CSV non supportato: {engine}")
+        with ExitStack() as stack:
+            chunks, position, total_bytes = _open_chunks(file_path, stack, sheet_name, metrics, engine)
+            if profiler is not None:
+                chunks = profiler.sampled(chunks)
+            delta = None
+            if delta_keys:
+                delta_index = delta_index or os.path.join(
+                    os.path.dirname(file_path), f"{safe_identifier(schema)}.{safe_identifier(table)}.delta.sqlite")
+                delta = stack.enter_context(DeltaIndex(delta_index, delta_keys))
+            stats = None
+            if ddl:
+                stats = TableStats()
+                chunks = stats.track(chunks)
             base = os.path.splitext(os.path.basename(file_path))[0]
+            if sheet_name is not None:
+                base = f"{base}_{sheet_slug(sheet_name)}"
             dir_path = os.path.dirname(file_path)
-            out_file = os.path.join(dir_path, f"{base}.sql")
-            with open(out_file, "w", encoding="utf-8") as f:
-                if db_type == "sqlserver" and database:
-                    f.write(f"USE [{database}]\nGO\n\n")
-                f.write(f"DELETE FROM [{schema}].[{table}];\nGO\n\n")
-                f.write(sql_insert)
-            logging.info(f"Conversione terminata correttamente. File SQL generato: {out_file}")
-            return f"{os.path.basename(file_path)} -> OK (Generato: {out_file})"
+            out_file = os.path.join(dir_path, f"{base}.ctl" if output_format == 'sqlldr' else f"{base}.sql")
+            total_rows = _write_sql_file(out_file, db_type, schema, table, database, chunks, batch_size, workers,
+                                         progress, position, total_bytes, cancel_event, output_format,
+                                         compression, split_rows, split_bytes, files, typed, delta,
+                                         upsert_keys, metrics)
+            if metrics is not None:
+                metrics.rows = total_rows
+            if delta is not None:
+                delta.commit()
+                logging.info(f"Delta: {delta.inserted} righe nuove, {delta.updated} modificate, "
+                             f"{delta.deleted} eliminate. Indice aggiornato: {delta.path}")
+        extra = ""
+        if delta is not None and not delta.full_load:
+            extra += f", Delta: {delta.inserted} nuove, {delta.updated} modificate, {delta.deleted} eliminate"
+        if stats is not None:
+            ddl_file = os.path.join(dir_path, f"{base}_create.sql")
+            with open(ddl_file, "w", encoding="utf-8") as f:
+                f.write(stats.create_table(db_type, schema, table))
+            logging.info(f"DDL generata: {ddl_file}")
+            extra += f", DDL: {ddl_file}"
+        if split_rows or split_bytes:
+            logging.info(f"Conversione terminata correttamente. File SQL generati: {', '.join(files)}. "
+                         f"Righe totali: {total_rows}")
+            return ConversionResult(f"{os.path.basename(file_path)} -> OK (Generati: {len(files)} file, "
+                                    f"da {files[0]}, Righe: {total_rows}{extra})", True, total_rows)
+        out_file = output_path(out_file, compression=compression)
+        logging.info(f"Conversione terminata correttamente. File SQL generato: {out_file}. Righe totali: {total_rows}")
+        return ConversionResult(f"{os.path.basename(file_path)} -> OK (Generato: {out_file}, "
+                                f"Righe: {total_rows}{extra})", True, total_rows)
+    except ConversionCancelled as e:
+        logging.warning(f"{e}")
+        return ConversionResult(f"{os.path.basename(file_path)} -> Annullato: {e}", False)
     except Exception as e:
         logging.error(f"Errore nel caricamento/conversione dati: {e}")
-        return f"{os.path.basename(file_path)} -> Errore nel caricamento/conversione dati: {e}"
-
-class MainApp(tk.Tk):
-    def __init__(self):
-        super().__init__()
-        self.title("Excel to SQL Converter")
-        self.geometry("430x460")
-        self.resizable(False, False)
-        self.db_type = None
-        self.icon_images = {}
-        self.arrow_icon = None
-        ico_path = resource_path("images/icon.ico")
-        if os.path.exists(ico_path):
-            self.iconbitmap(ico_path)
-        for dbname, filename in [
-            ('oracle', 'oracle.png'),
-            ('postgres', 'postgres.png'),
-            ('sqlserver', 'sqlserver.png')
-        ]:
+        return ConversionResult(f"{os.path.basename(file_path)} -> Errore nel caricamento/conversione dati: {e}",
+                                False)
+    finally:
+        if profiler is not None:
             try:
-                path_icon = os.path.join(IMAGES_PATH, filename)
-                img = Image.open(path_icon).resize(ICON_SIZE, Image.LANCZOS)
-                self.icon_images[dbname] = ImageTk.PhotoImage(img)
-            except Exception:
-                self.icon_images[dbname] = None
+                profiler.stop()
+            except OSError as e:
+                logging.warning(f"Impossibile salvare il profilo della conversione: {e}")
+        if metrics is not None:
+            metrics.total = time.perf_counter() - run_start
+            metrics.bytes_out = sum(os.path.getsize(f) for f in files if os.path.exists(f))
+            metrics.peak_memory_mb = _peak_rss_mb()
+            logging.info(f"Metriche conversione: {metrics.to_json()}")
+
+# --- Conversione di tutti i fogli di una cartella Excel ---
+
+# (percorso, cartella) aperta una sola volta in ogni processo di convert_workbook
+_worker_workbook = None
+
+# Colonne del riepilogo scritto da convert_workbook
+SHEET_SUMMARY_FIELDS = ('sheet', 'table', 'ok', 'rows', 'seconds', 'result')
+
+def _init_sheet_worker(file_path):
+    global _worker_workbook
+    _worker_workbook = (file_path, _open_workbook(file_path))
+
+def _convert_sheet(file_path, db_type, schema, table, sheet_name, options):
+    start = time.perf_counter()
+    result = convert_file(file_path, db_type, schema, table, sheet_name=sheet_name, **options)
+    return result, time.perf_counter() - start
+
+def convert_workbook(file_path, db_type, schema, tables=None, jobs=None, **options):
+    """Converte ogni foglio di una cartella Excel in uno script base_FOGLIO.sql.
+
+    I fogli vengono elencati una sola volta; ogni foglio va nella tabella
+    indicata da tables ({foglio: tabella}, oppure una funzione foglio -> tabella
+    o None), altrimenti in quella con il nome del foglio (vedi sheet_slug). Con jobs > 1 i fogli vengono convertiti in
+    parallelo su un ProcessPoolExecutor in cui ogni processo apre la cartella
+    una sola volta (per .xlsx stringhe condivise e stili vengono letti una
+    volta sola) e la riusa per tutti i fogli che gli vengono assegnati.
+    options sono gli altri argomenti di convert_file (database, batch_size, ...).
+
+    Restituisce, nell'ordine dei fogli, una lista di dizionari con le chiavi di
+    SHEET_SUMMARY_FIELDS e scrive lo stesso riepilogo in base_summary.csv.
+    """
+    global _worker_workbook
+    import csv
+
+    setup_logging(file_path)
+    table_for = tables if callable(tables) else (tables or {}).get
+    _init_sheet_worker(file_path)
+    try:
+        sheets = list_excel_sheets(file_path, _worker_workbook[1])
+        tasks = [(sheet, table_for(sheet) or sheet_slug(sheet)) for sheet in sheets]
+        logging.info(f"Fogli trovati: {len(sheets)} ({', '.join(sheets)})")
+        if jobs and jobs > 1 and len(tasks) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=min(jobs, len(tasks)), initializer=_init_sheet_worker,
+                                     initargs=(file_path,)) as pool:
+                futures = [pool.submit(_convert_sheet, file_path, db_type, schema, t, sheet, options)
+                           for sheet, t in tasks]
+                outcomes = [fut.result() for fut in futures]
+        else:
+            outcomes = [_convert_sheet(file_path, db_type, schema, t, sheet, options) for sheet, t in tasks]
+    finally:
+        _worker_workbook[1].close()
+        _worker_workbook = None
+
+    summary = []
+    for (sheet, table_name), (result, seconds) in zip(tasks, outcomes):
+        summary.append({
+            'sheet': sheet,
+            'table': table_name,
+            'ok': result.ok,
+            'rows': result.rows,
+            'seconds': round(seconds, 3),
+            'result': result,
+        })
+    base = os.path.splitext(file_path)[0]
+    with open(f"{base}_summary.csv", "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=SHEET_SUMMARY_FIELDS)
+        writer.writeheader()
+        writer.writerows(summary)
+    failed = sum(1 for item in summary if not item['ok'])
+    logging.info(f"Fogli convertiti: {len(summary) - failed}/{len(summary)}. "
+                 f"Riepilogo: {base}_summary.csv")
+    return summary
+
+# --- Caricamento diretto su database (DB-API 2.0) ---
+
+# Righe per executemany() nel caricamento diretto
+DB_LOAD_BATCH_ROWS = 1000
+
+# paramstyle usato se il modulo del driver non lo dichiara
+_DEFAULT_PARAMSTYLES = {'sqlserver': 'qmark', 'postgres': 'format', 'oracle': 'numeric'}
+
+class ConnectionPool:
+    """Pool minimale di connessioni DB-API create da factory().
+
+    Espone getconn()/putconn() come psycopg2.pool: al massimo max_size
+    connessioni vengono aperte, getconn() attende che una venga restituita.
+    """
+
+    def __init__(self, factory, max_size=4):
+        if max_size < 1:
+            raise ValueError("max_size deve essere almeno 1")
+        self._factory = factory
+        self._max_size = max_size
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def getconn(self, timeout=None):
         try:
-            arrow_path = os.path.join(IMAGES_PATH, "barrow.png")
-            arrow_img = Image.open(arrow_path).resize(ICON_SIZE, Image.LANCZOS)
-            self.arrow_icon = ImageTk.PhotoImage(arrow_img)
-        except Exception:
-            self.arrow_icon = None
-        self.version_label = None
-        self.show_db_menu()
-
-    def clean_widgets(self):
-        for widget in self.winfo_children():
-            widget.destroy()
-        self._show_version()
-
-    # Mostra la versione nell'angolo in basso a destra
-    def _show_version(self):
-        if self.version_label:
-            self.version_label.destroy()
-        self.version_label = tk.Label(
-            self,
-            text=f"Versione: {APP_VERSION}",
-            font=(DEFAULT_FONT_FAMILY, 8),
-            fg="grey",
-            anchor="se"
-        )
-        self.version_label.place(relx=1.0, rely=1.0, x=-12, y=-8, anchor="se")
-
-    def show_db_menu(self):
-        self.clean_widgets()
-        title = tk.Label(self, text="Scegli il database di destinazione:", font=(DEFAULT_FONT_FAMILY, 12, 'bold'))
-        title.pack(pady=18)
-        frame = tk.Frame(self)
-        frame.pack(pady=8)
-        btn_oracle = tk.Button(
-            frame,
-            text=" Oracle",
-            font=(DEFAULT_FONT_FAMILY, 12, 'bold'),
-            compound="left",
-            image=self.icon_images.get('oracle'),
-            width=130, height=38,
-            padx=12,
-            anchor="center",
-            command=lambda: self.show_main_form("oracle")
-        )
-        btn_oracle.grid(row=0, column=0, pady=7)
-        btn_postgres = tk.Button(
-            frame,
-            text=" Postgres",
-            font=(DEFAULT_FONT_FAMILY, 12, 'bold'),
-            compound="left",
-            image=self.icon_images.get('postgres'),
-            width=130, height=38,
-            padx=12,
-            anchor="center",
-            command=lambda: self.show_main_form("postgres")
-        )
-        btn_postgres.grid(row=1, column=0, pady=7)
-        btn_sqlserver = tk.Button(
-            frame,
-            text=" SQL Server",
-            font=(DEFAULT_FONT_FAMILY, 12, 'bold'),
-            compound="left",
-            image=self.icon_images.get('sqlserver'),
-            width=130, height=38,
-            padx=12,
-            anchor="center",
-            command=lambda: self.show_main_form("sqlserver")
-        )
-        btn_sqlserver.grid(row=2, column=0, pady=7)
-
-    def show_main_form(self, db_type):
-        self.db_type = db_type
-        self.clean_widgets()
-        back_btn = tk.Button(
-            self,
-            text=" Indietro",
-            font=(DEFAULT_FONT_FAMILY, 10), width=90, height=38,
-            compound="left", image=self.arrow_icon,
-            padx=12,
-            anchor="center",
-            command=self.show_db_menu
-        )
-        back_btn.place(x=8, y=8)  # posizionato sempre in alto a sinistra
-
-        center_frame = tk.Frame(self)
-        center_frame.place(relx=0.5, rely=0.13, anchor="n")
-        spacing = 13
-
-        file_label = tk.Label(center_frame, text="File Excel:", font=(DEFAULT_FONT_FAMILY, 10))
-        file_label.pack(pady=(6,2))
-        self.file_entry = tk.Entry(center_frame, width=36, font=(DEFAULT_FONT_FAMILY, 10), justify="center")
-        self.file_entry.pack(pady=(0,spacing))
-        browse_btn = tk.Button(center_frame, text="Sfoglia", width=16, command=self.browse_file)
-        browse_btn.pack(pady=(0,spacing))
-
-        schema_label = tk.Label(center_frame, text="Schema:", font=(DEFAULT_FONT_FAMILY, 10))
-        schema_label.pack(pady=(2,2))
-        self.schema_entry = tk.Entry(center_frame, width=36, font=(DEFAULT_FONT_FAMILY, 10), justify="center")
-        self.schema_entry.pack(pady=(0,spacing))
-
-        table_label = tk.Label(center_frame, text="Tabella:", font=(DEFAULT_FONT_FAMILY, 10))
-        table_label.pack(pady=(2,2))
-        self.table_entry = tk.Entry(center_frame, width=36, font=(DEFAULT_FONT_FAMILY, 10), justify="center")
-        self.table_entry.pack(pady=(0,spacing))
-
-        if db_type == "sqlserver":
-            db_label = tk.Label(center_frame, text="Database:", font=(DEFAULT_FONT_FAMILY, 10))
-            db_label.pack(pady=(2,2))
-            self.db_entry = tk.Entry(center_frame, width=36, font=(DEFAULT_FONT_FAMILY, 10), justify="center")
-            self.db_entry.pack(pady=(0,spacing))
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            create = self._opened < self._max_size
+            if create:
+                self._opened += 1
+        if create:
+            try:
+                return self._factory()
+            except BaseException:
+                with self._lock:
+                    self._opened -= 1
+                raise
+        return self._idle.get(timeout=timeout)
+
+    def putconn(self, conn, close=False):
+        if close:
+            with self._lock:
+                self._opened -= 1
+            conn.close()
         else:
-            self.db_entry = None
+            self._idle.put(conn)
 
-        convert_btn = tk.Button(center_frame, text="Converti", font=(DEFAULT_FONT_FAMILY, 10), width=23, command=self.start_conversion)
-        convert_btn.pack(pady=(2,18))
+    def closeall(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._opened -= 1
+            conn.close()
 
-    def browse_file(self):
-        file_path = filedialog.askopenfilename(
-            filetypes=[
-                ("Excel files", "*.xlsx;*.xls;*.csv"),
-                ("All files", "*.*")
-            ]
-        )
-        if file_path:
-            self.file_entry.delete(0, tk.END)
-            self.file_entry.insert(0, file_path)
-
-    def start_conversion(self):
-        file_path = self.file_entry.get()
-        db_type = self.db_type
-        schema = self.schema_entry.get() if self.schema_entry else ""
-        table = self.table_entry.get() if self.table_entry else ""
-        database = self.db_entry.get() if self.db_entry else None
-        if not file_path or not db_type or not schema or not table or not file_path.strip():
-            messagebox.showwarning("Attenzione", "Completa tutti i campi obbligatori!")
-            return
-        result = convert_file(file_path, db_type, schema, table, database)
-        messagebox.showinfo("Risultato della Conversione", result)
+@contextmanager
+def _borrow_connection(source):
+    """Ottiene una connessione da una connessione, un pool o una factory.
 
-if __name__ == '__main__':
+    Una connessione viene usata così com'è; un pool (getconn/putconn come
+    ConnectionPool e psycopg2.pool, oppure acquire/release come oracledb)
+    riceve indietro la connessione; una factory (callable senza argomenti)
+    crea una connessione che viene chiusa al termine.
+    """
+    if hasattr(source, 'cursor'):
+        yield source
+    elif hasattr(source, 'getconn'):
+        conn = source.getconn()
+        try:
+            yield conn
+        finally:
+            source.putconn(conn)
+    elif hasattr(source, 'acquire'):
+        conn = source.acquire()
+        try:
+            yield conn
+        finally:
+            source.release(conn)
+    elif callable(source):
+        conn = source()
+        try:
+            yield conn
+        finally:
+            conn.close()
+    else:
+        raise TypeError(f"Connessione non valida: {type(source).__name__}")
+
+def _driver_paramstyle(conn, db_type):
+    """paramstyle del modulo DB-API che ha creato conn (es. sqlite3 -> 'qmark')."""
+    module = sys.modules.get(type(conn).__module__.split('.')[0])
+    return getattr(module, 'paramstyle', None) or _DEFAULT_PARAMSTYLES.get(db_type, 'qmark')
+
+def _placeholders(paramstyle, count):
+    if paramstyle == 'qmark':
+        return ", ".join("?" * count)
+    if paramstyle in ('format', 'pyformat'):
+        return ", ".join(["%s"] * count)
+    if paramstyle in ('numeric', 'named'):
+        # I driver 'named' (es. oracledb) accettano anche i segnaposto posizionali :1, :2, ...
+        return ", ".join(f":{i}" for i in range(1, count + 1))
+    raise ValueError(f"paramstyle non supportato: {paramstyle}")
+
+def _chunk_params(df):
+    """Righe del DataFrame come tuple di parametri: stesso testo di format_insert, None per i NULL."""
+    columns = []
+    for col in df.columns:
+        text, nulls = _column_text(df[col].values)
+        text = text.astype(object)
+        text[nulls] = None
+        columns.append(text)
+    return list(zip(*columns))
+
+def load_file_to_db(file_path, db_type, schema, table, connection, batch_size=None, paramstyle=None,
+                    progress=None, cancel_event=None):
+    """Carica il file direttamente nella tabella, senza generare lo script .sql.
+
+    connection può essere una connessione DB-API, un pool (ConnectionPool,
+    psycopg2.pool, pool oracledb) o una factory senza argomenti. In un'unica
+    transazione viene eseguito il DELETE della tabella e poi un INSERT
+    parametrizzato con executemany() ogni batch_size righe (default
+    DB_LOAD_BATCH_ROWS); al termine viene fatto il commit, in caso di errore o
+    annullamento il rollback. paramstyle sovrascrive quello del driver.
+    I valori vengono passati come testo, come negli script generati.
+    """
+    setup_logging(file_path)
+    batch_size = batch_size or DB_LOAD_BATCH_ROWS
+    start = time.perf_counter()
+    total_rows = 0
+    try:
+        with ExitStack() as stack:
+            chunks, position, total_bytes = _open_chunks(file_path, stack)
+            conn = stack.enter_context(_borrow_connection(connection))
+            style = paramstyle or _driver_paramstyle(conn, db_type)
+            table_ref = qualified_table(db_type, schema, table)
+            cursor = conn.cursor()
+            try:
+                cursor.execute(f"DELETE FROM {table_ref}")
+                for chunk in chunks:
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise ConversionCancelled("Caricamento annullato dall'utente")
+                    if chunk.empty:
+                        continue
+                    cols = ", ".join(quote_identifier(db_type, c) for c in chunk.columns)
+                    sql = f"INSERT INTO {table_ref} ({cols}) VALUES ({_placeholders(style, len(chunk.columns))})"
+                    params = _chunk_params(chunk)
+                    for i in range(0, len(params), batch_size):
+                        cursor.executemany(sql, params[i:i + batch_size])
+                    total_rows += len(params)
+                    if progress is not None:
+                        bytes_read = position() if position is not None else total_bytes
+                        progress(ConversionProgress(total_rows, bytes_read, total_bytes, time.perf_counter() - start))
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+        elapsed = time.perf_counter() - start
+        rate = total_rows / elapsed if elapsed > 0 else 0.0
+        logging.info(f"Caricamento terminato: {total_rows} righe in {table_ref} in {elapsed:.2f}s ({rate:.0f} righe/s)")
+        return f"{os.path.basename(file_path)} -> OK (Caricate: {total_rows} righe in {elapsed:.2f}s, {rate:.0f} righe/s)"
+    except ConversionCancelled as e:
+        logging.warning(f"{e}")
+        return f"{os.path.basename(file_path)} -> Annullato: {e}"
+    except Exception as e:
+        logging.error(f"Errore nel caricamento su database: {e}")
+        return f"{os.path.basename(file_path)} -> Errore nel caricamento su database: {e}"
+
+def __getattr__(name):
+    # Compatibilità: MainApp vive ora in excel_to_sql_gui e viene importata solo
+    # se richiesta, così il core non carica tkinter e PIL.
+    if name == 'MainApp':
+        from excel_to_sql_gui import MainApp
+        return MainApp
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def main(argv=None):
+    """
+    Avvia la CLI se ci sono argomenti sulla riga di comando, altrimenti la GUI.
+
+    freeze_support() deve precedere tutto il resto: nell'eseguibile PyInstaller
+    per Windows i processi dei pool (--jobs, --workers, --sheets) rieseguono
+    main() e, senza, ripartirebbero come CLI con gli argomenti interni di
+    multiprocessing. Fuori dall'eseguibile non fa nulla.
+    """
+    import multiprocessing
+    multiprocessing.freeze_support()
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        from excel_to_sql_cli import main as cli_main
+        return cli_main(argv)
+    from excel_to_sql_gui import MainApp
     app = MainApp()
     app.mainloop()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
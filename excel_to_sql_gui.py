@@ -0,0 +1,284 @@
+import os
+import queue
+import threading
+import tkinter as tk
+from tkinter import filedialog, messagebox, ttk
+
+from excel_to_sql_converter import APP_VERSION, convert_file, resource_path
+
+# Costanti UI
+DEFAULT_FONT_FAMILY = "Segoe UI"
+
+ICON_SIZE = (24, 24)
+IMAGES_PATH = resource_path("images")
+
+# Intervallo di aggiornamento della barra di avanzamento
+PROGRESS_POLL_MS = 100
+
+def load_icon(path):
+    """Carica un'icona PNG come PhotoImage di dimensione massima ICON_SIZE.
+
+    Le icone incluse sono già 24x24 e vengono lette direttamente da Tk; PIL
+    viene importato solo se un'immagine va ridimensionata.
+    """
+    img = tk.PhotoImage(file=path)
+    if img.width() <= ICON_SIZE[0] and img.height() <= ICON_SIZE[1]:
+        return img
+    from PIL import Image, ImageTk
+    resized = Image.open(path).resize(ICON_SIZE, Image.LANCZOS)
+    return ImageTk.PhotoImage(resized)
+
+class MainApp(tk.Tk):
+    def __init__(self):
+        super().__init__()
+        self.title("Excel to SQL Converter")
+        self.geometry("430x540")
+        self.resizable(False, False)
+        self.db_type = None
+        self.icon_images = {}
+        self.arrow_icon = None
+        ico_path = resource_path("images/icon.ico")
+        if os.path.exists(ico_path):
+            self.iconbitmap(ico_path)
+        for dbname, filename in [
+            ('oracle', 'oracle.png'),
+            ('postgres', 'postgres.png'),
+            ('sqlserver', 'sqlserver.png')
+        ]:
+            try:
+                self.icon_images[dbname] = load_icon(os.path.join(IMAGES_PATH, filename))
+            except Exception:
+                self.icon_images[dbname] = None
+        try:
+            self.arrow_icon = load_icon(os.path.join(IMAGES_PATH, "barrow.png"))
+        except Exception:
+            self.arrow_icon = None
+        self.version_label = None
+        self.worker = None
+        self.cancel_event = None
+        self.progress_queue = None
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.show_db_menu()
+
+    def clean_widgets(self):
+        for widget in self.winfo_children():
+            widget.destroy()
+        self._show_version()
+
+    # Mostra la versione nell'angolo in basso a destra
+    def _show_version(self):
+        if self.version_label:
+            self.version_label.destroy()
+        self.version_label = tk.Label(
+            self,
+            text=f"Versione: {APP_VERSION}",
+            font=(DEFAULT_FONT_FAMILY, 8),
+            fg="grey",
+            anchor="se"
+        )
+        self.version_label.place(relx=1.0, rely=1.0, x=-12, y=-8, anchor="se")
+
+    def show_db_menu(self):
+        self.clean_widgets()
+        title = tk.Label(self, text="Scegli il database di destinazione:", font=(DEFAULT_FONT_FAMILY, 12, 'bold'))
+        title.pack(pady=18)
+        frame = tk.Frame(self)
+        frame.pack(pady=8)
+        btn_oracle = tk.Button(
+            frame,
+            text=" Oracle",
+            font=(DEFAULT_FONT_FAMILY, 12, 'bold'),
+            compound="left",
+            image=self.icon_images.get('oracle'),
+            width=130, height=38,
+            padx=12,
+            anchor="center",
+            command=lambda: self.show_main_form("oracle")
+        )
+        btn_oracle.grid(row=0, column=0, pady=7)
+        btn_postgres = tk.Button(
+            frame,
+            text=" Postgres",
+            font=(DEFAULT_FONT_FAMILY, 12, 'bold'),
+            compound="left",
+            image=self.icon_images.get('postgres'),
+            width=130, height=38,
+            padx=12,
+            anchor="center",
+            command=lambda: self.show_main_form("postgres")
+        )
+        btn_postgres.grid(row=1, column=0, pady=7)
+        btn_sqlserver = tk.Button(
+            frame,
+            text=" SQL Server",
+            font=(DEFAULT_FONT_FAMILY, 12, 'bold'),
+            compound="left",
+            image=self.icon_images.get('sqlserver'),
+            width=130, height=38,
+            padx=12,
+            anchor="center",
+            command=lambda: self.show_main_form("sqlserver")
+        )
+        btn_sqlserver.grid(row=2, column=0, pady=7)
+
+    def show_main_form(self, db_type):
+        self.db_type = db_type
+        self.clean_widgets()
+        back_btn = tk.Button(
+            self,
+            text=" Indietro",
+            font=(DEFAULT_FONT_FAMILY, 10), width=90, height=38,
+            compound="left", image=self.arrow_icon,
+            padx=12,
+            anchor="center",
+            command=self.show_db_menu
+        )
+        back_btn.place(x=8, y=8)  # posizionato sempre in alto a sinistra
+        self.back_btn = back_btn
+
+        center_frame = tk.Frame(self)
+        center_frame.place(relx=0.5, rely=0.13, anchor="n")
+        spacing = 13
+
+        file_label = tk.Label(center_frame, text="File Excel:", font=(DEFAULT_FONT_FAMILY, 10))
+        file_label.pack(pady=(6,2))
+        self.file_entry = tk.Entry(center_frame, width=36, font=(DEFAULT_FONT_FAMILY, 10), justify="center")
+        self.file_entry.pack(pady=(0,spacing))
+        browse_btn = tk.Button(center_frame, text="Sfoglia", width=16, command=self.browse_file)
+        browse_btn.pack(pady=(0,spacing))
+
+        schema_label = tk.Label(center_frame, text="Schema:", font=(DEFAULT_FONT_FAMILY, 10))
+        schema_label.pack(pady=(2,2))
+        self.schema_entry = tk.Entry(center_frame, width=36, font=(DEFAULT_FONT_FAMILY, 10), justify="center")
+        self.schema_entry.pack(pady=(0,spacing))
+
+        table_label = tk.Label(center_frame, text="Tabella:", font=(DEFAULT_FONT_FAMILY, 10))
+        table_label.pack(pady=(2,2))
+        self.table_entry = tk.Entry(center_frame, width=36, font=(DEFAULT_FONT_FAMILY, 10), justify="center")
+        self.table_entry.pack(pady=(0,spacing))
+
+        if db_type == "sqlserver":
+            db_label = tk.Label(center_frame, text="Database:", font=(DEFAULT_FONT_FAMILY, 10))
+            db_label.pack(pady=(2,2))
+            self.db_entry = tk.Entry(center_frame, width=36, font=(DEFAULT_FONT_FAMILY, 10), justify="center")
+            self.db_entry.pack(pady=(0,spacing))
+        else:
+            self.db_entry = None
+
+        # Profilazione per le segnalazioni di lentezza: .prof e report allocazioni accanto al log
+        self.profile_var = tk.BooleanVar(value=False)
+        profile_check = tk.Checkbutton(center_frame, text="Salva profilo prestazioni (assistenza)",
+                                       variable=self.profile_var, font=(DEFAULT_FONT_FAMILY, 8))
+        profile_check.pack(pady=(0,4))
+
+        self.convert_btn = tk.Button(center_frame, text="Converti", font=(DEFAULT_FONT_FAMILY, 10), width=23, command=self.start_conversion)
+        self.convert_btn.pack(pady=(2,10))
+
+        self.progress_bar = ttk.Progressbar(center_frame, length=260, mode="determinate", maximum=100)
+        self.progress_bar.pack(pady=(0,4))
+        self.progress_label = tk.Label(center_frame, text="", font=(DEFAULT_FONT_FAMILY, 8), fg="grey")
+        self.progress_label.pack()
+        self.cancel_btn = tk.Button(center_frame, text="Annulla", width=16, state=tk.DISABLED, command=self.cancel_conversion)
+        self.cancel_btn.pack(pady=(4,18))
+
+    def browse_file(self):
+        file_path = filedialog.askopenfilename(
+            filetypes=[
+                ("Excel files", "*.xlsx;*.xls;*.csv"),
+                ("All files", "*.*")
+            ]
+        )
+        if file_path:
+            self.file_entry.delete(0, tk.END)
+            self.file_entry.insert(0, file_path)
+
+    def start_conversion(self):
+        file_path = self.file_entry.get()
+        db_type = self.db_type
+        schema = self.schema_entry.get() if self.schema_entry else ""
+        table = self.table_entry.get() if self.table_entry else ""
+        database = self.db_entry.get() if self.db_entry else None
+        if not file_path or not db_type or not schema or not table or not file_path.strip():
+            messagebox.showwarning("Attenzione", "Completa tutti i campi obbligatori!")
+            return
+        if self.worker is not None and self.worker.is_alive():
+            return
+        # La conversione gira in un thread separato: la finestra resta reattiva
+        # e riceve l'avanzamento tramite una coda letta con after().
+        self.cancel_event = threading.Event()
+        self.progress_queue = queue.Queue()
+        self._set_running(True)
+        self.worker = threading.Thread(
+            target=self._run_conversion,
+            args=(file_path, db_type, schema, table, database, "all" if self.profile_var.get() else None),
+            daemon=True
+        )
+        self.worker.start()
+        self.after(PROGRESS_POLL_MS, self._poll_progress)
+
+    def _run_conversion(self, file_path, db_type, schema, table, database, profile=None):
+        # Eseguito nel thread di lavoro: non tocca i widget, comunica solo tramite la coda
+        try:
+            result = convert_file(
+                file_path, db_type, schema, table, database,
+                progress=lambda p: self.progress_queue.put(("progress", p)),
+                cancel_event=self.cancel_event,
+                profile=profile
+            )
+        except Exception as e:
+            result = f"{os.path.basename(file_path)} -> Errore nel caricamento/conversione dati: {e}"
+        self.progress_queue.put(("done", result))
+
+    def _poll_progress(self):
+        result = None
+        try:
+            while True:
+                kind, payload = self.progress_queue.get_nowait()
+                if kind == "progress":
+                    self._show_progress(payload)
+                else:
+                    result = payload
+        except queue.Empty:
+            pass
+        if result is None:
+            self.after(PROGRESS_POLL_MS, self._poll_progress)
+            return
+        self._set_running(False)
+        messagebox.showinfo("Risultato della Conversione", result)
+
+    def _show_progress(self, progress):
+        self.progress_bar["value"] = progress.fraction * 100
+        text = (f"{progress.rows:,} righe - {progress.bytes_read / 1048576:.1f} "
+                f"di {progress.total_bytes / 1048576:.1f} MB")
+        if progress.eta is not None:
+            minutes, seconds = divmod(int(progress.eta), 60)
+            text += f" - tempo rimanente {minutes}:{seconds:02d}"
+        self.progress_label.config(text=text)
+
+    def _set_running(self, running):
+        state = tk.DISABLED if running else tk.NORMAL
+        self.convert_btn.config(state=state)
+        self.back_btn.config(state=state)
+        self.cancel_btn.config(state=tk.NORMAL if running else tk.DISABLED)
+        if running:
+            self.progress_bar["value"] = 0
+            self.progress_label.config(text="Conversione in corso...")
+        else:
+            self.progress_label.config(text="")
+
+    def cancel_conversion(self):
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+            self.cancel_btn.config(state=tk.DISABLED)
+            self.progress_label.config(text="Annullamento in corso...")
+
+    def on_close(self):
+        # Alla chiusura si annulla la conversione e si attende la rimozione del file parziale
+        if self.worker is not None and self.worker.is_alive():
+            self.cancel_event.set()
+            self.worker.join(timeout=10)
+        self.destroy()
+
+if __name__ == '__main__':
+    app = MainApp()
+    app.mainloop()
@@ -7,6 +7,7 @@ O semplicemente: python test_excel_to_sql_converter.py
 
 import unittest
 import tempfile
+import io
 import os
 import pandas as pd
 import logging
@@ -17,10 +18,66 @@ import sys
 from excel_to_sql_converter import (
     load_csv_robust, 
     format_insert, 
+    format_copy,
+    infer_column_types,
+    TableStats,
+    ConversionMetrics,
     convert_file, 
     setup_logging,
+    sniff_csv,
+    detect_csv_dialect,
+    iter_excel_chunks,
+    convert_workbook,
+    load_file_to_db,
+    iter_arrow_chunks,
+    _pyarrow_available,
+    ConnectionPool,
     CSVLoadError
 )
+from excel_to_sql_cli import expand_inputs, parse_table_map, parse_size, resolve_table, main as cli_main
+
+
+_dialect_cache_dir = None
+_dialect_cache_patch = None
+
+
+def setUpModule():
+    """Cache dei dialetti in una cartella temporanea: i test non scrivono in quella dell'utente"""
+    global _dialect_cache_dir, _dialect_cache_patch
+    _dialect_cache_dir = tempfile.mkdtemp()
+    _dialect_cache_patch = patch('excel_to_sql_converter.DIALECT_CACHE_FILE',
+                                 os.path.join(_dialect_cache_dir, "dialect_cache.json"))
+    _dialect_cache_patch.start()
+
+
+def tearDownModule():
+    import shutil
+    _dialect_cache_patch.stop()
+    shutil.rmtree(_dialect_cache_dir, ignore_errors=True)
+
+
+def parse_copy_block(sql_text):
+    """Parser minimo del formato testo di COPY: restituisce (intestazione, righe)."""
+    lines = sql_text.split("\n")
+    start = next(i for i, line in enumerate(lines) if line.startswith("COPY "))
+    end = lines.index("\\.", start)
+    escapes = {"\\": "\\", "t": "\t", "n": "\n", "r": "\r"}
+
+    def unescape(field):
+        if field == "\\N":
+            return None
+        out, i = [], 0
+        while i < len(field):
+            if field[i] == "\\":
+                out.append(escapes[field[i + 1]])
+                i += 2
+            else:
+                out.append(field[i])
+                i += 1
+        return "".join(out)
+
+    rows = [[unescape(v) for v in line.split("\t")] for line in lines[start + 1:end]]
+    return lines[start], rows
 
 
 class TestCSVLoading(unittest.TestCase):
@@ -122,6 +179,162 @@ class TestCSVLoading(unittest.TestCase):
         self.assertEqual(len(df.columns), 2)
 
 
+    def test_sniff_csv_bounded_sample(self):
+        """Test rilevamento su campione limitato per file più grandi del campione"""
+        rows = "\n".join(f"{i};nome_{i};{i * 2}" for i in range(2000))
+        filepath = self.create_test_csv("id;nome;valore\n" + rows)
+
+        sample_df, dialect, complete = sniff_csv(filepath, sample_bytes=4096)
+
+        self.assertFalse(complete)
+        self.assertEqual(dialect.as_info(), {'separator': ';', 'encoding': 'utf-8'})
+        self.assertEqual(list(sample_df.columns), ['id', 'nome', 'valore'])
+        self.assertLess(len(sample_df), 2000)
+
+    def test_load_csv_parses_file_once(self):
+        """Test che il file venga letto da disco con read_csv una sola volta"""
+        csv_content = "nome;età;città\nMario;30;Roma\nLucia;25;Milano"
+        filepath = self.create_test_csv(csv_content)
+
+        with patch('excel_to_sql_converter.CSV_SNIFF_SAMPLE_BYTES', 20), \
+                patch('excel_to_sql_converter.pd.read_csv', wraps=pd.read_csv) as mock_read:
+            df, info = load_csv_robust(filepath)
+
+        # Le letture del campione avvengono su StringIO, quella completa sulla mappatura del file
+        file_reads = [c for c in mock_read.call_args_list if not isinstance(c.args[0], io.StringIO)]
+        self.assertEqual(len(file_reads), 1)
+        self.assertEqual(info, {'separator': ';', 'encoding': 'utf-8'})
+        self.assertEqual(len(df), 2)
+
+    def test_load_csv_utf16_comma_and_tab(self):
+        """Test UTF-16 con virgola o tab (con BOM LE e BE), non solo con punto e virgola"""
+        import codecs
+        content = "id,nome,città\n" + "".join(f"{i},Nome {i},Città {i}\n" for i in range(50))
+        filepath = self.create_test_csv(content, "utf16_comma.csv", encoding="utf-16")
+
+        df, info = load_csv_robust(filepath)
+
+        self.assertEqual(info, {'separator': ',', 'encoding': 'utf-16'})
+        self.assertEqual(list(df.columns), ['id', 'nome', 'città'])
+        self.assertEqual(len(df), 50)
+
+        filepath = os.path.join(self.temp_dir, "utf16be_tab.csv")
+        with open(filepath, 'wb') as f:
+            f.write(codecs.BOM_UTF16_BE + content.replace(",", "\t").encode("utf-16-be"))
+        df, info = load_csv_robust(filepath)
+        self.assertEqual(info['separator'], '\t')
+        self.assertEqual(df.iloc[-1].tolist(), ['49', 'Nome 49', 'Città 49'])
+
+    def test_sniff_quoted_newline_at_sample_boundary(self):
+        """Test campione troncato dentro un valore tra virgolette su più righe"""
+        before = "id,nome,nota\n" + "".join(f"{i},Nome {i},nota {i}\n" for i in range(200))
+        multiline = '200,"Nome 200","riga uno\nriga due\nriga tre"\n'
+        after = "".join(f"{i},Nome {i},nota {i}\n" for i in range(201, 400))
+        filepath = self.create_test_csv(before + multiline + after)
+        # Il campione termina tra "riga due" e "riga tre": l'ultimo a capo è dentro le virgolette
+        boundary = len((before + multiline).split("riga tre")[0].encode("utf-8")) - 1
+
+        df, dialect, complete = sniff_csv(filepath, sample_bytes=boundary)
+
+        self.assertFalse(complete)
+        self.assertEqual((dialect.separator, dialect.num_cols), (',', 3))
+        self.assertEqual(len(df), 200)
+
+        with patch('excel_to_sql_converter.CSV_SNIFF_SAMPLE_BYTES', boundary):
+            df, info = load_csv_robust(filepath)
+        self.assertEqual(info['separator'], ',')
+        self.assertEqual(len(df), 400)
+        self.assertEqual(df.iloc[200]['nota'], "riga uno\nriga due\nriga tre")
+
+    def test_map_input_shared_by_detection_and_read(self):
+        """Test mappatura del file condivisa tra rilevamento e lettura, anche in UTF-16"""
+        from excel_to_sql_converter import map_input
+        filepath = os.path.join(self.temp_dir, "utf16.csv")
+        with open(filepath, 'w', encoding='utf-16') as f:
+            f.write("nome;città\n" + "".join(f"Nome {i};Città {i}\n" for i in range(500)))
+
+        with map_input(filepath) as source:
+            dialect = detect_csv_dialect(filepath, use_cache=False, source=source)
+            source.seek(0)
+            df = pd.read_csv(source, **dialect.read_csv_kwargs())
+
+        self.assertEqual(dialect.as_info(), {'separator': ';', 'encoding': 'utf-16'})
+        self.assertEqual(list(df.columns), ['nome', 'città'])
+        self.assertEqual(df.iloc[-1].tolist(), ['Nome 499', 'Città 499'])
+
+        # I file vuoti non si possono mappare: vengono aperti normalmente
+        empty = self.create_test_csv("")
+        with map_input(empty) as source:
+            self.assertEqual(source.read(), b"")
+
+    def test_load_csv_small_file_not_reread(self):
+        """Test che un file contenuto nel campione non venga riletto da disco"""
+        filepath = self.create_test_csv("a,b\n1,2\n3,4")
+
+        with patch('excel_to_sql_converter.pd.read_csv', wraps=pd.read_csv) as mock_read:
+            df, info = load_csv_robust(filepath)
+
+        self.assertFalse([c for c in mock_read.call_args_list if not isinstance(c.args[0], io.StringIO)])
+        self.assertEqual(len(df), 2)
+
+class TestDialectDetection(unittest.TestCase):
+    """Test per detect_csv_dialect e la cache dei dialetti"""
+
+    def setUp(self):
+        """Setup per ogni test"""
+        self.temp_dir = tempfile.mkdtemp()
+        cache_patch = patch('excel_to_sql_converter.DIALECT_CACHE_FILE',
+                            os.path.join(self.temp_dir, "cache", "dialect_cache.json"))
+        cache_patch.start()
+        self.addCleanup(cache_patch.stop)
+        self.filepath = os.path.join(self.temp_dir, "export.csv")
+        with open(self.filepath, 'w', encoding='utf-8', newline='') as f:
+            f.write("id;nome;città\n1;Mario;Roma\n2;Lucia;Milano")
+
+    def tearDown(self):
+        """Cleanup dopo ogni test"""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_detect_csv_dialect(self):
+        """Test oggetto dialetto con parametri riutilizzabili per read_csv"""
+        dialect = detect_csv_dialect(self.filepath)
+
+        self.assertEqual((dialect.separator, dialect.encoding, dialect.header), (';', 'utf-8', 0))
+        self.assertEqual(dialect.num_cols, 3)
+        self.assertEqual(dialect.non_empty_rows, 2)
+        df = pd.read_csv(self.filepath, **dialect.read_csv_kwargs())
+        self.assertEqual(list(df.columns), ['id', 'nome', 'città'])
+
+    def test_detect_csv_dialect_uses_cache(self):
+        """Test che una seconda rilevazione sullo stesso file salti lo sniffing"""
+        first = detect_csv_dialect(self.filepath)
+
+        with patch('excel_to_sql_converter.sniff_csv') as mock_sniff:
+            second = detect_csv_dialect(self.filepath)
+            df, info = load_csv_robust(self.filepath)
+
+        mock_sniff.assert_not_called()
+        self.assertEqual(first, second)
+        self.assertEqual(info, {'separator': ';', 'encoding': 'utf-8'})
+        self.assertEqual(len(df), 2)
+
+    def test_detect_csv_dialect_cache_invalidated_on_change(self):
+        """Test che la cache venga ignorata se il file cambia"""
+        detect_csv_dialect(self.filepath)
+        with open(self.filepath, 'w', encoding='utf-8', newline='') as f:
+            f.write("id,nome\n1,Mario\n2,Lucia\n3,Anna")
+
+        dialect = detect_csv_dialect(self.filepath)
+
+        self.assertEqual(dialect.separator, ',')
+
+    def test_detect_csv_dialect_without_cache(self):
+        """Test rilevazione con cache disabilitata"""
+        detect_csv_dialect(self.filepath, use_cache=False)
+
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, "cache", "dialect_cache.json")))
+
 class TestSQLFormatting(unittest.TestCase):
     """Test per la funzione format_insert"""
     
@@ -133,6 +346,93 @@ class TestSQLFormatting(unittest.TestCase):
             'età': [30, 25, None]
         })
     
+    def test_format_copy_round_trip(self):
+        """Test formato testo COPY: escape di backslash/tab/a capo e \\N per i NULL"""
+        df = pd.DataFrame({'a': ["x\ty", "riga1\nriga2", "c:\\temp", None, "\\N"],
+                           'b': ["1", "2\r", "", "4", "5"]})
+        text = format_copy(df)
+        self.assertEqual(len(text.split("\n")), 5)
+        _, rows = parse_copy_block("COPY t FROM stdin;\n" + text + "\n\\.")
+        expected = [[None if pd.isna(v) else v for v in row] for row in df.values.tolist()]
+        self.assertEqual(rows, expected)
+
+    def test_infer_column_types(self):
+        """Test deduzione dei tipi: interi, decimali, booleani, date, timestamp, testo"""
+        df = pd.DataFrame({
+            'id': ['1', '2', '-3'],
+            'cap': ['00123', '20100', '10100'],
+            'prezzo': ['1.5', '2', '3.25'],
+            'attivo': ['true', 'False', None],
+            'giorno': ['2024-01-05', '2024-02-29', None],
+            'ora': ['2024-01-05 10:00:00', '2024-01-05T11:00:00.5', '2024-01-06'],
+            'nome': ["Mario", "2024-13-01", None],
+            'vuota': [None, None, None],
+        })
+        self.assertEqual(infer_column_types(df), {
+            'id': 'integer', 'cap': 'text', 'prezzo': 'decimal', 'attivo': 'boolean',
+            'giorno': 'date', 'ora': 'timestamp', 'nome': 'text', 'vuota': 'text',
+        })
+        # Solo il campione viene esaminato
+        self.assertEqual(infer_column_types(pd.DataFrame({'x': ['1', 'a']}), sample_rows=1), {'x': 'integer'})
+
+    def test_format_insert_typed_literals(self):
+        """Test letterali tipizzati per ogni database; valori fuori tipo restano stringhe quotate"""
+        df = pd.DataFrame({'id': ['1', 'abc'], 'attivo': ['true', 'false'],
+                           'giorno': ['2024-01-05', '2023-02-30'], 'ora': ['2024-01-05T10:00:00', None]})
+        types = {'id': 'integer', 'attivo': 'boolean', 'giorno': 'date', 'ora': 'timestamp'}
+
+        pg = format_insert("postgres", "public", "t", df, column_types=types).split("\n")
+        self.assertTrue(pg[0].endswith("VALUES (1, TRUE, DATE '2024-01-05', TIMESTAMP '2024-01-05 10:00:00');"))
+        self.assertTrue(pg[1].endswith("VALUES ('abc', FALSE, '2023-02-30', NULL);"))
+
+        ora = format_insert("oracle", "HR", "t", df, column_types=types).split("\n")
+        self.assertTrue(ora[0].endswith("VALUES (1, 1, TO_DATE('2024-01-05', 'YYYY-MM-DD'), "
+                                        "TO_TIMESTAMP('2024-01-05 10:00:00', 'YYYY-MM-DD HH24:MI:SS'));"))
+
+        ms = format_insert("sqlserver", "dbo", "t", df, column_types=types).split("\n")
+        self.assertTrue(ms[0].endswith("VALUES (1, 1, CONVERT(DATE, '2024-01-05', 23), "
+                                       "CONVERT(DATETIME2, '2024-01-05 10:00:00', 121));"))
+        # Senza column_types l'output resta quello con tutte stringhe
+        self.assertEqual(format_insert("postgres", "public", "t", df, column_types={'id': 'text'}),
+                         format_insert("postgres", "public", "t", df))
+
+    def test_table_stats_create_table(self):
+        """Test DDL: statistiche incrementali su più blocchi, tipi per database e NOT NULL"""
+        df = pd.DataFrame({
+            'id': ['1', '2', '70000'],
+            'cap': ['00123', '20100', '10100'],
+            'prezzo': ['1.5', '-22', '3.125'],
+            'attivo': ['true', 'false', None],
+            'nato': ['1990-01-05', '1985-02-28', '2000-12-31'],
+            'note': ['breve', None, 'un testo più lungo'],
+        })
+        stats = TableStats()
+        for _ in stats.track([df.iloc[:2], df.iloc[2:]]):
+            pass
+        whole = TableStats()
+        whole.update(df)
+        self.assertEqual(stats.create_table("postgres", "public", "t"), whole.create_table("postgres", "public", "t"))
+
+        self.assertEqual(stats.create_table("postgres", "public", "clienti"), (
+            'CREATE TABLE "public"."clienti" (\n'
+            '    "id" INTEGER NOT NULL,\n'
+            '    "cap" VARCHAR(5) NOT NULL,\n'
+            '    "prezzo" NUMERIC(5, 3) NOT NULL,\n'
+            '    "attivo" BOOLEAN,\n'
+            '    "nato" DATE NOT NULL,\n'
+            '    "note" VARCHAR(18)\n'
+            ');\n'))
+        ms = stats.create_table("sqlserver", "dbo", "clienti")
+        self.assertIn("[id] INT NOT NULL", ms)
+        self.assertIn("[prezzo] DECIMAL(5, 3) NOT NULL", ms)
+        self.assertIn("[attivo] BIT,", ms)
+        self.assertIn("[note] NVARCHAR(18)", ms)
+        self.assertTrue(ms.endswith(");\nGO\n"))
+        ora = stats.create_table("oracle", "HR", "clienti")
+        self.assertIn("CREATE TABLE HR.clienti (", ora)
+        self.assertIn("id NUMBER(5) NOT NULL", ora)
+        self.assertIn("note VARCHAR2(18 CHAR)", ora)
+
     def test_format_insert_postgres(self):
         """Test generazione SQL per PostgreSQL"""
         result = format_insert("postgres", "public", "utenti", self.sample_df)
@@ -175,6 +475,111 @@ class TestSQLFormatting(unittest.TestCase):
         self.assertIn("'Test''s ''quote'''", result)
         self.assertIn("'Another ''test'''", result)
 
+    def test_format_insert_output_identical_to_row_by_row(self):
+        """Test output byte per byte uguale alla vecchia implementazione con iterrows()"""
+        mixed_df = pd.DataFrame({
+            'a': ['x', None, "O'Brien"],
+            'n': [1, 2, 3],
+            'f': [0.1, float('nan'), 2.0],
+            'b': [True, False, None],
+            'd': pd.to_datetime(['2024-01-01', None, '2024-03-01'])
+        })
+        expected = (
+            "INSERT INTO [s].[t] (a, n, f, b, d) VALUES ('x', '1', '0.1', 'True', '2024-01-01 00:00:00');\n"
+            "INSERT INTO [s].[t] (a, n, f, b, d) VALUES (NULL, '2', NULL, 'False', NULL);\n"
+            "INSERT INTO [s].[t] (a, n, f, b, d) VALUES ('O''Brien', '3', '2.0', NULL, '2024-03-01 00:00:00');"
+        )
+        self.assertEqual(format_insert("sqlserver", "s", "t", mixed_df), expected)
+
+        # Frame solo numerico: iterrows() promuove gli interi a float
+        numeric_df = pd.DataFrame({'id': [1, 2], 'v': [1.5, None]})
+        expected = (
+            'INSERT INTO [s].[t] ("id", "v") VALUES (\'1.0\', \'1.5\');\n'
+            'INSERT INTO [s].[t] ("id", "v") VALUES (\'2.0\', NULL);'
+        )
+        self.assertEqual(format_insert("postgres", "s", "t", numeric_df), expected)
+
+    def test_format_insert_string_columns_with_separator_char(self):
+        """Test valori contenenti il separatore interno usato per l'escape in blocco"""
+        df = pd.DataFrame({'text': ["a\x00b", "c'd", None]}, dtype=str)
+
+        result = format_insert("oracle", "s", "t", df)
+
+        self.assertEqual(result.splitlines(), [
+            "INSERT INTO [s].[t] (text) VALUES ('a\x00b');",
+            "INSERT INTO [s].[t] (text) VALUES ('c''d');",
+            "INSERT INTO [s].[t] (text) VALUES (NULL);",
+        ])
+
+
+    def test_format_insert_batch_postgres(self):
+        """Test INSERT multi-riga per PostgreSQL"""
+        result = format_insert("postgres", "public", "utenti", self.sample_df, batch_size=2)
+
+        self.assertEqual(result.count("INSERT INTO"), 2)
+        self.assertIn('INSERT INTO [public].[utenti] ("id", "nome", "età") VALUES\n', result)
+        self.assertIn("('1', 'Mario', '30.0'),\n('2', 'Luc''ia', '25.0');", result)
+        self.assertTrue(result.endswith("('3', 'Giuseppe', NULL);"))
+
+    def test_format_insert_batch_sqlserver_row_limit(self):
+        """Test limite di 1000 righe per VALUES in SQL Server"""
+        df = pd.DataFrame({'id': [str(i) for i in range(2500)]})
+
+        result = format_insert("sqlserver", "dbo", "t", df, batch_size=5000)
+
+        self.assertEqual(result.count("INSERT INTO"), 3)
+        self.assertEqual(result.count("('"), 2500)
+
+    def test_format_insert_batch_oracle_insert_all(self):
+        """Test INSERT ALL ... SELECT 1 FROM DUAL per Oracle"""
+        result = format_insert("oracle", "HR", "EMPLOYEES", self.sample_df, batch_size=10)
+
+        self.assertTrue(result.startswith("INSERT ALL\n"))
+        self.assertIn("  INTO [HR].[EMPLOYEES] (id, nome, età) VALUES ('2', 'Luc''ia', '25.0')\n", result)
+        self.assertTrue(result.endswith("SELECT 1 FROM DUAL;"))
+        self.assertEqual(result.count("INSERT ALL"), 1)
+
+    def test_format_insert_upsert_postgres(self):
+        """Test caricamento per chiave: INSERT ... ON CONFLICT DO UPDATE per PostgreSQL"""
+        result = format_insert("postgres", "public", "utenti", self.sample_df, batch_size=2, key_columns=["id"])
+
+        self.assertEqual(result.count("INSERT INTO"), 2)
+        self.assertTrue(result.startswith(
+            'INSERT INTO "public"."utenti" ("id", "nome", "età") VALUES\n'
+            "('1', 'Mario', '30.0'),\n('2', 'Luc''ia', '25.0')\n"
+            'ON CONFLICT ("id") DO UPDATE SET "nome" = EXCLUDED."nome", "età" = EXCLUDED."età";\n'))
+
+        # Solo colonne chiave: niente da aggiornare
+        result = format_insert("postgres", "public", "t", self.sample_df[["id"]], key_columns=["id"])
+        self.assertTrue(result.endswith('ON CONFLICT ("id") DO NOTHING;'))
+
+    def test_format_insert_upsert_merge(self):
+        """Test caricamento per chiave: MERGE per SQL Server (VALUES) e Oracle (SELECT da DUAL)"""
+        result = format_insert("sqlserver", "dbo", "utenti", self.sample_df, batch_size=10, key_columns=["id"])
+        self.assertEqual(result, (
+            "MERGE INTO [dbo].[utenti] AS tgt\n"
+            "USING (VALUES\n('1', 'Mario', '30.0'),\n('2', 'Luc''ia', '25.0'),\n('3', 'Giuseppe', NULL)\n"
+            ") AS src ([id], [nome], [età])\n"
+            "ON tgt.[id] = src.[id]\n"
+            "WHEN MATCHED THEN UPDATE SET tgt.[nome] = src.[nome], tgt.[età] = src.[età]\n"
+            "WHEN NOT MATCHED THEN INSERT ([id], [nome], [età]) VALUES (src.[id], src.[nome], src.[età]);"))
+
+        result = format_insert("oracle", "HR", "EMP", self.sample_df, batch_size=10, key_columns=["id", "nome"])
+        self.assertTrue(result.startswith(
+            "MERGE INTO HR.EMP tgt\nUSING (\n"
+            "  SELECT '1' AS id, 'Mario' AS nome, '30.0' AS età FROM DUAL UNION ALL\n"))
+        self.assertIn("ON (tgt.id = src.id AND tgt.nome = src.nome)\n"
+                      "WHEN MATCHED THEN UPDATE SET tgt.età = src.età\n", result)
+
+        with self.assertRaises(ValueError):
+            format_insert("oracle", "HR", "EMP", self.sample_df, key_columns=["codice"])
+
+    def test_format_insert_batch_size_one_is_row_by_row(self):
+        """Test batch_size=1 equivalente agli INSERT riga per riga"""
+        self.assertEqual(
+            format_insert("postgres", "public", "utenti", self.sample_df, batch_size=1),
+            format_insert("postgres", "public", "utenti", self.sample_df)
+        )
 
 class TestConvertFile(unittest.TestCase):
     """Test per la funzione convert_file"""
@@ -237,6 +642,452 @@ class TestConvertFile(unittest.TestCase):
             self.assertIn("USE [TestDB]", sql_content)
             self.assertIn("GO", sql_content)
     
+    @patch('excel_to_sql_converter.logging')
+    def test_convert_csv_file_batched(self, mock_logging):
+        """Test conversione CSV con INSERT multi-riga mantenendo l'intestazione"""
+        csv_content = "nome,età\nMario,30\nLucia,25\nAnna,40"
+        csv_path = self.create_test_file(csv_content, "test.csv")
+
+        result = convert_file(csv_path, "sqlserver", "dbo", "utenti", "TestDB", batch_size=2)
+
+        self.assertIn("OK", result)
+        with open(os.path.join(self.temp_dir, "test.sql"), 'r', encoding='utf-8') as f:
+            sql_content = f.read()
+        self.assertTrue(sql_content.startswith("USE [TestDB]\nGO\n\nDELETE FROM [dbo].[utenti];\nGO\n\n"))
+        self.assertEqual(sql_content.count("INSERT INTO"), 2)
+
+    @patch('excel_to_sql_converter.logging')
+    def test_convert_csv_file_copy(self, mock_logging):
+        """Test formato COPY per Postgres: DELETE, blocco COPY e terminatore \\."""
+        csv_content = "nome,età\nMario,30\nO'Brien,\nAnna,40"
+        csv_path = self.create_test_file(csv_content, "test.csv")
+
+        result = convert_file(csv_path, "postgres", "public", "utenti", output_format="copy")
+
+        self.assertIn("OK", result)
+        self.assertIn("Righe: 3", result)
+        with open(os.path.join(self.temp_dir, "test.sql"), 'r', encoding='utf-8') as f:
+            sql_content = f.read()
+        self.assertTrue(sql_content.startswith('DELETE FROM "public"."utenti";\n\n'))
+        self.assertTrue(sql_content.endswith("\\.\n"))
+        header, rows = parse_copy_block(sql_content)
+        self.assertEqual(header, 'COPY "public"."utenti" ("nome", "età") FROM stdin;')
+        self.assertEqual(rows, [["Mario", "30"], ["O'Brien", None], ["Anna", "40"]])
+
+    @patch('excel_to_sql_converter.logging')
+    def test_convert_csv_file_bcp(self, mock_logging):
+        """Test formato BCP: file dati, file di formato XML e script BULK INSERT"""
+        import xml.etree.ElementTree as ET
+        csv_content = "nome,età\nMario,30\nO'Brien,\nAnna,40"
+        csv_path = self.create_test_file(csv_content, "test.csv")
+
+        result = convert_file(csv_path, "sqlserver", "dbo", "utenti", "TestDB", output_format="bcp")
+
+        self.assertIn("OK", result)
+        self.assertIn("Righe: 3", result)
+        with open(os.path.join(self.temp_dir, "test.dat"), 'rb') as f:
+            self.assertEqual(f.read().decode('utf-8'), "Mario\t30\r\nO'Brien\t\r\nAnna\t40\r\n")
+
+        ns = {'b': "http://schemas.microsoft.com/sqlserver/2004/bulkload/format",
+              'xsi': "http://www.w3.org/2001/XMLSchema-instance"}
+        root = ET.parse(os.path.join(self.temp_dir, "test.fmt")).getroot()
+        fields = root.findall("b:RECORD/b:FIELD", ns)
+        self.assertEqual([f.get("TERMINATOR") for f in fields], ["\\t", "\\r\\n"])
+        self.assertEqual([c.get("NAME") for c in root.findall("b:ROW/b:COLUMN", ns)], ["nome", "età"])
+
+        with open(os.path.join(self.temp_dir, "test.sql"), 'r', encoding='utf-8') as f:
+            sql_content = f.read()
+        self.assertTrue(sql_content.startswith("USE [TestDB]\nGO\n\n"))
+        self.assertIn("DELETE FROM [dbo].[utenti];", sql_content)
+        self.assertIn("BULK INSERT [dbo].[utenti]", sql_content)
+        self.assertIn(os.path.join(self.temp_dir, "test.dat"), sql_content)
+        self.assertIn("KEEPNULLS", sql_content)
+
+    @patch('excel_to_sql_converter.logging')
+    def test_convert_bcp_rejects_terminators_in_data(self, mock_logging):
+        """Test BCP: valori con tab non rappresentabili, nessun file parziale"""
+        csv_path = self.create_test_file('nome,note\nMario,"a\tb"', "test.csv")
+        result = convert_file(csv_path, "sqlserver", "dbo", "utenti", output_format="bcp")
+        self.assertIn("Errore", result)
+        for ext in (".sql", ".dat", ".fmt"):
+            self.assertFalse(os.path.exists(os.path.join(self.temp_dir, "test" + ext)))
+
+    @patch('excel_to_sql_converter.logging')
+    def test_convert_csv_file_sqlldr(self, mock_logging):
+        """Test formato SQL*Loader: control file direct path e file dati con campi quotati"""
+        import csv
+        csv_content = 'nome,note\nMario,"a, b"\nLucia,"dice ""ciao"""\nAnna,'
+        csv_path = self.create_test_file(csv_content, "test.csv")
+
+        result = convert_file(csv_path, "oracle", "HR", "utenti", output_format="sqlldr")
+
+        self.assertIn("OK", result)
+        self.assertIn("test.ctl", result)
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, "test.sql")))
+        with open(os.path.join(self.temp_dir, "test.ctl"), 'r', encoding='utf-8') as f:
+            ctl = f.read()
+        self.assertIn("OPTIONS (DIRECT=TRUE", ctl)
+        self.assertIn("INFILE 'test.dat'", ctl)
+        self.assertIn("REPLACE\nINTO TABLE HR.utenti", ctl)
+        self.assertIn("FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"'", ctl)
+        self.assertIn("  nome CHAR(4000),\n  note CHAR(4000)\n)", ctl)
+
+        # Round trip del file dati: virgole e doppi apici nei valori restano intatti
+        with open(os.path.join(self.temp_dir, "test.dat"), 'r', encoding='utf-8', newline='') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows, [["Mario", "a, b"], ["Lucia", 'dice "ciao"'], ["Anna", ""]])
+
+    @patch('excel_to_sql_converter.logging')
+    def test_convert_sqlldr_rejects_identifiers(self, mock_logging):
+        """Test SQL*Loader: intestazioni non valide come identificatori vengono rifiutate"""
+        csv_path = self.create_test_file('nome;"col; drop"\nMario;1', "test.csv")
+        result = convert_file(csv_path, "oracle", "HR", "utenti", output_format="sqlldr")
+        self.assertIn("Errore", result)
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, "test.ctl")))
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, "test.dat")))
+
+    @patch('excel_to_sql_converter.logging')
+    def test_convert_gzip_output(self, mock_logging):
+        """Test script compresso al volo con gzip"""
+        import gzip
+        csv_path = self.create_test_file("nome,età\nMario,30\nLucia,25", "test.csv")
+
+        result = convert_file(csv_path, "postgres", "public", "utenti", compression="gzip")
+
+        gz_path = os.path.join(self.temp_dir, "test.sql.gz")
+        self.assertIn(f"Generato: {gz_path}", result)
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, "test.sql")))
+        with gzip.open(gz_path, 'rt', encoding='utf-8') as f:
+            sql_content = f.read()
+        self.assertTrue(sql_content.startswith("DELETE FROM [public].[utenti];"))
+        self.assertEqual(sql_content.count("INSERT INTO"), 2)
+
+    @patch('excel_to_sql_converter.logging')
+    def test_convert_zstd_output(self, mock_logging):
+        """Test compressione zstd (richiede il pacchetto opzionale zstandard)"""
+        csv_path = self.create_test_file("nome,età\nMario,30\nLucia,25", "test.csv")
+        result = convert_file(csv_path, "postgres", "public", "utenti", compression="zstd")
+        try:
+            import zstandard
+        except ImportError:
+            self.assertIn("zstandard", result)
+            self.assertFalse(os.path.exists(os.path.join(self.temp_dir, "test.sql.zst")))
+            return
+        with zstandard.open(os.path.join(self.temp_dir, "test.sql.zst"), 'rt', encoding='utf-8') as f:
+            self.assertIn("INSERT INTO", f.read())
+
+    @patch('excel_to_sql_converter.logging')
+    def test_convert_split_rows(self, mock_logging):
+        """Test suddivisione per righe: DELETE solo nella prima parte, USE/GO in tutte"""
+        rows = "\n".join(f"{i},nome{i}" for i in range(7))
+        csv_path = self.create_test_file("id,nome\n" + rows, "test.csv")
+
+        result = convert_file(csv_path, "sqlserver", "dbo", "utenti", "TestDB", batch_size=2, split_rows=3)
+
+        self.assertIn("Generati: 3 file", result)
+        parts = []
+        for n in (1, 2, 3):
+            with open(os.path.join(self.temp_dir, f"test.part00{n}.sql"), 'r', encoding='utf-8') as f:
+                parts.append(f.read())
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, "test.sql")))
+        self.assertTrue(parts[0].startswith("USE [TestDB]\nGO\n\nDELETE FROM [dbo].[utenti];"))
+        for part in parts[1:]:
+            self.assertTrue(part.startswith("USE [TestDB]\nGO\n\nINSERT INTO"))
+            self.assertNotIn("DELETE", part)
+        self.assertEqual([p.count("(") - p.count("INSERT INTO") for p in parts], [3, 3, 1])
+        self.assertIn("'nome6'", parts[2])
+
+    @patch('excel_to_sql_converter.logging')
+    def test_convert_split_bytes_copy(self, mock_logging):
+        """Test suddivisione per dimensione del formato COPY: ogni parte è un blocco completo
+        entro il limite, chiusura \\. e separatori di riga di Windows compresi"""
+        rows = "\n".join(f"{i},{'x' * 50}" for i in range(40))
+        csv_path = self.create_test_file("id,testo\n" + rows, "test.csv")
+
+        for linesep in ("\n", "\r\n"):
+            for split_bytes in (582, 603, 1024, 1128):
+                for name in os.listdir(self.temp_dir):
+                    if name.startswith("test.part"):
+                        os.remove(os.path.join(self.temp_dir, name))
+                with patch('excel_to_sql_converter.SPLIT_PIECE_ROWS', 5), \
+                        patch('excel_to_sql_converter.os.linesep', linesep):
+                    result = convert_file(csv_path, "postgres", "public", "t", output_format="copy",
+                                          split_bytes=split_bytes)
+
+                self.assertIn("OK", result)
+                names = sorted(n for n in os.listdir(self.temp_dir) if n.startswith("test.part"))
+                self.assertGreater(len(names), 1)
+                loaded = []
+                for i, name in enumerate(names):
+                    path = os.path.join(self.temp_dir, name)
+                    self.assertLessEqual(os.path.getsize(path), split_bytes, (linesep, split_bytes, name))
+                    with open(path, 'r', encoding='utf-8') as f:
+                        content = f.read()
+                    self.assertEqual(content.startswith("DELETE FROM"), i == 0)
+                    header, part_rows = parse_copy_block(content)
+                    self.assertEqual(header, 'COPY "public"."t" ("id", "testo") FROM stdin;')
+                    loaded.extend(part_rows)
+                self.assertEqual([r[0] for r in loaded], [str(i) for i in range(40)])
+
+    @patch('excel_to_sql_converter.logging')
+    def test_convert_split_bytes_smaller_than_piece(self, mock_logging):
+        """Test limite più piccolo di un pezzo di SPLIT_PIECE_ROWS righe: il pezzo viene diviso di nuovo"""
+        import re
+        rows = "\n".join(f"{i},{'x' * 50}" for i in range(300))
+        csv_path = self.create_test_file("id,testo\n" + rows, "test.csv")
+
+        for output_format, split_bytes in (("insert", 2500), ("insert", 4000), ("copy", 1500), ("copy", 5000)):
+            for name in os.listdir(self.temp_dir):
+                if name.startswith("test.part"):
+                    os.remove(os.path.join(self.temp_dir, name))
+            result = convert_file(csv_path, "postgres", "public", "t", output_format=output_format,
+                                  split_bytes=split_bytes)
+
+            self.assertIn("Righe: 300", result)
+            names = sorted(n for n in os.listdir(self.temp_dir) if n.startswith("test.part"))
+            ids = []
+            for name in names:
+                path = os.path.join(self.temp_dir, name)
+                self.assertLessEqual(os.path.getsize(path), split_bytes, (output_format, split_bytes, name))
+                with open(path, 'r', encoding='utf-8') as f:
+                    ids += re.findall(r"(\d+)'?(?:, '|\t)x{50}", f.read())
+            self.assertEqual(ids, [str(i) for i in range(300)], (output_format, split_bytes))
+
+    @patch('excel_to_sql_converter.logging')
+    def test_convert_output_written_in_blocks(self, mock_logging):
+        """Test file caricato interamente: conversione a blocchi e buffer piccolo, stesso script"""
+        rows = "\n".join(f"{i},nome{i},città{i}" for i in range(25))
+        csv_path = self.create_test_file("id,nome,città\n" + rows, "test.csv")
+        sql_path = os.path.join(self.temp_dir, "test.sql")
+
+        convert_file(csv_path, "postgres", "public", "utenti")
+        with open(sql_path, 'rb') as f:
+            expected = f.read()
+        with patch('excel_to_sql_converter.CHUNK_ROWS', 4), patch('excel_to_sql_converter.OUTPUT_BUFFER_BYTES', 64):
+            result = convert_file(csv_path, "postgres", "public", "utenti")
+
+        self.assertIn("Righe: 25", result)
+        with open(sql_path, 'rb') as f:
+            self.assertEqual(f.read(), expected)
+        self.assertEqual(expected.decode('utf-8').count("INSERT INTO"), 25)
+
+    @patch('excel_to_sql_converter.logging')
+    def test_convert_csv_file_typed(self, mock_logging):
+        """Test conversione con tipi dedotti dal primo blocco"""
+        csv_content = "id,nome,importo,data\n1,Mario,10.5,2024-01-05\n2,Lucia,7,2024-02-01"
+        csv_path = self.create_test_file(csv_content, "test.csv")
+
+        result = convert_file(csv_path, "postgres", "public", "ordini", batch_size=10, typed=True)
+
+        self.assertIn("OK", result)
+        with open(os.path.join(self.temp_dir, "test.sql"), 'r', encoding='utf-8') as f:
+            sql_content = f.read()
+        self.assertIn("(1, 'Mario', 10.5, DATE '2024-01-05'),\n(2, 'Lucia', 7, DATE '2024-02-01');", sql_content)
+
+    @patch('excel_to_sql_converter.logging')
+    def test_convert_with_ddl(self, mock_logging):
+        """Test DDL generata nella stessa passata della conversione"""
+        csv_content = "id,nome,importo\n1,Mario,10.5\n2,Lucia,\n3,Anna,7"
+        csv_path = self.create_test_file(csv_content, "test.csv")
+
+        with patch('excel_to_sql_converter.CHUNK_ROWS', 2):
+            result = convert_file(csv_path, "sqlserver", "dbo", "ordini", ddl=True)
+
+        ddl_path = os.path.join(self.temp_dir, "test_create.sql")
+        self.assertIn(f"DDL: {ddl_path}", result)
+        with open(ddl_path, 'r', encoding='utf-8') as f:
+            ddl = f.read()
+        self.assertIn("CREATE TABLE [dbo].[ordini] (", ddl)
+        self.assertIn("[id] SMALLINT NOT NULL,", ddl)
+        self.assertIn("[nome] NVARCHAR(5) NOT NULL,", ddl)
+        self.assertIn("[importo] DECIMAL(3, 1)\n", ddl)
+
+    @patch('excel_to_sql_converter.logging')
+    def test_convert_delta(self, mock_logging):
+        """Test conversione incrementale: solo le righe nuove, modificate ed eliminate"""
+        sql_path = os.path.join(self.temp_dir, "test.sql")
+        index_path = os.path.join(self.temp_dir, "dbo.clienti.delta.sqlite")
+
+        def run(content):
+            csv_path = self.create_test_file(content, "test.csv")
+            result = convert_file(csv_path, "sqlserver", "dbo", "clienti", delta_keys=["id"])
+            with open(sql_path, 'r', encoding='utf-8') as f:
+                return result, f.read()
+
+        # Prima esecuzione: script completo e creazione dell'indice
+        result, sql = run("id,nome,città\n1,Mario,Roma\n2,Lucia,Milano\n3,Anna,Torino")
+        self.assertIn("Righe: 3", result)
+        self.assertTrue(sql.startswith("DELETE FROM [dbo].[clienti];"))
+        self.assertTrue(os.path.exists(index_path))
+
+        result, sql = run("id,nome,città\n1,Mario,Roma\n2,Lucia,Napoli\n4,Paolo,Bari")
+        self.assertIn("Delta: 1 nuove, 1 modificate, 1 eliminate", result)
+        self.assertNotIn("DELETE FROM [dbo].[clienti];", sql)
+        self.assertEqual(sql.strip().split("\n"), [
+            "INSERT INTO [dbo].[clienti] (id, nome, città) VALUES ('4', 'Paolo', 'Bari');",
+            "UPDATE [dbo].[clienti] SET [nome] = 'Lucia', [città] = 'Napoli' WHERE [id] = '2';",
+            "DELETE FROM [dbo].[clienti] WHERE [id] = '3';",
+        ])
+
+        # UPDATE e DELETE con la sintassi di Postgres e Oracle
+        from excel_to_sql_converter import format_delta, DELTA_OP_ATTR
+        changed = pd.DataFrame({'id': ['2'], 'nome': ['Lucia']})
+        changed.attrs[DELTA_OP_ATTR] = 'update'
+        self.assertEqual(format_delta("postgres", "public", "clienti", changed, ["id"]),
+                         'UPDATE "public"."clienti" SET "nome" = \'Lucia\' WHERE "id" = \'2\';')
+        self.assertEqual(format_delta("oracle", "HR", "clienti", changed, ["id"]),
+                         "UPDATE HR.clienti SET nome = 'Lucia' WHERE id = '2';")
+        changed.attrs[DELTA_OP_ATTR] = 'delete'
+        self.assertEqual(format_delta("postgres", "public", "clienti", changed[['id']], ["id"]),
+                         'DELETE FROM "public"."clienti" WHERE "id" = \'2\';')
+
+        # Nessuna modifica: nessuno statement
+        result, sql = run("id,nome,città\n1,Mario,Roma\n2,Lucia,Napoli\n4,Paolo,Bari")
+        self.assertIn("Delta: 0 nuove, 0 modificate, 0 eliminate", result)
+        self.assertEqual(sql, "")
+
+        # Chiave duplicata: errore e indice precedente invariato
+        result, _ = run("id,nome,città\n1,Mario,Roma\n1,Mario,Roma\n5,Gino,Pisa")
+        self.assertIn("Chiave duplicata", result)
+        result, sql = run("id,nome,città\n1,Mario,Roma\n2,Lucia,Napoli\n4,Paolo,Bari\n5,Gino,Pisa")
+        self.assertIn("Delta: 1 nuove, 0 modificate, 0 eliminate", result)
+        self.assertFalse(os.path.exists(index_path + ".tmp"))
+
+    @patch('excel_to_sql_converter.logging')
+    def test_convert_upsert_keys(self, mock_logging):
+        """Test conversione per chiave: niente DELETE, lo script aggiorna le righe esistenti"""
+        csv_path = self.create_test_file("id,nome\n1,Mario\n2,Lucia\n3,Anna", "test.csv")
+        result = convert_file(csv_path, "postgres", "public", "clienti", batch_size=2, upsert_keys=["id"])
+        self.assertIn("Righe: 3", result)
+        with open(os.path.join(self.temp_dir, "test.sql"), 'r', encoding='utf-8') as f:
+            sql = f.read()
+        self.assertNotIn("DELETE", sql)
+        self.assertEqual(sql.count("ON CONFLICT"), 2)
+
+        # La sintassi ON CONFLICT è supportata anche da sqlite: lo script viene eseguito davvero
+        import sqlite3
+        conn = sqlite3.connect(":memory:")
+        conn.execute('ATTACH ":memory:" AS public')
+        conn.execute('CREATE TABLE public.clienti (id TEXT PRIMARY KEY, nome TEXT)')
+        conn.execute("INSERT INTO public.clienti VALUES ('2', 'vecchio'), ('9', 'Gino')")
+        conn.executescript(sql)
+        self.assertEqual(conn.execute("SELECT id, nome FROM public.clienti ORDER BY id").fetchall(),
+                         [('1', 'Mario'), ('2', 'Lucia'), ('3', 'Anna'), ('9', 'Gino')])
+        conn.close()
+
+        result = convert_file(csv_path, "postgres", "public", "clienti", upsert_keys=["id"], output_format="copy")
+        self.assertIn("Errore", result)
+
+    def test_convert_metrics(self):
+        """Test metriche per fase e riga JSON nel log"""
+        import json
+        csv_path = self.create_test_file("id,nome\n1,Mario\n2,Lucia\n3,Anna", "test.csv")
+        metrics = ConversionMetrics()
+
+        result = convert_file(csv_path, "postgres", "public", "clienti", metrics=metrics)
+
+        self.assertIn("Righe: 3", result)
+        self.assertEqual((metrics.rows, metrics.chunks), (3, 1))
+        self.assertEqual(metrics.bytes_in, os.path.getsize(csv_path))
+        self.assertEqual(metrics.bytes_out, os.path.getsize(os.path.join(self.temp_dir, "test.sql")))
+        self.assertGreater(metrics.detect, 0)
+        self.assertGreaterEqual(metrics.total, metrics.detect + metrics.read + metrics.render + metrics.write)
+        with open(os.path.join(self.temp_dir, "test_log.log"), 'r', encoding='utf-8') as f:
+            line = [ln for ln in f if "Metriche conversione: " in ln][-1]
+        logged = json.loads(line.split("Metriche conversione: ", 1)[1])
+        self.assertEqual(logged['rows'], 3)
+        self.assertEqual(set(logged), {'detect', 'read', 'render', 'write', 'total', 'rows', 'chunks',
+                                       'bytes_in', 'bytes_out', 'peak_memory_mb'})
+
+        # Anche in caso di errore le metriche vengono compilate
+        metrics = ConversionMetrics()
+        result = convert_file(csv_path, "postgres", "public", "nome non valido", metrics=metrics)
+        self.assertIn("Errore", result)
+        self.assertEqual(metrics.bytes_out, 0)
+        self.assertGreater(metrics.total, 0)
+
+    def test_convert_profile(self):
+        """Test profilazione: file .prof di cProfile e report delle allocazioni accanto al log"""
+        import pstats
+        csv_path = self.create_test_file("id,nome\n1,Mario\n2,Lucia\n3,Anna", "test.csv")
+
+        result = convert_file(csv_path, "postgres", "public", "clienti", profile="all")
+
+        self.assertIn("Righe: 3", result)
+        prof_file = os.path.join(self.temp_dir, "test_profile.prof")
+        stats = pstats.Stats(prof_file)
+        self.assertTrue(any(func[2] == "format_insert" for func in stats.stats))
+        with open(os.path.join(self.temp_dir, "test_alloc.txt"), 'r', encoding='utf-8') as f:
+            report = f.read()
+        self.assertTrue(report.startswith("Picco memoria tracciata: "))
+        self.assertIn("righe per memoria allocata nello snapshot:", report)
+
+        result = convert_file(csv_path, "postgres", "public", "clienti", profile="gpu")
+        self.assertIn("Modalità di profilazione non supportata", result)
+
+    def test_convert_engine_pyarrow_fallback(self):
+        """Test motore pyarrow non installato: lettura a blocchi con pandas e avviso nel log"""
+        csv_path = self.create_test_file(
+            "id,nome\n" + "".join(f"{i},{'x' * 40}\n" for i in range(250000)), "test.csv")
+        self.assertGreater(os.path.getsize(csv_path), 10 * 1024 * 1024)
+
+        with patch('excel_to_sql_converter._pyarrow_available', return_value=False):
+            result = convert_file(csv_path, "postgres", "public", "clienti", engine="pyarrow")
+
+        self.assertIn("Righe: 250000", result)
+        with open(os.path.join(self.temp_dir, "test_log.log"), 'r', encoding='utf-8') as f:
+            self.assertIn("pyarrow non installato: lettura con pandas", f.read())
+
+        result = convert_file(csv_path, "postgres", "public", "clienti", engine="polars")
+        self.assertIn("Motore di lettura CSV non supportato", result)
+
+    def test_csv_na_values_match_pandas(self):
+        """Test lista dei NULL del motore pyarrow allineata ai valori NA predefiniti di pandas"""
+        from excel_to_sql_converter import CSV_NA_VALUES
+        df = pd.read_csv(io.StringIO("v\n" + "\n".join(f'"{v}"' for v in CSV_NA_VALUES) + "\nx\n"), dtype=str)
+        self.assertEqual(df['v'].isna().tolist(), [True] * len(CSV_NA_VALUES) + [False])
+        try:
+            from pandas._libs.parsers import STR_NA_VALUES
+        except ImportError:
+            return
+        self.assertEqual(set(CSV_NA_VALUES), set(STR_NA_VALUES))
+
+    @unittest.skipUnless(_pyarrow_available(), "pyarrow non installato")
+    def test_iter_arrow_chunks_matches_pandas(self):
+        """Test lettura con pyarrow: stesse colonne, stringhe e NULL di pd.read_csv"""
+        csv_path = self.create_test_file(
+            "id;nome;note\n" + "".join(f"{i};\"O'Neil; {i}\";{'' if i % 3 else 'NA'}\n" for i in range(10)),
+            "test.csv")
+        dialect = detect_csv_dialect(csv_path, use_cache=False)
+
+        chunks = list(iter_arrow_chunks(csv_path, dialect, chunksize=4))
+        expected = pd.read_csv(csv_path, **dialect.read_csv_kwargs())
+
+        self.assertEqual(sum(len(c) for c in chunks), 10)
+        pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True).astype(object),
+                                      expected.astype(object))
+
+    def test_convert_result_status(self):
+        """Test esito strutturato di convert_file: ok e rows, anche dopo il passaggio tra processi"""
+        import pickle
+        csv_path = self.create_test_file("id,nome\n1,Mario\n2,Lucia", "test.csv")
+
+        result = convert_file(csv_path, "postgres", "public", "clienti")
+        self.assertEqual((result.ok, result.rows), (True, 2))
+        self.assertIn("Righe: 2", result)
+        copy = pickle.loads(pickle.dumps(result))
+        self.assertEqual((copy, copy.ok, copy.rows), (result, True, 2))
+
+        result = convert_file(csv_path, "postgres", "public", "nome non valido")
+        self.assertEqual((result.ok, result.rows), (False, None))
+
+    def test_convert_copy_requires_postgres(self):
+        """Test formato COPY rifiutato per database diversi da Postgres"""
+        csv_path = self.create_test_file("a,b\n1,2", "test.csv")
+        result = convert_file(csv_path, "sqlserver", "dbo", "t", output_format="copy")
+        self.assertIn("Errore", result)
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, "test.sql")))
+
     @patch('excel_to_sql_converter.setup_logging')
     def test_convert_file_not_found(self, mock_setup_logging):
         """Test gestione file non esistente"""
@@ -261,6 +1112,268 @@ class TestConvertFile(unittest.TestCase):
         self.assertIn("Errore test", result)
 
 
+class TestExcelStreaming(unittest.TestCase):
+    """Test per la lettura in streaming dei file .xlsx"""
+
+    def setUp(self):
+        """Setup per ogni test"""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Cleanup dopo ogni test"""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def create_workbook(self, rows, filename="test.xlsx"):
+        """Helper per creare un workbook con le righe indicate"""
+        from openpyxl import Workbook
+        filepath = os.path.join(self.temp_dir, filename)
+        wb = Workbook()
+        ws = wb.active
+        for row in rows:
+            ws.append(row)
+        wb.save(filepath)
+        return filepath
+
+    def test_iter_excel_chunks_fixed_size(self):
+        """Test suddivisione del foglio in blocchi di dimensione fissa"""
+        rows = [['id', 'nome']] + [[i, f"nome_{i}"] for i in range(5)]
+        filepath = self.create_workbook(rows)
+
+        chunks = list(iter_excel_chunks(filepath, chunksize=2))
+
+        self.assertEqual([len(c) for c in chunks], [2, 2, 1])
+        self.assertEqual(list(chunks[0].columns), ['id', 'nome'])
+        self.assertEqual(chunks[2].iloc[0]['nome'], 'nome_4')
+
+    def test_iter_excel_chunks_header_and_blank_rows(self):
+        """Test intestazioni vuote/duplicate e righe vuote come pd.read_excel"""
+        rows = [[None, None], ['a', 'a', None], [1, None], [None, None], [2, 'x']]
+        filepath = self.create_workbook(rows)
+
+        df = pd.concat(list(iter_excel_chunks(filepath)))
+
+        self.assertEqual(list(df.columns), ['a', 'a.1'])
+        self.assertEqual(len(df), 2)
+        self.assertTrue(pd.isnull(df.iloc[0]['a.1']))
+
+    def test_convert_xlsx_streaming(self):
+        """Test conversione .xlsx in streaming con valori tipizzati"""
+        rows = [['id', 'prezzo', 'nome']] + [[1, 2.5, "Luc'ia"], [2, None, 'Mario']]
+        filepath = self.create_workbook(rows)
+
+        result = convert_file(filepath, "postgres", "public", "prodotti")
+
+        self.assertIn("Righe: 2", result)
+        with open(os.path.join(self.temp_dir, "test.sql"), 'r', encoding='utf-8') as f:
+            sql_content = f.read()
+        self.assertIn("VALUES ('1', '2.5', 'Luc''ia');", sql_content)
+        self.assertIn("VALUES ('2', NULL, 'Mario');", sql_content)
+
+    def test_convert_parallel_output_identical(self):
+        """Test conversione parallela con output identico a quello sequenziale"""
+        rows = [['id', 'nome']] + [[i, f"nome'{i}"] for i in range(7)]
+        filepath = self.create_workbook(rows)
+        sql_path = os.path.join(self.temp_dir, "test.sql")
+
+        with patch('excel_to_sql_converter.CHUNK_ROWS', 2):
+            sequential = convert_file(filepath, "oracle", "HR", "T", batch_size=3)
+            with open(sql_path, 'r', encoding='utf-8') as f:
+                expected = f.read()
+            parallel = convert_file(filepath, "oracle", "HR", "T", batch_size=3, workers=2)
+            with open(sql_path, 'r', encoding='utf-8') as f:
+                actual = f.read()
+
+        self.assertIn("Righe: 7", sequential)
+        self.assertIn("Righe: 7", parallel)
+        self.assertEqual(actual, expected)
+        self.assertEqual(actual.count("INSERT ALL"), 4)
+
+    def test_convert_reports_progress(self):
+        """Test callback di avanzamento chiamata dopo ogni blocco"""
+        rows = [['id', 'nome']] + [[i, f"nome_{i}"] for i in range(5)]
+        filepath = self.create_workbook(rows)
+        updates = []
+
+        with patch('excel_to_sql_converter.CHUNK_ROWS', 2):
+            result = convert_file(filepath, "postgres", "public", "t", progress=updates.append)
+
+        self.assertIn("OK", result)
+        self.assertEqual([u.rows for u in updates], [2, 4, 5])
+        self.assertEqual(updates[-1].fraction, 1.0)
+        self.assertEqual(updates[-1].total_bytes, os.path.getsize(filepath))
+        self.assertEqual(updates[-1].eta, 0)
+
+    def test_convert_cancel_removes_partial_file(self):
+        """Test annullamento tra un blocco e l'altro con rimozione del file parziale"""
+        import threading
+        rows = [['id', 'nome']] + [[i, f"nome_{i}"] for i in range(5)]
+        filepath = self.create_workbook(rows)
+        cancel_event = threading.Event()
+        updates = []
+
+        def on_progress(progress):
+            updates.append(progress)
+            cancel_event.set()
+
+        with patch('excel_to_sql_converter.CHUNK_ROWS', 2):
+            result = convert_file(filepath, "postgres", "public", "t",
+                                  progress=on_progress, cancel_event=cancel_event)
+
+        self.assertIn("Annullato", result)
+        self.assertEqual(len(updates), 1)
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, "test.sql")))
+
+    def test_convert_error_removes_partial_file(self):
+        """Test rimozione del file parziale se la conversione fallisce a metà"""
+        rows = [['id', 'nome non valido']] + [[i, 'x'] for i in range(3)]
+        filepath = self.create_workbook(rows)
+
+        result = convert_file(filepath, "postgres", "public", "t")
+
+        self.assertIn("Errore", result)
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, "test.sql")))
+
+    def create_multi_sheet_workbook(self, filename="cartella.xlsx"):
+        """Helper per creare una cartella con tre fogli (uno vuoto)"""
+        from openpyxl import Workbook
+        filepath = os.path.join(self.temp_dir, filename)
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Clienti"
+        for row in [['id', 'nome'], [1, 'Mario'], [2, 'Lucia']]:
+            ws.append(row)
+        ws = wb.create_sheet("Vendite 2024")
+        for row in [['id', 'importo']] + [[i, i * 1.5] for i in range(5)]:
+            ws.append(row)
+        wb.create_sheet("Vuoto")
+        wb.save(filepath)
+        return filepath
+
+    def test_convert_single_sheet(self):
+        """Test conversione di un foglio diverso dal primo"""
+        filepath = self.create_multi_sheet_workbook()
+
+        result = convert_file(filepath, "postgres", "public", "vendite", sheet_name="Vendite 2024")
+
+        self.assertIn("Righe: 5", result)
+        with open(os.path.join(self.temp_dir, "cartella_Vendite_2024.sql"), 'r', encoding='utf-8') as f:
+            self.assertIn("('4', '6')", f.read())
+
+    def test_convert_workbook_all_sheets(self):
+        """Test conversione di tutti i fogli, in sequenza e in parallelo, con riepilogo"""
+        import csv
+        filepath = self.create_multi_sheet_workbook()
+
+        for jobs in (1, 2):
+            summary = convert_workbook(filepath, "postgres", "public", tables={"Clienti": "clienti"}, jobs=jobs)
+
+            self.assertEqual([(s['sheet'], s['table'], s['ok'], s['rows']) for s in summary], [
+                ("Clienti", "clienti", True, 2),
+                ("Vendite 2024", "Vendite_2024", True, 5),
+                ("Vuoto", "Vuoto", True, 0),
+            ])
+            with open(os.path.join(self.temp_dir, "cartella_Clienti.sql"), 'r', encoding='utf-8') as f:
+                self.assertIn("INSERT INTO [public].[clienti]", f.read())
+            with open(os.path.join(self.temp_dir, "cartella_summary.csv"), 'r', encoding='utf-8') as f:
+                rows = list(csv.DictReader(f))
+            self.assertEqual([r['rows'] for r in rows], ['2', '5', '0'])
+
+        # Esito e righe non dipendono dal testo del messaggio di convert_file
+        import excel_to_sql_converter
+        from excel_to_sql_converter import ConversionResult
+        real_convert = excel_to_sql_converter.convert_file
+
+        def reworded(*args, **kwargs):
+            result = real_convert(*args, **kwargs)
+            message = result.replace("-> OK", "-> Completato").replace("Righe:", "Rows:")
+            return ConversionResult(message, result.ok, result.rows)
+
+        with patch('excel_to_sql_converter.convert_file', side_effect=reworded):
+            summary = convert_workbook(filepath, "postgres", "public", jobs=1)
+        self.assertEqual([(s['ok'], s['rows']) for s in summary], [(True, 2), (True, 5), (True, 0)])
+
+class TestDirectLoad(unittest.TestCase):
+    """Test per il caricamento diretto su database (sqlite3 come sostituto)"""
+
+    def setUp(self):
+        """Setup per ogni test"""
+        import sqlite3
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "test.db")
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE clienti (id TEXT, nome TEXT)")
+        conn.execute("INSERT INTO clienti VALUES ('99', 'vecchio')")
+        conn.commit()
+        conn.close()
+        self.csv_path = os.path.join(self.temp_dir, "clienti.csv")
+        with open(self.csv_path, 'w', encoding='utf-8', newline='') as f:
+            f.write("id,nome\n1,Mario\n2,O'Brien\n3,\n4,Lucia\n5,Anna")
+
+    def tearDown(self):
+        """Cleanup dopo ogni test"""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def connect(self):
+        import sqlite3
+        return sqlite3.connect(self.db_path)
+
+    def table_rows(self):
+        conn = self.connect()
+        try:
+            return conn.execute("SELECT id, nome FROM clienti ORDER BY id").fetchall()
+        finally:
+            conn.close()
+
+    def test_load_with_connection(self):
+        """Test DELETE + INSERT parametrizzati a batch, con escape e NULL gestiti dal driver"""
+        conn = self.connect()
+        try:
+            result = load_file_to_db(self.csv_path, 'sqlserver', 'main', 'clienti', conn, batch_size=2)
+        finally:
+            conn.close()
+        self.assertIn("-> OK", result)
+        self.assertIn("Caricate: 5 righe", result)
+        self.assertIn("righe/s", result)
+        self.assertEqual(self.table_rows(),
+                         [('1', 'Mario'), ('2', "O'Brien"), ('3', None), ('4', 'Lucia'), ('5', 'Anna')])
+
+    def test_load_with_factory_and_pool(self):
+        """Test connessione ottenuta da una factory e da ConnectionPool"""
+        result = load_file_to_db(self.csv_path, 'postgres', 'main', 'clienti', self.connect)
+        self.assertIn("-> OK", result)
+        self.assertEqual(len(self.table_rows()), 5)
+
+        pool = ConnectionPool(self.connect, max_size=1)
+        try:
+            for _ in range(2):
+                result = load_file_to_db(self.csv_path, 'sqlserver', 'main', 'clienti', pool)
+                self.assertIn("-> OK", result)
+            # La stessa connessione viene riutilizzata
+            self.assertEqual(pool._opened, 1)
+        finally:
+            pool.closeall()
+        self.assertEqual(len(self.table_rows()), 5)
+
+    def test_load_error_rolls_back(self):
+        """Test rollback: in caso di errore la tabella resta invariata, DELETE compreso"""
+        with open(self.csv_path, 'w', encoding='utf-8', newline='') as f:
+            f.write("id,cognome\n1,Rossi\n2,Bianchi")
+        result = load_file_to_db(self.csv_path, 'sqlserver', 'main', 'clienti', self.connect)
+        self.assertIn("Errore nel caricamento su database", result)
+        self.assertEqual(self.table_rows(), [('99', 'vecchio')])
+
+    def test_load_cancelled_rolls_back(self):
+        """Test annullamento tramite cancel_event"""
+        import threading
+        cancel = threading.Event()
+        cancel.set()
+        result = load_file_to_db(self.csv_path, 'sqlserver', 'main', 'clienti', self.connect, cancel_event=cancel)
+        self.assertIn("Annullato", result)
+        self.assertEqual(self.table_rows(), [('99', 'vecchio')])
+
+
 class TestLogging(unittest.TestCase):
     """Test per la funzione setup_logging"""
     
@@ -322,6 +1435,131 @@ class TestLogging(unittest.TestCase):
             self.assertTrue(active_handler.baseFilename.endswith(os.path.basename(log2)))
 
 
+class TestCLI(unittest.TestCase):
+    """Test per l'interfaccia a riga di comando"""
+
+    def setUp(self):
+        """Setup per ogni test"""
+        self.temp_dir = tempfile.mkdtemp()
+        for name, content in [("clienti.csv", "id,nome\n1,Mario\n2,Lucia"),
+                              ("ordini_2024.csv", "id;importo\n10;5.5\n11;7"),
+                              ("note.txt", "non convertire")]:
+            with open(os.path.join(self.temp_dir, name), 'w', encoding='utf-8', newline='') as f:
+                f.write(content)
+
+    def tearDown(self):
+        """Cleanup dopo ogni test"""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_expand_inputs_directory_and_glob(self):
+        """Test espansione di cartelle e glob senza duplicati"""
+        pattern = os.path.join(self.temp_dir, "*.csv")
+        files = expand_inputs([self.temp_dir, pattern])
+
+        self.assertEqual([os.path.basename(f) for f in files], ["clienti.csv", "ordini_2024.csv"])
+
+    def test_resolve_table(self):
+        """Test scelta della tabella: --table, --map, nome del file"""
+        mapping = parse_table_map(["ordini_*=ORDINI"])
+
+        self.assertEqual(resolve_table("x/clienti.csv", "FISSA", mapping), "FISSA")
+        self.assertEqual(resolve_table("x/ordini_2024.csv", None, mapping), "ORDINI")
+        self.assertEqual(resolve_table("x/clienti.csv", None, mapping), "clienti")
+
+    def test_parse_size(self):
+        """Test dimensioni per --split-size"""
+        import argparse
+        self.assertEqual(parse_size("1048576"), 1048576)
+        self.assertEqual(parse_size("500M"), 500 * 1024 ** 2)
+        self.assertEqual(parse_size("1.5gb"), int(1.5 * 1024 ** 3))
+        with self.assertRaises(argparse.ArgumentTypeError):
+            parse_size("tanto")
+
+    def test_cli_convert_directory(self):
+        """Test conversione di una cartella con riepilogo per file"""
+        import io
+        from contextlib import redirect_stdout
+
+        out = io.StringIO()
+        with redirect_stdout(out):
+            code = cli_main(["convert", self.temp_dir, "--db", "postgres", "--schema", "public",
+                             "--map", "ordini_*=ordini", "--jobs", "1"])
+
+        self.assertEqual(code, 0)
+        self.assertIn("2 file, 2 convertiti, 0 errori", out.getvalue())
+        with open(os.path.join(self.temp_dir, "ordini_2024.sql"), 'r', encoding='utf-8') as f:
+            self.assertIn("INSERT INTO [public].[ordini]", f.read())
+
+    def test_cli_convert_sheets_with_map_file(self):
+        """Test --sheets: un foglio per tabella, con mappature da file"""
+        import io
+        from contextlib import redirect_stdout
+        from openpyxl import Workbook
+
+        wb = Workbook()
+        wb.active.title = "Anagrafica"
+        wb.active.append(['id', 'nome'])
+        wb.active.append([1, 'Mario'])
+        wb.create_sheet("Ordini").append(['id'])
+        wb.save(os.path.join(self.temp_dir, "report.xlsx"))
+        map_file = os.path.join(self.temp_dir, "fogli.txt")
+        with open(map_file, 'w', encoding='utf-8') as f:
+            f.write("# foglio=tabella\nAnag*=clienti\n")
+
+        out = io.StringIO()
+        with redirect_stdout(out):
+            code = cli_main(["convert", os.path.join(self.temp_dir, "report.xlsx"), "--db", "postgres",
+                             "--schema", "public", "--sheets", "--map-file", map_file, "--jobs", "1"])
+
+        self.assertEqual(code, 0)
+        self.assertIn("report.xlsx [Anagrafica] -> clienti", out.getvalue())
+        self.assertIn("2 file, 2 convertiti, 0 errori", out.getvalue())
+        with open(os.path.join(self.temp_dir, "report_Anagrafica.sql"), 'r', encoding='utf-8') as f:
+            self.assertIn("INSERT INTO [public].[clienti]", f.read())
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, "report_Ordini.sql")))
+
+    def test_cli_reports_failures(self):
+        """Test codice di uscita non nullo se una conversione fallisce"""
+        import io
+        from contextlib import redirect_stdout
+
+        missing = os.path.join(self.temp_dir, "mancante.csv")
+        out = io.StringIO()
+        with redirect_stdout(out):
+            code = cli_main(["convert", missing, "--db", "oracle", "--schema", "HR", "--jobs", "1"])
+
+        self.assertEqual(code, 1)
+        self.assertIn("[ERRORE]", out.getvalue())
+
+    def test_main_calls_freeze_support_first(self):
+        """Test freeze_support() prima della CLI, necessario per i pool nell'eseguibile PyInstaller"""
+        import excel_to_sql_converter
+        calls = []
+        with patch('multiprocessing.freeze_support', side_effect=lambda: calls.append('freeze_support')), \
+                patch('excel_to_sql_cli.main', side_effect=lambda argv: calls.append('cli') or 0):
+            code = excel_to_sql_converter.main(["convert", "x.csv"])
+
+        self.assertEqual(code, 0)
+        self.assertEqual(calls, ['freeze_support', 'cli'])
+
+    def test_cli_does_not_import_gui(self):
+        """Test che la CLI non carichi tkinter né PIL"""
+        import subprocess
+        code = "import sys, excel_to_sql_cli; print('tkinter' in sys.modules or 'PIL' in sys.modules)"
+        output = subprocess.check_output([sys.executable, "-c", code],
+                                         cwd=os.path.dirname(os.path.abspath(__file__)), text=True)
+        self.assertEqual(output.strip(), "False")
+
+    def test_core_import_is_lazy(self):
+        """Test che importare il core non carichi pandas, numpy, tkinter o PIL"""
+        import subprocess
+        code = ("import sys, excel_to_sql_converter; "
+                "print([m for m in ('pandas', 'numpy', 'tkinter', 'PIL') if m in sys.modules])")
+        output = subprocess.check_output([sys.executable, "-c", code],
+                                         cwd=os.path.dirname(os.path.abspath(__file__)), text=True)
+        self.assertEqual(output.strip(), "[]")
+
 class TestIntegration(unittest.TestCase):
     """Test di integrazione end-to-end"""
     
@@ -0,0 +1,122 @@
+"""
+Confronta i due motori di lettura dei CSV grandi (vedi CSV_ENGINES):
+pd.read_csv a blocchi (pandas) contro il lettore in streaming di pyarrow
+(pyarrow.csv.open_csv, parsing su più thread).
+
+Per ogni motore misura la sola lettura del file (iterazione dei blocchi
+restituiti da _open_chunks), la conversione completa con convert_file e il
+picco di RSS, e verifica che lo script SQL generato sia identico.
+
+Uso:
+    python tools/benchmark_csv_engine.py [--rows 1000000] [--cols 8] [--nulls 0.2]
+
+Ogni motore è misurato in un processo proprio (vedi run_isolated in
+benchmark_suite.py). Senza pyarrow installato viene misurato solo pandas.
+"""
+import argparse
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+from benchmark_suite import run_isolated  # noqa: E402
+
+
+def create_csv(path, rows, cols, nulls):
+    """CSV deterministico con una quota nulls di celle vuote e qualche valore con apici e separatori."""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(",".join(f"col{c}" for c in range(cols)) + "\n")
+        for r in range(rows):
+            values = []
+            for c in range(cols):
+                h = (r * 31 + c * 17) % 100
+                if c == 0:
+                    values.append(str(r))
+                elif h < nulls * 100:
+                    values.append("")
+                elif h % 10 == 0:
+                    values.append(f"\"O'Neil, {r}\"")
+                else:
+                    values.append(f"valore_{r}_{c}")
+            f.write(",".join(values) + "\n")
+
+
+def run_engine(engine, path):
+    import excel_to_sql_converter as core
+
+    logging.disable(logging.CRITICAL)
+    core.DIALECT_CACHE_FILE = os.path.join(os.path.dirname(path), f"dialect_cache_{engine}.json")
+
+    start = time.perf_counter()
+    rows = 0
+    with contextlib.ExitStack() as stack:
+        chunks, _, _ = core._open_chunks(path, stack, engine=engine)
+        for chunk in chunks:
+            rows += len(chunk)
+    read_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    message = core.convert_file(path, "postgres", "public", "bench", engine=engine)
+    convert_s = time.perf_counter() - start
+    if not re.search(r"Righe: (\d+)", message):
+        raise SystemExit(f"Conversione fallita: {message}")
+    out_file = os.path.splitext(path)[0] + ".sql"
+    with open(out_file, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    os.remove(out_file)
+    print(json.dumps({'rows': rows, 'read_s': read_s, 'convert_s': convert_s, 'peak_rss_mb': core._peak_rss_mb(),
+                      'sha256': digest}))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000, help="righe del CSV sintetico")
+    parser.add_argument("--cols", type=int, default=8, help="colonne del CSV sintetico")
+    parser.add_argument("--nulls", type=float, default=0.2, help="quota di celle vuote (default 0.2)")
+    parser.add_argument("--run", nargs=2, metavar=("ENGINE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run:
+        engine, path = args.run
+        run_engine(engine, path)
+        return 0
+
+    from excel_to_sql_converter import _pyarrow_available
+    engines = ["pandas"]
+    if _pyarrow_available():
+        engines.append("pyarrow")
+    else:
+        print("pyarrow non installato: viene misurato solo pandas")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.csv")
+        print(f"Generazione CSV {args.rows} x {args.cols}...")
+        create_csv(path, args.rows, args.cols, args.nulls)
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        print(f"{'motore':<10}{'righe':>10}{'lettura':>10}{'MB/s':>8}{'conversione':>13}{'righe/s':>11}{'picco RSS':>13}")
+        digests = set()
+        for engine in engines:
+            try:
+                case = run_isolated(__file__, engine, path)
+            except RuntimeError as e:
+                print(f"{engine}: errore\n{e}")
+                return 1
+            digests.add(case['sha256'])
+            print(f"{engine:<10}{case['rows']:>10}{case['read_s']:>9.1f}s{size_mb / case['read_s']:>8.1f}"
+                  f"{case['convert_s']:>12.1f}s{case['rows'] / case['convert_s']:>11,.0f}"
+                  f"{case['peak_rss_mb']:>10.0f} MB")
+        if len(digests) > 1:
+            print("Attenzione: gli script SQL generati dai due motori sono diversi")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,79 @@
+"""
+Misura il picco di memoria (RSS) della conversione di un workbook .xlsx grande:
+lettura completa con pd.read_excel (comportamento precedente) contro lettura
+in streaming con iter_excel_chunks.
+
+Uso:
+    python tools/benchmark_excel_memory.py [--rows 200000] [--cols 10]
+
+Le due modalità vengono misurate in processi separati (vedi run_isolated in
+benchmark_suite.py).
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+from benchmark_suite import run_isolated  # noqa: E402
+
+
+def create_workbook(path, rows, cols):
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append([f"col{c}" for c in range(cols)])
+    for r in range(rows):
+        ws.append([r if c == 0 else f"valore_{r}_{c}" for c in range(cols)])
+    wb.save(path)
+
+
+def run_mode(mode, path):
+    import pandas as pd
+    from excel_to_sql_converter import _peak_rss_mb, iter_excel_chunks, _write_sql_file
+
+    logging.disable(logging.CRITICAL)
+    out_file = f"{path}.{mode}.sql"
+    start = time.perf_counter()
+    if mode == "read_excel":
+        chunks = [pd.read_excel(path)]
+    else:
+        chunks = iter_excel_chunks(path)
+    rows = _write_sql_file(out_file, "postgres", "public", "bench", None, chunks)
+    elapsed = time.perf_counter() - start
+    os.remove(out_file)
+    print(json.dumps({'rows': rows, 'seconds': elapsed, 'peak_rss_mb': _peak_rss_mb()}))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000, help="righe del workbook sintetico")
+    parser.add_argument("--cols", type=int, default=10, help="colonne del workbook sintetico")
+    parser.add_argument("--run", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run:
+        run_mode(*args.run)
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.xlsx")
+        print(f"Generazione workbook {args.rows} x {args.cols}...")
+        create_workbook(path, args.rows, args.cols)
+        print(f"{'modalità':<12}{'righe':>10}{'tempo':>11}{'picco RSS':>12}")
+        for mode in ("read_excel", "streaming"):
+            try:
+                case = run_isolated(__file__, mode, path)
+            except RuntimeError as e:
+                print(f"{mode}: errore\n{e}")
+                return 1
+            print(f"{mode:<12}{case['rows']:>10}{case['seconds']:>10.1f}s{case['peak_rss_mb']:>12.0f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
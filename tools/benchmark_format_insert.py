@@ -0,0 +1,88 @@
+"""
+Benchmark di format_insert: confronta il rendering vettoriale attuale con
+l'implementazione storica basata su df.iterrows().
+
+Uso:
+    python tools/benchmark_format_insert.py [--rows 200000] [--repeat 3]
+
+Per ogni scenario (tabella stretta e tabella larga) stampa le righe al secondo
+prima e dopo e verifica che l'output sia identico byte per byte.
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from excel_to_sql_converter import format_insert  # noqa: E402
+
+
+def legacy_format_insert(db_type, schema, table, df):
+    """Implementazione di riferimento riga per riga (versione precedente)."""
+    columns = [c.strip() for c in df.columns.tolist()]
+    if db_type == 'postgres':
+        cols = ", ".join([f'"{c}"' for c in columns])
+    else:
+        cols = ", ".join([f'{c}' for c in columns])
+    statements = []
+    for _, row in df.iterrows():
+        values = []
+        for val in row:
+            if pd.isnull(val):
+                values.append("NULL")
+            else:
+                values.append(f"'{str(val).replace(chr(39), chr(39)*2)}'")
+        vals = ", ".join(values)
+        statements.append(f'INSERT INTO [{schema}].[{table}] ({cols}) VALUES ({vals});')
+    return "\n".join(statements)
+
+
+def make_frame(rows, cols):
+    """DataFrame di stringhe come quelli prodotti da read_csv(dtype=str), con NULL e apici."""
+    data = {}
+    for c in range(cols):
+        column = [f"val_{r}_{c}" for r in range(rows)]
+        column[::17] = [None] * len(column[::17])
+        column[5::23] = [f"O'Neil {r}" for r in range(5, rows, 23)]
+        data[f"col{c}"] = column
+    return pd.DataFrame(data, dtype=str)
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000, help="righe della tabella stretta")
+    parser.add_argument("--repeat", type=int, default=3, help="ripetizioni per misura (si tiene la migliore)")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)
+    scenarios = [
+        ("stretta (3 colonne)", args.rows, 3),
+        ("larga (50 colonne)", max(args.rows // 10, 1), 50),
+    ]
+    print(f"{'scenario':<22}{'righe':>10}{'prima r/s':>14}{'dopo r/s':>14}{'speedup':>10}")
+    for name, rows, cols in scenarios:
+        df = make_frame(rows, cols)
+        t_old, out_old = best_of(lambda: legacy_format_insert("postgres", "dbo", "bench", df), args.repeat)
+        t_new, out_new = best_of(lambda: format_insert("postgres", "dbo", "bench", df), args.repeat)
+        if out_old != out_new:
+            print(f"ERRORE: output diverso nello scenario '{name}'")
+            return 1
+        print(f"{name:<22}{rows:>10}{rows / t_old:>14,.0f}{rows / t_new:>14,.0f}{t_old / t_new:>9.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
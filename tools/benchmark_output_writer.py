@@ -0,0 +1,99 @@
+"""
+Misura picco di memoria (RSS) e velocità di scrittura dello script SQL per un
+CSV grande già caricato in memoria: scrittura precedente (l'intero script in
+un'unica stringa, poi f.write) contro _OutputWriter (rendering a blocchi di
+CHUNK_ROWS righe, codifica UTF-8 una sola volta, buffer riutilizzato).
+
+Uso:
+    python tools/benchmark_output_writer.py [--rows 1000000] [--cols 8] [--batch-size 0]
+
+Ogni modalità gira in un processo a sé (vedi run_isolated in
+benchmark_suite.py); "oltre i dati" è il picco meno la memoria occupata dal
+DataFrame già caricato.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+from benchmark_suite import run_isolated  # noqa: E402
+
+
+def create_csv(path, rows, cols):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(",".join(f"col{c}" for c in range(cols)) + "\n")
+        for r in range(rows):
+            f.write(",".join(str(r) if c == 0 else f"valore_{r}_{c}" for c in range(cols)) + "\n")
+
+
+def write_legacy(out_file, df, batch_size):
+    # Comportamento precedente per i file caricati interamente: un'unica
+    # stringa con tutti gli INSERT, concatenata a "\n" e scritta in modo testo
+    from excel_to_sql_converter import format_insert
+    with open(out_file, "w", encoding="utf-8") as f:
+        f.write("DELETE FROM [public].[bench];\nGO\n\n")
+        sql_insert = format_insert("postgres", "public", "bench", df, batch_size)
+        f.write(sql_insert + "\n")
+    return len(df)
+
+
+def write_buffered(out_file, df, batch_size):
+    from excel_to_sql_converter import _write_sql_file
+    return _write_sql_file(out_file, "postgres", "public", "bench", None, [df], batch_size)
+
+
+def run_mode(mode, path, batch_size):
+    import pandas as pd
+    from excel_to_sql_converter import _peak_rss_mb
+
+    logging.disable(logging.CRITICAL)
+    df = pd.read_csv(path, dtype=str, keep_default_na=False, na_values=[''])
+    base_rss = _peak_rss_mb()
+    out_file = f"{path}.{mode}.sql"
+    writer = write_legacy if mode == "legacy" else write_buffered
+    start = time.perf_counter()
+    rows = writer(out_file, df, batch_size or None)
+    elapsed = time.perf_counter() - start
+    size_mb = os.path.getsize(out_file) / (1024 * 1024)
+    os.remove(out_file)
+    print(json.dumps({'rows': rows, 'seconds': elapsed, 'output_mb': size_mb, 'peak_rss_mb': _peak_rss_mb(),
+                      'base_rss_mb': base_rss}))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000, help="righe del CSV sintetico")
+    parser.add_argument("--cols", type=int, default=8, help="colonne del CSV sintetico")
+    parser.add_argument("--batch-size", type=int, default=0, help="righe per INSERT multi-riga (0 = una per riga)")
+    parser.add_argument("--run", nargs=3, metavar=("MODE", "PATH", "BATCH"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run:
+        mode, path, batch = args.run
+        run_mode(mode, path, int(batch))
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.csv")
+        print(f"Generazione CSV {args.rows} x {args.cols}...")
+        create_csv(path, args.rows, args.cols)
+        print(f"{'modalità':<10}{'righe':>10}{'tempo':>10}{'scrittura':>14}{'picco RSS':>15}{'oltre i dati':>13}")
+        for mode in ("legacy", "buffered"):
+            try:
+                case = run_isolated(__file__, mode, path, args.batch_size)
+            except RuntimeError as e:
+                print(f"{mode}: errore\n{e}")
+                return 1
+            print(f"{mode:<10}{case['rows']:>10}{case['seconds']:>9.1f}s"
+                  f"{case['output_mb'] / case['seconds']:>9.1f} MB/s{case['peak_rss_mb']:>12.0f} MB"
+                  f"{case['peak_rss_mb'] - case['base_rss_mb']:>+10.0f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
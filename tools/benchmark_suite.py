@@ -0,0 +1,258 @@
+"""
+Suite di benchmark della pipeline di conversione su file sintetici.
+
+Per ogni profilo di dati e ogni dimensione genera un file CSV (o .xlsx) e ne
+misura la conversione completa con convert_file, più le fasi che più spesso
+regrediscono:
+
+    detect    rilevamento del dialetto CSV (detect_csv_dialect, senza cache)
+    render    format_insert sul primo blocco di CHUNK_ROWS righe
+    convert   convert_file (load_csv_robust fino a 10 MB, lettura a blocchi oltre)
+
+Profili: narrow (4 colonne), wide (60 colonne), unicode (testo non ASCII,
+separatore ';'), nulls (40% di celle vuote), quotes (apici, virgolette e
+separatori nei valori).
+
+Uso:
+    python tools/benchmark_suite.py [--rows 10k,100k] [--profiles narrow,wide] [--formats csv,xlsx]
+    python tools/benchmark_suite.py --save-baseline tools/benchmark_baseline.json
+    python tools/benchmark_suite.py --baseline tools/benchmark_baseline.json [--tolerance 10]
+
+Ogni caso viene eseguito in un processo separato con run_isolated, usato
+anche dagli altri benchmark in tools/. Con --baseline i risultati vengono confrontati
+con un'esecuzione salvata in precedenza (righe/s di convert e render, tempo di
+detect) e il codice di uscita è 1 se un valore peggiora oltre --tolerance %.
+Le misure dipendono dalla macchina: il confronto ha senso solo sulla stessa.
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+# colonne, separatore, quota di celle vuote, quota di valori con apici/separatori, testo non ASCII
+PROFILES = {
+    'narrow': dict(cols=4, sep=',', nulls=0.0, quotes=0.0, unicode=False),
+    'wide': dict(cols=60, sep=',', nulls=0.0, quotes=0.0, unicode=False),
+    'unicode': dict(cols=8, sep=';', nulls=0.0, quotes=0.0, unicode=True),
+    'nulls': dict(cols=8, sep=',', nulls=0.4, quotes=0.0, unicode=False),
+    'quotes': dict(cols=8, sep=',', nulls=0.0, quotes=0.3, unicode=False),
+}
+
+# Metriche confrontate con la baseline: True se un valore più alto è migliore
+COMPARED_METRICS = {'convert_rows_s': True, 'render_rows_s': True, 'detect_s': False}
+
+
+def parse_rows(value):
+    """Converte un elenco come '10k,100k,5M' in una lista di interi."""
+    units = {'K': 1000, 'M': 1000 ** 2}
+    sizes = []
+    for item in value.split(','):
+        item = item.strip().upper()
+        factor = units.get(item[-1:], 1)
+        sizes.append(int(float(item.rstrip('KM')) * factor))
+    return sizes
+
+
+def make_row(r, spec):
+    """Riga r del profilo: valori deterministici, così i file sono riproducibili."""
+    row = []
+    for c in range(spec['cols']):
+        h = (r * 31 + c * 17) % 100
+        if c == 0:
+            row.append(str(r))
+        elif h < spec['nulls'] * 100:
+            row.append('')
+        elif h < (spec['nulls'] + spec['quotes']) * 100:
+            row.append(f"O'Neil \"{r}\"{spec['sep']} via {c}")
+        elif spec['unicode']:
+            row.append(f"città_{r}_{c}_ñ€漢字")
+        else:
+            row.append(f"valore_{r}_{c}")
+    return row
+
+
+def create_file(path, profile, rows):
+    spec = PROFILES[profile]
+    header = [f"col{c}" for c in range(spec['cols'])]
+    if path.endswith('.csv'):
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f, delimiter=spec['sep'])
+            writer.writerow(header)
+            for r in range(rows):
+                writer.writerow(make_row(r, spec))
+    else:
+        from openpyxl import Workbook
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet()
+        ws.append(header)
+        for r in range(rows):
+            ws.append([v if v != '' else None for v in make_row(r, spec)])
+        wb.save(path)
+
+
+def run_case(path):
+    """Misura un caso nel processo corrente e stampa il risultato come JSON."""
+    import pandas as pd
+    import excel_to_sql_converter as core
+
+    logging.disable(logging.CRITICAL)
+    cache_dir = tempfile.mkdtemp()
+    core.DIALECT_CACHE_FILE = os.path.join(cache_dir, "dialect_cache.json")
+    result = {'input_mb': os.path.getsize(path) / (1024 * 1024), 'detect_s': None}
+
+    if path.endswith('.csv'):
+        start = time.perf_counter()
+        dialect = core.detect_csv_dialect(path, use_cache=False)
+        result['detect_s'] = time.perf_counter() - start
+        first = pd.read_csv(path, nrows=core.CHUNK_ROWS, **dialect.read_csv_kwargs())
+    else:
+        first = next(core.iter_excel_chunks(path))
+    start = time.perf_counter()
+    core.format_insert("postgres", "public", "bench", first)
+    result['render_rows_s'] = len(first) / (time.perf_counter() - start)
+    del first
+
+    start = time.perf_counter()
+    message = core.convert_file(path, "postgres", "public", "bench")
+    elapsed = time.perf_counter() - start
+    rows = re.search(r"Righe: (\d+)", message)
+    if not rows:
+        raise SystemExit(f"Conversione fallita: {message}")
+    out_file = os.path.splitext(path)[0] + ".sql"
+    result.update({
+        'rows': int(rows.group(1)),
+        'convert_s': elapsed,
+        'convert_rows_s': int(rows.group(1)) / elapsed,
+        'convert_mb_s': result['input_mb'] / elapsed,
+        'output_mb': os.path.getsize(out_file) / (1024 * 1024),
+        'peak_rss_mb': core._peak_rss_mb(),
+    })
+    os.remove(out_file)
+    print(json.dumps(result))
+
+
+def run_isolated(script, *args):
+    """
+    Esegue `python script --run args...` in un nuovo processo, così il picco
+    di RSS misurato riguarda solo quel caso, e restituisce il dizionario che il
+    processo stampa come JSON sull'ultima riga. Solleva RuntimeError con
+    l'output del processo se termina con errore.
+    """
+    out = subprocess.run([sys.executable, os.path.abspath(script), "--run", *map(str, args)],
+                         capture_output=True, text=True)
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr or out.stdout)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def machine_info():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Stampa le variazioni rispetto alla baseline; restituisce il numero di regressioni."""
+    previous = {case['case']: case for case in baseline.get('cases', [])}
+    if baseline.get('machine') != machine_info():
+        print(f"Attenzione: baseline misurata su un'altra macchina ({baseline.get('machine')})")
+    regressions = 0
+    print(f"\n{'caso':<28}{'metrica':<16}{'baseline':>12}{'attuale':>12}{'diff':>9}")
+    for case in results:
+        old = previous.get(case['case'])
+        if old is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            if old.get(metric) is None or case.get(metric) is None:
+                continue
+            change = (case[metric] - old[metric]) / old[metric] * 100
+            worse = -change if higher_is_better else change
+            flag = "  REGRESSIONE" if worse > tolerance else ""
+            regressions += bool(flag)
+            print(f"{case['case']:<28}{metric:<16}{old[metric]:>12,.3f}{case[metric]:>12,.3f}{change:>+8.1f}%{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=parse_rows, default=parse_rows("10k,100k"),
+                        help="dimensioni dei file, es. 10k,100k,1M,5M (default 10k,100k)")
+    parser.add_argument("--profiles", default=",".join(PROFILES),
+                        help=f"profili da eseguire (default: {','.join(PROFILES)})")
+    parser.add_argument("--formats", default="csv", help="formati dei file: csv, xlsx o csv,xlsx (default csv)")
+    parser.add_argument("--data-dir", help="cartella dei file generati, riusati tra un'esecuzione e l'altra "
+                                           "(default: cartella temporanea)")
+    parser.add_argument("--save-baseline", metavar="FILE", help="salva i risultati come baseline JSON")
+    parser.add_argument("--baseline", metavar="FILE", help="confronta i risultati con una baseline JSON")
+    parser.add_argument("--tolerance", type=float, default=10.0, help="peggioramento tollerato in %% (default 10)")
+    parser.add_argument("--run", metavar="PATH", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run:
+        run_case(args.run)
+        return 0
+
+    profiles = [p.strip() for p in args.profiles.split(",") if p.strip()]
+    formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+    unknown = [p for p in profiles if p not in PROFILES] + [f for f in formats if f not in ('csv', 'xlsx')]
+    if unknown:
+        parser.error(f"profili o formati sconosciuti: {', '.join(unknown)}")
+
+    tmp = None
+    data_dir = args.data_dir
+    if data_dir is None:
+        tmp = tempfile.TemporaryDirectory()
+        data_dir = tmp.name
+    os.makedirs(data_dir, exist_ok=True)
+    results = []
+    try:
+        print(f"{'caso':<28}{'MB':>8}{'detect':>9}{'render r/s':>13}{'convert r/s':>13}{'MB/s':>8}{'picco RSS':>11}")
+        for fmt in formats:
+            for profile in profiles:
+                for rows in args.rows:
+                    name = f"{profile}-{rows}-{fmt}"
+                    path = os.path.join(data_dir, f"{name}.{fmt}")
+                    if not os.path.exists(path):
+                        create_file(path, profile, rows)
+                    try:
+                        measured = run_isolated(__file__, path)
+                    except RuntimeError as e:
+                        print(f"{name}: errore\n{e}")
+                        return 1
+                    case = {'case': name, 'profile': profile, 'format': fmt, **measured}
+                    results.append(case)
+                    detect = f"{case['detect_s']:.3f}s" if case['detect_s'] is not None else "-"
+                    print(f"{name:<28}{case['input_mb']:>8.1f}{detect:>9}{case['render_rows_s']:>13,.0f}"
+                          f"{case['convert_rows_s']:>13,.0f}{case['convert_mb_s']:>8.1f}"
+                          f"{case['peak_rss_mb']:>8.0f} MB")
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump({'machine': machine_info(), 'cases': results}, f, indent=2)
+            f.write("\n")
+        print(f"Baseline salvata in {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,68 @@
+"""
+Misura il tempo di import dei punti di ingresso dell'applicazione usando
+`python -X importtime` in un processo pulito per ciascuno.
+
+Uso:
+    python tools/measure_import_time.py [--top 5] [--repeat 3]
+
+Per ogni punto di ingresso stampa il tempo cumulativo di import (migliore
+su --repeat esecuzioni), quali dipendenze pesanti vengono caricate e i
+moduli con il maggior tempo di import proprio.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENTRY_POINTS = [
+    ("core", "import excel_to_sql_converter"),
+    ("cli", "import excel_to_sql_cli"),
+    ("gui", "import excel_to_sql_gui"),
+    # Costo differito, pagato dal core alla prima conversione
+    ("core + pandas", "import excel_to_sql_converter; import pandas"),
+]
+
+HEAVY_MODULES = ("pandas", "numpy", "openpyxl", "tkinter", "PIL")
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+def import_profile(code):
+    """Esegue code con -X importtime e restituisce [(modulo, self_us, cumulativo_us, livello)]."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    entries = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return entries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=5, help="moduli più lenti da mostrare per punto di ingresso")
+    parser.add_argument("--repeat", type=int, default=3, help="esecuzioni per punto di ingresso (si tiene la migliore)")
+    args = parser.parse_args(argv)
+
+    for label, code in ENTRY_POINTS:
+        best = None
+        for _ in range(args.repeat):
+            entries = import_profile(code)
+            total_ms = sum(cum for _, _, cum, level in entries if level == 0) / 1000
+            if best is None or total_ms < best[0]:
+                best = (total_ms, entries)
+        total_ms, entries = best
+        loaded = [m for m in HEAVY_MODULES if any(name == m for name, _, _, _ in entries)]
+        print(f"{label:<14}{total_ms:>9.1f} ms   dipendenze pesanti: {', '.join(loaded) or 'nessuna'}")
+        for name, self_us, _, _ in sorted(entries, key=lambda e: e[1], reverse=True)[:args.top]:
+            print(f"{'':<16}{self_us / 1000:>7.1f} ms  {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())